@@ -37,9 +37,20 @@ async def generate_schedule(request: ScheduleGenerateRequest):
     if not request.medicines:
         raise HTTPException(status_code=400, detail="스케줄을 생성할 약물이 없습니다.")
 
-    schedules = await gemini_service.generate_schedule(request.medicines)
+    schedules = await gemini_service.generate_schedule(
+        request.medicines,
+        meal_times=request.meal_times
+    )
 
     return ScheduleGenerateResponse(
         success=True,
         schedules=schedules
     )
+
+
+@router.get("/single-flight/stats")
+async def single_flight_stats():
+    """
+    동일 요청 합치기 통계 (실제 LLM 호출 수, 합쳐진 호출 수)
+    """
+    return gemini_service.single_flight.stats()
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
+import time
+from app.core.sse import sse_event, sse_response
 from app.schemas.chat import (
     ChatMessageRequest,
     ChatMessageResponse,
     STTTranscribeResponse
 )
+from app.services.chat_cache import chat_answer_cache
+from app.services.chat_history import chat_history
 from app.services.gemini_service import gemini_service
 
 router = APIRouter()
@@ -17,11 +21,18 @@ async def send_message(request: ChatMessageRequest):
     if not request.message.strip():
         raise HTTPException(status_code=400, detail="메시지가 비어있습니다.")
 
+    # 이전 대화 (누적 요약 + 최근 메시지, 토큰 예산 이내)
+    history = await chat_history.prompt_context(request.user_id)
     result = await gemini_service.chat_response(
         message=request.message,
-        context=request.context
+        context=request.context,
+        history=history
     )
 
+    if result["success"]:
+        await chat_history.append(request.user_id, request.message, is_user=True)
+        await chat_history.append(request.user_id, result["message"], is_user=False)
+
     return ChatMessageResponse(
         success=result["success"],
         message=result["message"],
@@ -29,6 +40,49 @@ async def send_message(request: ChatMessageRequest):
     )
 
 
+@router.post("/message/stream")
+async def send_message_stream(request: ChatMessageRequest):
+    """
+    사용자 메시지에 대한 AI 응답을 SSE로 스트리밍합니다.
+
+    이벤트:
+        token: {"text"} 답변 조각 (도착 순서대로 이어 붙이면 전체 답변)
+        done: {"success", "message", "suggestions"} 전체 답변과 후속 질문 제안
+    """
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="메시지가 비어있습니다.")
+
+    async def events():
+        started = time.perf_counter()
+        first_token_ms = None
+        history = await chat_history.prompt_context(request.user_id)
+        async for event, data in gemini_service.chat_response_stream(
+            message=request.message,
+            context=request.context,
+            history=history
+        ):
+            if event == "token" and first_token_ms is None:
+                first_token_ms = (time.perf_counter() - started) * 1000
+            if event == "done" and data["success"]:
+                await chat_history.append(request.user_id, request.message, is_user=True)
+                await chat_history.append(request.user_id, data["message"], is_user=False)
+            yield sse_event(event, data)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        ttft = f"{first_token_ms:.0f}ms" if first_token_ms is not None else "-"
+        print(f"[Chat] 스트리밍 응답 (user: {request.user_id}): 첫 토큰 {ttft}, 전체 {elapsed_ms:.0f}ms")
+
+    return sse_response(events())
+
+
+@router.get("/cache/stats")
+async def chat_cache_stats():
+    """
+    챗봇 답변 캐시 통계 (적중률, 절약한 응답 시간)
+    """
+    return chat_answer_cache.stats()
+
+
 @router.post("/stt/transcribe", response_model=STTTranscribeResponse)
 async def transcribe_audio(audio: UploadFile = File(...)):
     """
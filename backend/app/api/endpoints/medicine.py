@@ -6,6 +6,7 @@ from app.schemas.medicine import (
     MedicineResponse
 )
 from app.core.supabase import get_supabase
+from app.services.alarm_scheduler import alarm_scheduler
 
 router = APIRouter()
 
@@ -55,6 +56,9 @@ async def create_medicine(medicine: MedicineCreate):
     if not response.data:
         raise HTTPException(status_code=500, detail="약물 등록에 실패했습니다.")
 
+    # 알람 인덱스 즉시 반영 (다음 증분 동기화를 기다리지 않음)
+    alarm_scheduler.medicine_changed(response.data[0])
+
     return response.data[0]
 
 
@@ -78,6 +82,8 @@ async def update_medicine(medicine_id: str, medicine: MedicineUpdate):
     if not response.data:
         raise HTTPException(status_code=404, detail="약물을 찾을 수 없습니다.")
 
+    alarm_scheduler.medicine_changed(response.data[0])
+
     return response.data[0]
 
 
@@ -92,6 +98,8 @@ async def delete_medicine(medicine_id: str):
         "id", medicine_id
     ).execute()
 
+    alarm_scheduler.medicine_removed(medicine_id)
+
     return {"success": True, "message": "약물이 삭제되었습니다."}
 
 
@@ -111,4 +119,7 @@ async def create_medicines_bulk(medicines: List[MedicineCreate]):
     if not response.data:
         raise HTTPException(status_code=500, detail="약물 등록에 실패했습니다.")
 
+    for row in response.data:
+        alarm_scheduler.medicine_changed(row)
+
     return response.data
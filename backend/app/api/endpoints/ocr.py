@@ -1,46 +1,151 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.schemas.medicine import OCRAnalyzeResponse, DrugInteraction
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from PIL import Image, UnidentifiedImageError
+from typing import Optional
+import asyncio
+import time
+import uuid
+from app.core.config import settings
+from app.core.sse import sse_event, sse_response
+from app.schemas.medicine import (
+    OCRAnalyzeResponse,
+    OCRBatchAnalyzeResponse,
+    OCRPageResult,
+    DrugInteraction,
+    MedicineResult
+)
+from app.services.drug_names import normalize_drug_name
 from app.services.gemini_service import gemini_service
+from app.services.image_preprocess import image_preprocessor, PreprocessedImage
+from app.services.ocr_cache import ocr_result_cache
 
 router = APIRouter()
 
+# 업로드 파일 크기 제한 (10MB)
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
 
-@router.post("/analyze", response_model=OCRAnalyzeResponse)
-async def analyze_prescription(image: UploadFile = File(...)):
-    """
-    처방전 이미지를 분석하여 약물 정보를 추출합니다.
-    """
-    # 이미지 파일 검증
+
+async def _read_image(image: UploadFile) -> bytes:
+    """업로드 이미지 검증 후 읽기"""
     if not image.content_type or not image.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="이미지 파일만 업로드 가능합니다.")
 
-    # 파일 크기 제한 (10MB)
-    max_size = 10 * 1024 * 1024
     content = await image.read()
-    if len(content) > max_size:
+    if len(content) > MAX_UPLOAD_SIZE:
         raise HTTPException(status_code=400, detail="파일 크기가 10MB를 초과합니다.")
+    return content
 
-    # Gemini Vision으로 이미지 분석
-    result = await gemini_service.analyze_prescription_image(content)
 
-    if not result.get("success"):
-        raise HTTPException(
-            status_code=500,
-            detail=result.get("error", "이미지 분석에 실패했습니다.")
+async def _preprocess(content: bytes) -> PreprocessedImage:
+    try:
+        return await image_preprocessor.process(content)
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        raise HTTPException(status_code=400, detail="이미지를 읽을 수 없습니다.")
+    except OSError:
+        # 업로드가 중간에 끊기거나 손상된 파일 (image file is truncated 등)
+        raise HTTPException(status_code=400, detail="이미지 파일이 손상되었습니다.")
+
+
+async def _recognize(prepared: PreprocessedImage, user_id: Optional[str] = None) -> dict:
+    """
+    (같은 사진이면 캐시 결과) → Gemini Vision 분석
+
+    Returns:
+        dict: analyze_prescription_image 결과 + "cached"(캐시 적중 여부)
+    """
+    cached = await asyncio.to_thread(ocr_result_cache.get, prepared.digest, user_id)
+    if cached is not None:
+        # 저장된 약물 목록을 새 id로 반환 (프론트엔드가 id로 항목을 구분)
+        return {
+            "success": True,
+            "medicines": [MedicineResult(id=str(uuid.uuid4()), **med) for med in cached["medicines"]],
+            "raw_text": cached["raw_text"],
+            "cached": True
+        }
+
+    result = await gemini_service.analyze_prescription_image(prepared.data, prepared.mime_type)
+    if result.get("success") and result["medicines"]:
+        await asyncio.to_thread(
+            ocr_result_cache.put,
+            prepared.digest,
+            {
+                "medicines": [med.model_dump(exclude={"id"}) for med in result["medicines"]],
+                "raw_text": result.get("raw_text", "")
+            },
+            user_id
         )
+    return {**result, "cached": False}
+
+
+async def _extract_medicines(content: bytes, user_id: Optional[str] = None) -> dict:
+    """
+    전처리 → (같은 사진이면 캐시 결과) → Gemini Vision 분석
 
-    # 약물 간 상호작용 체크
-    medicine_names = [med.name for med in result["medicines"]]
+    Returns:
+        dict: analyze_prescription_image 결과 + "preprocess"(전처리 통계), "cached"(캐시 적중 여부)
+    """
+    prepared = await _preprocess(content)
+    result = await _recognize(prepared, user_id)
+    return {**result, "preprocess": prepared.stats}
+
+
+async def _check_interactions(medicines: list[MedicineResult]) -> list[DrugInteraction]:
+    """약물 간 상호작용 체크 후 경고를 해당 약물에 추가"""
     interactions = await gemini_service.check_drug_interactions(
-        new_medicines=medicine_names,
+        new_medicines=[med.name for med in medicines],
         existing_medicines=[]  # TODO: 기존 약물 정보 조회
     )
 
-    # 상호작용 경고를 약물에 추가
     for interaction in interactions:
-        for med in result["medicines"]:
+        for med in medicines:
             if med.name in [interaction.drug1, interaction.drug2]:
                 med.warning = interaction.description
+    return interactions
+
+
+def _compact(text: Optional[str]) -> str:
+    return "".join((text or "").split()).lower()
+
+
+def _merge_medicines(pages: list[list[MedicineResult]]) -> list[MedicineResult]:
+    """
+    여러 장에서 읽은 약물 중 같은 처방 항목(정규화한 이름 + 용량 + 복용 횟수)을 합침
+    (같은 항목이 여러 장에 있으면 인식 신뢰도가 가장 높은 항목을 사용, 순서는 처음 나온 위치)
+    같은 약이라도 용량이나 횟수가 다르면 별개의 처방이므로 그대로 둠
+    """
+    merged: dict[tuple[str, str, str], MedicineResult] = {}
+    for medicines in pages:
+        for med in medicines:
+            # 이름을 읽지 못한 항목은 합치지 않고 그대로 검토 대상으로 남김
+            name = normalize_drug_name(med.name) or med.id
+            key = (name, _compact(med.dosage), _compact(med.frequency))
+            current = merged.get(key)
+            if current is None:
+                merged[key] = med
+            elif med.confidence > current.confidence:
+                merged[key] = med.model_copy(update={"id": current.id})
+    return list(merged.values())
+
+
+@router.post("/analyze", response_model=OCRAnalyzeResponse)
+async def analyze_prescription(
+    image: UploadFile = File(...),
+    user_id: Optional[str] = Form(None)
+):
+    """
+    처방전 이미지를 분석하여 약물 정보를 추출합니다.
+    """
+    content = await _read_image(image)
+
+    # 축소/재인코딩 후 Gemini Vision으로 이미지 분석 (다시 올린 같은 사진은 캐시 결과)
+    result = await _extract_medicines(content, user_id)
+
+    if not result.get("success"):
+        raise HTTPException(
+            status_code=500,
+            detail=result.get("error", "이미지 분석에 실패했습니다.")
+        )
+
+    interactions = await _check_interactions(result["medicines"])
 
     return OCRAnalyzeResponse(
         success=True,
@@ -48,3 +153,112 @@ async def analyze_prescription(image: UploadFile = File(...)):
         warnings=interactions,
         raw_text=result.get("raw_text")
     )
+
+
+@router.post("/analyze/stream")
+async def analyze_prescription_stream(
+    image: UploadFile = File(...),
+    user_id: Optional[str] = Form(None)
+):
+    """
+    처방전 분석 결과를 단계별 SSE 이벤트로 전송합니다.
+    결과 화면이 상호작용 검사를 기다리지 않고 약물 목록부터 그릴 수 있습니다.
+
+    이벤트:
+        preprocess: 전처리 통계
+        medicines: {"medicines", "raw_text", "cached"}
+        interactions: {"warnings", "medicines"} (경고가 추가된 약물 목록)
+        done: {"elapsed_ms"}
+        error: {"detail"} (이후 스트림 종료)
+    """
+    # 파일 검증 오류는 스트림 시작 전에 일반 HTTP 오류로 응답
+    content = await _read_image(image)
+
+    async def events():
+        started = time.perf_counter()
+        try:
+            prepared = await _preprocess(content)
+            yield sse_event("preprocess", prepared.stats._asdict())
+
+            result = await _recognize(prepared, user_id)
+            if not result.get("success"):
+                yield sse_event("error", {"detail": result.get("error", "이미지 분석에 실패했습니다.")})
+                return
+            medicines = result["medicines"]
+            yield sse_event("medicines", {
+                "medicines": medicines,
+                "raw_text": result.get("raw_text"),
+                "cached": result["cached"]
+            })
+            first_ms = (time.perf_counter() - started) * 1000
+
+            interactions = await _check_interactions(medicines)
+            yield sse_event("interactions", {"warnings": interactions, "medicines": medicines})
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"[OCR] 스트리밍 분석: 약물 {len(medicines)}개 {first_ms:.0f}ms, 전체 {elapsed_ms:.0f}ms")
+            yield sse_event("done", {"elapsed_ms": round(elapsed_ms)})
+        except HTTPException as e:
+            yield sse_event("error", {"detail": e.detail})
+        except Exception as e:
+            print(f"[OCR] 스트리밍 분석 오류: {e}")
+            yield sse_event("error", {"detail": "이미지 분석에 실패했습니다."})
+
+    return sse_response(events())
+
+
+@router.post("/analyze/batch", response_model=OCRBatchAnalyzeResponse)
+async def analyze_prescription_batch(
+    images: list[UploadFile] = File(...),
+    user_id: Optional[str] = Form(None)
+):
+    """
+    여러 장의 처방전/약 봉투 이미지를 한 번에 분석합니다.
+    이미지는 제한된 수만큼 동시에 처리하고, 중복 약물을 합친 뒤 상호작용은 한 번만 검사합니다.
+    """
+    if len(images) > settings.OCR_BATCH_MAX_IMAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"이미지는 한 번에 {settings.OCR_BATCH_MAX_IMAGES}장까지 업로드 가능합니다."
+        )
+    semaphore = asyncio.Semaphore(settings.OCR_BATCH_CONCURRENCY)
+
+    async def analyze_page(image: UploadFile) -> dict:
+        # 형식/크기 오류도 해당 장의 오류로만 보고하고 나머지 장은 계속 분석
+        async with semaphore:
+            try:
+                content = await _read_image(image)
+                return await _extract_medicines(content, user_id)
+            except HTTPException as e:
+                return {"success": False, "medicines": [], "error": e.detail}
+
+    results = await asyncio.gather(*(analyze_page(image) for image in images))
+
+    pages = [
+        OCRPageResult(
+            index=index,
+            filename=image.filename,
+            success=bool(result.get("success")),
+            medicine_count=len(result.get("medicines", [])),
+            cached=result.get("cached", False),
+            raw_text=result.get("raw_text"),
+            error=result.get("error")
+        )
+        for index, (image, result) in enumerate(zip(images, results))
+    ]
+    if not any(page.success for page in pages):
+        raise HTTPException(
+            status_code=500,
+            detail=results[0].get("error", "이미지 분석에 실패했습니다.")
+        )
+
+    medicines = _merge_medicines([result["medicines"] for result in results if result.get("success")])
+    interactions = await _check_interactions(medicines)
+    print(f"[OCR] 일괄 분석: 이미지 {len(images)}장, 약물 {sum(p.medicine_count for p in pages)}개 → {len(medicines)}개")
+
+    return OCRBatchAnalyzeResponse(
+        success=True,
+        medicines=medicines,
+        warnings=interactions,
+        pages=pages
+    )
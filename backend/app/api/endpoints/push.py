@@ -4,13 +4,19 @@ Web Push 알림 API
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
-from pywebpush import webpush, WebPushException
+from typing import NamedTuple, Optional
+import asyncio
 import json
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
 
 from app.core.config import settings
 from app.core.supabase import get_supabase_admin
+from app.services.push_encryption import encrypt_payload
+from app.services.subscription_cache import subscription_cache
+from app.services.webpush_client import push_topic, webpush_client
 
 router = APIRouter()
 
@@ -53,52 +59,33 @@ async def get_vapid_public_key():
 
 @router.post("/subscribe")
 async def subscribe_push(request: SubscriptionRequest):
-    """Push 알림 구독 등록"""
-    print(f"[Push] 구독 요청 수신: user_id={request.user_id}")
-    print(f"[Push] endpoint: {request.subscription.endpoint[:50]}...")
-    print(f"[Push] keys: p256dh={bool(request.subscription.keys.get('p256dh'))}, auth={bool(request.subscription.keys.get('auth'))}")
-
+    """Push 알림 구독 등록 (endpoint 기준 upsert)"""
     supabase = get_supabase_admin()
 
+    subscription_data = {
+        "user_id": request.user_id,
+        "endpoint": request.subscription.endpoint,
+        "p256dh": request.subscription.keys.get("p256dh"),
+        "auth": request.subscription.keys.get("auth"),
+        "updated_at": datetime.utcnow().isoformat()
+    }
+
     try:
-        # 기존 구독 확인 (같은 endpoint가 있으면 업데이트)
-        existing = supabase.table("push_subscriptions").select("id").eq(
-            "endpoint", request.subscription.endpoint
+        # 같은 endpoint가 있으면 갱신, 없으면 등록 (created_at은 DB 기본값)
+        supabase.table("push_subscriptions").upsert(
+            subscription_data, on_conflict="endpoint"
         ).execute()
-        print(f"[Push] 기존 구독 조회 결과: {len(existing.data) if existing.data else 0}개")
-
-        subscription_data = {
-            "user_id": request.user_id,
-            "endpoint": request.subscription.endpoint,
-            "p256dh": request.subscription.keys.get("p256dh"),
-            "auth": request.subscription.keys.get("auth"),
-            "updated_at": datetime.utcnow().isoformat()
-        }
-
-        if existing.data and len(existing.data) > 0:
-            # 기존 구독 업데이트
-            print(f"[Push] 기존 구독 업데이트 시도...")
-            result = supabase.table("push_subscriptions").update(
-                subscription_data
-            ).eq("endpoint", request.subscription.endpoint).execute()
-            print(f"[Push] 업데이트 결과: {result.data}")
-        else:
-            # 새 구독 등록
-            subscription_data["created_at"] = datetime.utcnow().isoformat()
-            print(f"[Push] 새 구독 등록 시도: {subscription_data}")
-            result = supabase.table("push_subscriptions").insert(
-                subscription_data
-            ).execute()
-            print(f"[Push] 등록 결과: {result.data}")
-
-        return {"success": True, "message": "Push 구독이 등록되었습니다."}
-
     except Exception as e:
-        import traceback
         print(f"[Push] 구독 등록 오류: {e}")
-        print(f"[Push] 상세 오류: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    # 기기를 다른 계정이 넘겨받은 경우 이전 소유자의 캐시도 무효화
+    subscription_cache.invalidate_endpoint(request.subscription.endpoint)
+    subscription_cache.invalidate(request.user_id)
+    print(f"[Push] 구독 등록: user_id={request.user_id}")
+
+    return {"success": True, "message": "Push 구독이 등록되었습니다."}
+
 
 @router.post("/unsubscribe")
 async def unsubscribe_push(request: UnsubscribeRequest):
@@ -109,6 +96,7 @@ async def unsubscribe_push(request: UnsubscribeRequest):
         supabase.table("push_subscriptions").delete().eq(
             "user_id", request.user_id
         ).eq("endpoint", request.endpoint).execute()
+        subscription_cache.invalidate(request.user_id)
 
         return {"success": True, "message": "Push 구독이 해제되었습니다."}
 
@@ -126,14 +114,10 @@ async def test_push(request: TestPushRequest):
             detail="VAPID 키가 설정되지 않았습니다."
         )
 
-    supabase = get_supabase_admin()
-
     # 사용자의 모든 구독 조회
-    subscriptions = supabase.table("push_subscriptions").select("*").eq(
-        "user_id", request.user_id
-    ).execute()
+    subscriptions = await asyncio.to_thread(subscription_cache.get, request.user_id)
 
-    if not subscriptions.data:
+    if not subscriptions:
         raise HTTPException(
             status_code=404,
             detail="등록된 Push 구독이 없습니다."
@@ -142,7 +126,7 @@ async def test_push(request: TestPushRequest):
     sent_count = 0
     failed_count = 0
 
-    for sub in subscriptions.data:
+    for sub in subscriptions:
         success = await send_push_notification(
             endpoint=sub["endpoint"],
             p256dh=sub["p256dh"],
@@ -163,34 +147,14 @@ async def test_push(request: TestPushRequest):
     }
 
 
-async def send_push_notification(
-    endpoint: str,
-    p256dh: str,
-    auth: str,
+def build_push_payload(
     title: str,
     body: str,
     data: Optional[dict] = None,
     tag: Optional[str] = None
-) -> bool:
-    """
-    개별 Push 알림 발송
-
-    Returns:
-        bool: 발송 성공 여부
-    """
-    if not settings.VAPID_PRIVATE_KEY:
-        print("[Push] VAPID_PRIVATE_KEY가 설정되지 않았습니다.")
-        return False
-
-    subscription_info = {
-        "endpoint": endpoint,
-        "keys": {
-            "p256dh": p256dh,
-            "auth": auth
-        }
-    }
-
-    payload = {
+) -> dict:
+    """서비스 워커에 전달할 알림 payload 생성"""
+    return {
         "title": title,
         "body": body,
         "icon": "/icon-192.png",
@@ -201,73 +165,150 @@ async def send_push_notification(
         "vibrate": [200, 100, 200, 100, 200]
     }
 
-    try:
-        webpush(
-            subscription_info=subscription_info,
-            data=json.dumps(payload),
-            vapid_private_key=settings.VAPID_PRIVATE_KEY,
-            vapid_claims={
-                "sub": settings.VAPID_CLAIMS_EMAIL
-            }
-        )
-        print(f"[Push] 알림 발송 성공: {endpoint[:50]}...")
-        return True
 
-    except WebPushException as e:
-        print(f"[Push] 발송 실패: {e}")
+class DeliveryResult(NamedTuple):
+    """Push 전송 결과 분류"""
+    status: str  # sent | gone | retry | failed
+    retry_after: Optional[float] = None  # Retry-After 헤더 (초)
 
-        # 410 Gone - 구독이 만료됨, DB에서 삭제
-        if e.response and e.response.status_code == 410:
-            print(f"[Push] 만료된 구독 삭제: {endpoint[:50]}...")
-            supabase = get_supabase_admin()
-            supabase.table("push_subscriptions").delete().eq(
-                "endpoint", endpoint
-            ).execute()
 
-        return False
+DELIVERY_SENT = "sent"
+DELIVERY_GONE = "gone"  # 404/410 - 구독 만료, 삭제 대상
+DELIVERY_RETRY = "retry"  # 429/5xx/네트워크 오류 - 재시도 대상
+DELIVERY_FAILED = "failed"  # 그 외 4xx - 재시도해도 실패
+
+# 엔드포인트 URL이 길어 in_ 필터 URL 길이 제한 내로 나눔
+PRUNE_CHUNK = 50
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP-date)를 남은 초로 변환"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def classify_push_response(status_code: int, retry_after: Optional[str] = None) -> DeliveryResult:
+    """Push 서비스 응답 코드 분류"""
+    if status_code <= 202:
+        return DeliveryResult(DELIVERY_SENT)
+    if status_code in (404, 410):
+        return DeliveryResult(DELIVERY_GONE)
+    if status_code == 429 or status_code >= 500:
+        return DeliveryResult(DELIVERY_RETRY, parse_retry_after(retry_after))
+    return DeliveryResult(DELIVERY_FAILED)
+
+
+async def send_encrypted_push(
+    endpoint: str,
+    encrypted_body: bytes,
+    tag: str,
+    ttl: Optional[int] = None
+) -> DeliveryResult:
+    """
+    암호화된 Push 본문 전송 (구독 삭제 등 후처리는 호출 측에서)
+
+    Returns:
+        DeliveryResult: 분류된 전송 결과
+    """
+    try:
+        response = await webpush_client.send_encrypted(
+            endpoint,
+            encrypted_body,
+            ttl=settings.PUSH_TTL_SECONDS if ttl is None else ttl,
+            urgency=settings.PUSH_URGENCY,
+            # 같은 tag의 미전달 알림은 Push 서비스에서 최신 것으로 교체
+            topic=push_topic(tag)
+        )
+    except httpx.TransportError as e:
+        # 타임아웃/연결 오류는 일시적 장애로 보고 재시도
+        print(f"[Push] 발송 오류 (재시도 대상): {e!r}")
+        return DeliveryResult(DELIVERY_RETRY)
     except Exception as e:
         print(f"[Push] 발송 오류: {e}")
-        return False
+        return DeliveryResult(DELIVERY_FAILED)
+
+    result = classify_push_response(response.status_code, response.headers.get("Retry-After"))
+    if result.status != DELIVERY_SENT:
+        print(f"[Push] 발송 실패: {response.status_code} {response.reason_phrase} ({result.status})")
+    return result
+
+
+def prune_subscriptions(endpoints: list[str]) -> int:
+    """
+    만료된 구독 일괄 삭제
+
+    Returns:
+        int: 삭제 요청한 엔드포인트 수
+    """
+    endpoints = list(dict.fromkeys(endpoints))
+    if not endpoints:
+        return 0
+
+    supabase = get_supabase_admin()
+    for i in range(0, len(endpoints), PRUNE_CHUNK):
+        supabase.table("push_subscriptions").delete().in_(
+            "endpoint", endpoints[i:i + PRUNE_CHUNK]
+        ).execute()
+    for endpoint in endpoints:
+        subscription_cache.invalidate_endpoint(endpoint)
+
+    print(f"[Push] 만료된 구독 {len(endpoints)}개 삭제")
+    return len(endpoints)
+
 
+async def deliver_encrypted_push(endpoint: str, encrypted_body: bytes, tag: str) -> bool:
+    """
+    암호화된 Push 본문 전송 및 응답 처리 (단건 발송용, 만료 구독은 즉시 삭제)
 
-async def send_push_to_user(
-    user_id: str,
+    Returns:
+        bool: 발송 성공 여부
+    """
+    result = await send_encrypted_push(endpoint, encrypted_body, tag)
+    if result.status == DELIVERY_GONE:
+        try:
+            await asyncio.to_thread(prune_subscriptions, [endpoint])
+        except Exception as e:
+            print(f"[Push] 만료 구독 삭제 오류: {e}")
+    return result.status == DELIVERY_SENT
+
+
+async def send_push_notification(
+    endpoint: str,
+    p256dh: str,
+    auth: str,
     title: str,
     body: str,
     data: Optional[dict] = None,
     tag: Optional[str] = None
-) -> dict:
+) -> bool:
     """
-    특정 사용자의 모든 기기에 Push 발송
+    개별 Push 알림 발송
 
     Returns:
-        dict: {"sent": int, "failed": int}
+        bool: 발송 성공 여부
     """
-    supabase = get_supabase_admin()
-
-    subscriptions = supabase.table("push_subscriptions").select("*").eq(
-        "user_id", user_id
-    ).execute()
+    if not settings.VAPID_PRIVATE_KEY:
+        print("[Push] VAPID_PRIVATE_KEY가 설정되지 않았습니다.")
+        return False
 
-    if not subscriptions.data:
-        return {"sent": 0, "failed": 0}
+    payload = build_push_payload(title, body, data, tag)
 
-    sent = 0
-    failed = 0
+    try:
+        encrypted_body = encrypt_payload(p256dh, auth, json.dumps(payload))
+    except Exception as e:
+        print(f"[Push] 암호화 오류: {e}")
+        return False
 
-    for sub in subscriptions.data:
-        success = await send_push_notification(
-            endpoint=sub["endpoint"],
-            p256dh=sub["p256dh"],
-            auth=sub["auth"],
-            title=title,
-            body=body,
-            data=data,
-            tag=tag
-        )
-        if success:
-            sent += 1
-        else:
-            failed += 1
+    return await deliver_encrypted_push(endpoint, encrypted_body, payload["tag"])
 
-    return {"sent": sent, "failed": failed}
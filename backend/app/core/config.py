@@ -23,6 +23,45 @@ class Settings(BaseSettings):
     # Google Gemini
     GOOGLE_API_KEY: str = ""
     GEMINI_MODEL: str = "gemini-1.5-flash"
+    GEMINI_MAX_CONCURRENCY: int = 8  # 프로세스 전체 동시 Gemini 호출 수
+    GEMINI_TIMEOUT_SECONDS: float = 30.0  # 텍스트 호출 제한 시간
+    GEMINI_VISION_TIMEOUT_SECONDS: float = 60.0  # 이미지(OCR) 호출 제한 시간
+    GEMINI_RESPONSE_LOG_PATH: str = ""  # 원본 응답 기록 JSONL (비우면 기록 안 함, 파싱 벤치마크용)
+
+    # OCR 이미지 전처리
+    OCR_MAX_IMAGE_SIDE: int = 2048  # 긴 변 최대 픽셀 (처방전 글자 인식에 충분한 해상도)
+    OCR_GRAYSCALE: bool = False
+    OCR_AUTOCONTRAST: bool = True
+    OCR_IMAGE_FORMAT: str = "jpeg"  # jpeg | webp
+    OCR_MAX_IMAGE_BYTES: int = 1_000_000  # 재인코딩 목표 용량
+    OCR_PREPROCESS_WORKERS: int = 2
+    OCR_PREPROCESS_STATS_PATH: str = ""  # 요청별 전처리 통계 JSONL (비우면 로그만)
+    OCR_CACHE_MAX_ENTRIES: int = 2000  # 메모리 OCR 결과 캐시 항목 수
+    OCR_CACHE_DISK_PATH: str = ""  # 디스크 계층 SQLite 경로 (비우면 메모리만)
+    OCR_CACHE_DISK_MAX_ENTRIES: int = 50000
+    OCR_BATCH_MAX_IMAGES: int = 10  # 일괄 분석 요청당 최대 이미지 수
+    OCR_BATCH_CONCURRENCY: int = 4  # 일괄 분석 요청 안에서 동시에 처리하는 이미지 수
+
+    # 약물 상호작용 캐시
+    INTERACTION_CACHE_PATH: str = "interaction_cache.db"
+    INTERACTION_CACHE_TTL_DAYS: int = 30
+    INTERACTION_CACHE_LRU_SIZE: int = 10000
+    DUR_INTERACTIONS_CSV: str = "data/dur_interactions.csv"  # 식약처 DUR 병용금기 CSV (없으면 LLM만 사용)
+    DUR_PRODUCTS_CSV: str = "data/dur_products.csv"  # 제품명 → 성분 매핑 CSV (선택)
+    DUR_SNAPSHOT_PATH: str = "data/dur_index.pkl"
+
+    # 챗봇 답변 캐시 (정규화한 질문 + 복용 중인 약 목록 기준)
+    CHAT_CACHE_TTL_SECONDS: int = 86400
+    CHAT_CACHE_MAX_ENTRIES: int = 5000
+    CHAT_CACHE_SIMILARITY: float = 0.85  # 유사 질문 적중 기준 (문자 2-gram Dice 계수)
+
+    # 챗봇 대화 기록 (chat_messages)
+    CHAT_HISTORY_WINDOW_MESSAGES: int = 10  # 프롬프트에 원문으로 넣는 최근 메시지 수
+    CHAT_HISTORY_SUMMARY_BATCH: int = 6  # 창에서 밀려난 메시지가 이만큼 쌓이면 요약 갱신
+    CHAT_HISTORY_TOKEN_BUDGET: int = 1200  # 요약 + 최근 대화에 쓰는 최대 토큰 (추정치)
+    CHAT_HISTORY_MAX_USERS: int = 10000  # 메모리에 기록을 유지하는 사용자 수
+    CHAT_HISTORY_FLUSH_SECONDS: float = 2.0  # DB 일괄 저장 주기
+    CHAT_HISTORY_BATCH_SIZE: int = 200
 
     # OpenAI
     OPENAI_API_KEY: str = ""
@@ -31,6 +70,42 @@ class Settings(BaseSettings):
     VAPID_PUBLIC_KEY: str = ""
     VAPID_PRIVATE_KEY: str = ""
     VAPID_CLAIMS_EMAIL: str = "mailto:admin@example.com"
+    PUSH_FANOUT_CONCURRENCY: int = 32  # 동시 Push 발송 워커 수
+    PUSH_TTL_SECONDS: int = 600  # 기기가 오프라인일 때 Push 서비스가 보관하는 시간
+    PUSH_URGENCY: str = "high"  # very-low | low | normal | high
+    PUSH_TIMEOUT_SECONDS: float = 10.0
+    PUSH_MAX_CONNECTIONS_PER_ORIGIN: int = 20
+    PUSH_ENCRYPTION_WORKERS: int = 0  # payload 암호화 프로세스 수 (0이면 CPU 코어 수)
+    PUSH_ENCRYPTION_CHUNK_SIZE: int = 500
+    PUSH_ENCRYPTION_POOL_MIN_BATCH: int = 1000  # 이 건수 이상일 때만 프로세스 풀 사용
+    PUSH_SUBSCRIPTION_CACHE_TTL_SECONDS: int = 21600  # 무효화로 갱신, 다른 인스턴스의 구독 변경만 이 주기로 반영
+    PUSH_SUBSCRIPTION_CACHE_MAX_USERS: int = 100000
+    PUSH_RETRY_MAX_ATTEMPTS: int = 5  # 429/5xx 재시도 최대 횟수
+    PUSH_RETRY_BASE_SECONDS: float = 2.0  # 지수 백오프 시작 값
+    PUSH_RETRY_MAX_BACKOFF_SECONDS: float = 120.0
+    PUSH_RETRY_DEADLINE_SECONDS: int = 600  # 최초 실패 후 이 시간이 지나면 알람 폐기
+    PUSH_OUTBOX_BACKEND: str = "sqlite"  # sqlite | file (append-only 로그)
+    PUSH_OUTBOX_PATH: str = "push_outbox.db"
+    PUSH_OUTBOX_LEASE_SECONDS: int = 300  # 꺼낸 항목을 발송하지 못하고 종료된 경우 다른 프로세스가 다시 가져가기까지의 시간
+    PUSH_OUTBOX_MAX_AGE_SECONDS: int = 1800  # 이보다 오래 대기한 알림은 발송하지 않음
+    PUSH_OUTBOX_DRAIN_SECONDS: float = 10.0  # 종료 시 대기열을 비우는 최대 시간
+    PUSH_DELIVERY_WORKERS: int = 2  # 아웃박스 발송 워커 수
+    PUSH_DELIVERY_BATCH_SIZE: int = 500  # 워커가 한 번에 꺼내는 알림 수
+
+    # Alarm Scheduler
+    ALARM_INDEX_RECONCILE_MINUTES: int = 10  # 삭제된 약물 정리 주기
+    ALARM_SYNC_INTERVAL_SECONDS: int = 60  # 알람이 없을 때 변경분 동기화/하트비트 주기
+    DEFAULT_TIMEZONE: str = "Asia/Seoul"  # profiles.timezone이 없을 때 사용
+    MISSED_DOSE_GRACE_MINUTES: int = 60  # 알람 후 복용 기록을 기다리는 시간
+    MISSED_DOSE_CHECK_INTERVAL_SECONDS: int = 300
+    MISSED_DOSE_MAX_ATTEMPTS: int = 5  # 기록에 계속 실패하는 슬롯을 버리기까지의 시도 횟수
+    MISSED_DOSE_RECOVERY_MINUTES: int = 240  # 재시작 시 발송 원장에서 검사 대상을 복원하는 범위
+    SCHEDULER_COORDINATION: str = "none"  # none | leader | shard (다중 워커/레플리카 시)
+    SCHEDULER_STORE: str = "supabase"  # supabase | sqlite
+    SCHEDULER_SQLITE_PATH: str = "scheduler.db"
+    SCHEDULER_LEASE_TTL_SECONDS: int = 150  # 하트비트가 끊긴 인스턴스를 제외하기까지의 시간
+    ALARM_CATCHUP_MAX_MINUTES: int = 30  # 재시작/지연 시 재처리할 최대 분 수
+    ALARM_LEDGER_RETENTION_DAYS: int = 2  # 발송 원장 보관 기간
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,35 @@
+"""
+Server-Sent Events 응답 유틸리티
+- 단계별 결과를 "event: <이름>\\ndata: <JSON>\\n\\n" 형식으로 흘려보냄
+"""
+from typing import Any, AsyncIterator
+import json
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # nginx 등 프록시 버퍼링 해제
+}
+
+
+def _to_jsonable(data: Any) -> Any:
+    if isinstance(data, BaseModel):
+        return data.model_dump()
+    if isinstance(data, (list, tuple)):
+        return [_to_jsonable(item) for item in data]
+    if isinstance(data, dict):
+        return {key: _to_jsonable(value) for key, value in data.items()}
+    return data
+
+
+def sse_event(event: str, data: Any = None) -> str:
+    """SSE 이벤트 한 건을 직렬화"""
+    payload = json.dumps(_to_jsonable(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """SSE 스트리밍 응답 생성"""
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -1,21 +1,50 @@
 from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.router import api_router
 from app.services.alarm_scheduler import alarm_scheduler
+from app.services.chat_history import chat_history
+from app.services.dur_index import dur_index, load_dur_index
+from app.services.image_preprocess import image_preprocessor
+from app.services.missed_dose_detector import missed_dose_detector
+from app.services.push_delivery import push_delivery
+from app.services.push_encryption import push_encryption_engine
+from app.services.push_retry_queue import push_retry_queue
+from app.services.webpush_client import webpush_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """앱 시작/종료 시 실행되는 이벤트"""
-    # 시작 시: 알람 스케줄러 시작
+    # 시작 시: DUR 병용금기 인덱스 로드 (스냅샷)
+    try:
+        if await asyncio.to_thread(load_dur_index):
+            print(f"[App] DUR 인덱스 로드: 병용금기 쌍 {len(dur_index.pairs)}개")
+    except Exception as e:
+        print(f"[App] DUR 인덱스 로드 오류: {e}")
+
+    # 알람 스케줄러 시작
     print("[App] 알람 스케줄러 시작...")
+    await push_delivery.start()
     await alarm_scheduler.start()
+    await missed_dose_detector.start()
+    await push_retry_queue.start()
+    await chat_history.start()
     yield
     # 종료 시: 알람 스케줄러 중지
     print("[App] 알람 스케줄러 중지...")
     await alarm_scheduler.stop()
+    await missed_dose_detector.stop()
+    # 발송 대기열을 비우거나 디스크에 남긴 뒤 전송 자원 정리
+    await push_delivery.stop(drain_timeout=settings.PUSH_OUTBOX_DRAIN_SECONDS)
+    await push_retry_queue.stop()
+    # 저장 대기 중인 대화 메시지 기록
+    await chat_history.stop()
+    await webpush_client.aclose()
+    push_encryption_engine.shutdown()
+    image_preprocessor.shutdown()
 
 
 app = FastAPI(
@@ -0,0 +1,53 @@
+"""
+Gemini 구조화 출력 스키마
+- 응답 스키마(response_schema)로 전달하고, 같은 모델로 응답을 검증
+- 누락된 필드는 기본값으로 채워 일부가 빠진 응답도 최대한 살림
+"""
+from pydantic import BaseModel
+from typing import Optional
+
+from app.schemas.medicine import DrugInteraction
+
+
+class ExtractedMedicine(BaseModel):
+    """처방전에서 읽은 약물 (MedicineResult에서 서버가 채우는 id/status/warning 제외)"""
+    name: str
+    dosage: str = ""
+    frequency: str = ""
+    timing: str = "식후"
+    confidence: float = 50
+    originalText: str = ""
+
+
+class PrescriptionExtraction(BaseModel):
+    medicines: list[ExtractedMedicine] = []
+    raw_text: str = ""
+
+
+class PairInteraction(DrugInteraction):
+    """질의한 약물 쌍 번호가 붙은 상호작용"""
+    pair: Optional[int] = None
+    severity: str = "low"
+    description: str = ""
+
+
+class InteractionReport(BaseModel):
+    interactions: list[PairInteraction] = []
+
+
+class MedicineSchedule(BaseModel):
+    medicine_name: str
+    times: list[str] = []
+
+
+class ScheduleReport(BaseModel):
+    schedules: list[MedicineSchedule] = []
+
+
+class ChatReply(BaseModel):
+    message: str = ""
+    suggestions: list[str] = []
+
+
+class ChatSummary(BaseModel):
+    summary: str = ""
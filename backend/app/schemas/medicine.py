@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -72,6 +72,25 @@ class OCRAnalyzeResponse(BaseModel):
     raw_text: Optional[str] = None
 
 
+class OCRPageResult(BaseModel):
+    """일괄 분석의 이미지별 결과"""
+    index: int
+    filename: Optional[str] = None
+    success: bool
+    medicine_count: int = 0
+    cached: bool = False
+    raw_text: Optional[str] = None
+    error: Optional[str] = None
+
+
+class OCRBatchAnalyzeResponse(BaseModel):
+    """여러 장 OCR 일괄 분석 응답 (중복 약물은 하나로 합침)"""
+    success: bool
+    medicines: list[MedicineResult]
+    warnings: list[DrugInteraction]
+    pages: list[OCRPageResult]
+
+
 class DrugInteractionRequest(BaseModel):
     new_medicines: list[str]
     existing_medicines: list[str]
@@ -82,8 +101,21 @@ class DrugInteractionResponse(BaseModel):
     interactions: list[DrugInteraction]
 
 
+# 24시간제 HH:MM (시는 한 자리도 허용)
+MEAL_TIME_PATTERN = r"^([01]?\d|2[0-3]):[0-5]\d$"
+
+
+class MealTimes(BaseModel):
+    """사용자 식사/취침 시각 (HH:MM)"""
+    breakfast: str = Field("08:00", pattern=MEAL_TIME_PATTERN)
+    lunch: str = Field("12:00", pattern=MEAL_TIME_PATTERN)
+    dinner: str = Field("18:00", pattern=MEAL_TIME_PATTERN)
+    bedtime: str = Field("22:00", pattern=MEAL_TIME_PATTERN)
+
+
 class ScheduleGenerateRequest(BaseModel):
     medicines: list[dict]  # name, frequency, timing
+    meal_times: Optional[MealTimes] = None
 
 
 class ScheduleGenerateResponse(BaseModel):
@@ -0,0 +1,343 @@
+"""
+알람 인덱스
+- medicines 테이블을 "요일 비트마스크 + 분(minute-of-day)" 형태로 압축해 메모리에 보관
+- (약물, 복용 시간) 슬롯마다 다음 울림 시각(UTC)을 계산해 힙(heap)으로 관리
+- 사용자별 시간대(profiles.timezone) 기준으로 다음 울림 시각 계산
+- 시작 시 1회 전체 로드 후, updated_at 기준으로 변경분만 증분 동기화
+"""
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import heapq
+import threading
+import time
+
+MINUTES_PER_DAY = 24 * 60
+
+# Python weekday() 순서 (월요일=0, 일요일=6)
+WEEKDAY_BITS = {'월': 0, '화': 1, '수': 2, '목': 3, '금': 4, '토': 5, '일': 6}
+ALL_DAYS_MASK = 0b1111111
+
+# 인덱스 구성에 필요한 컬럼만 조회
+INDEX_COLUMNS = "id,user_id,name,timing,times,days,updated_at"
+PROFILE_COLUMNS = "id,timezone,updated_at"
+PAGE_SIZE = 1000
+
+
+class AlarmEntry(NamedTuple):
+    """인덱스에 보관하는 약물 정보 (알림 문구 생성에 필요한 최소 필드)"""
+    medicine_id: str
+    user_id: str
+    name: str
+    timing: str
+    days_mask: int
+    minutes: tuple[int, ...]
+
+
+def parse_minute_of_day(value: str) -> Optional[int]:
+    """'HH:MM' 문자열을 0 ~ 1439 사이의 분 단위 정수로 변환"""
+    try:
+        hour, minute = value.split(":")[:2]
+        result = int(hour) * 60 + int(minute)
+    except (AttributeError, ValueError):
+        return None
+    if 0 <= result < MINUTES_PER_DAY:
+        return result
+    return None
+
+
+def parse_minutes(times: Optional[list[str]]) -> tuple[int, ...]:
+    """복용 시간 배열을 중복 없는 분 단위 튜플로 변환"""
+    return tuple(sorted({m for m in map(parse_minute_of_day, times or []) if m is not None}))
+
+
+def days_to_mask(days: Optional[list[str]]) -> int:
+    """요일 배열을 7비트 마스크로 변환 (비어있으면 매일)"""
+    mask = 0
+    for day in days or []:
+        bit = WEEKDAY_BITS.get(day)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask or ALL_DAYS_MASK
+
+
+def next_fire_at(days_mask: int, minute: int, tz: ZoneInfo, after: datetime) -> datetime:
+    """after(UTC) 이후 처음으로 울릴 시각(UTC)을 사용자 시간대 기준으로 계산"""
+    local_after = after.astimezone(tz)
+    wall = dt_time(minute // 60, minute % 60)
+    for offset in range(8):
+        day = local_after.date() + timedelta(days=offset)
+        if not days_mask & (1 << day.weekday()):
+            continue
+        candidate = datetime.combine(day, wall, tzinfo=tz).astimezone(timezone.utc)
+        if candidate > after:
+            return candidate
+    # 마스크가 비어있을 수 없으므로 도달하지 않음
+    raise ValueError("울림 시각을 계산할 수 없습니다.")
+
+
+class AlarmIndex:
+    """(약물, 복용 시간) 슬롯 단위 다음 울림 시각 힙"""
+
+    def __init__(self, reconcile_interval: float = 600, default_timezone: str = "Asia/Seoul"):
+        self._entries: dict[str, AlarmEntry] = {}
+        self._user_medicines: dict[str, set[str]] = {}
+        self._timezones: dict[str, ZoneInfo] = {}
+        # (울림 시각 UTC, 버전, 약물 id, 분) - 버전이 바뀐 항목은 꺼낼 때 버림
+        self._heap: list[tuple[datetime, int, str, int]] = []
+        self._versions: dict[str, int] = {}
+        self._version = 0
+        self._live_slots = 0
+        self._cursor = datetime.now(timezone.utc)
+        self._last_updated_at: Optional[str] = None
+        self._last_profile_updated_at: Optional[str] = None
+        self._last_reconciled = 0.0
+        self.default_timezone = ZoneInfo(default_timezone)
+        self.reconcile_interval = reconcile_interval
+        self.loaded = False
+        # refresh는 스레드에서, 엔드포인트 반영은 이벤트 루프에서 호출되므로 잠금 필요
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def timezone_of(self, user_id: str) -> ZoneInfo:
+        return self._timezones.get(user_id, self.default_timezone)
+
+    def upsert(self, row: dict):
+        """약물 행 하나를 인덱스에 반영하고 해당 슬롯만 다시 계산"""
+        medicine_id = row.get("id")
+        if not medicine_id:
+            return
+
+        minutes = parse_minutes(row.get("times"))
+        user_id = row.get("user_id")
+
+        with self._lock:
+            self.remove(medicine_id)
+            if not user_id or not minutes:
+                return
+
+            entry = AlarmEntry(
+                medicine_id=medicine_id,
+                user_id=user_id,
+                name=row.get("name", ""),
+                timing=row.get("timing", ""),
+                days_mask=days_to_mask(row.get("days")),
+                minutes=minutes,
+            )
+            self._entries[medicine_id] = entry
+            self._user_medicines.setdefault(user_id, set()).add(medicine_id)
+            self._schedule(entry)
+
+    def remove(self, medicine_id: str):
+        """인덱스에서 약물 제거 (힙 항목은 버전 불일치로 지연 삭제)"""
+        with self._lock:
+            entry = self._entries.pop(medicine_id, None)
+            self._versions.pop(medicine_id, None)
+            if entry is None:
+                return
+            self._live_slots -= len(entry.minutes)
+            medicine_ids = self._user_medicines.get(entry.user_id)
+            if medicine_ids is not None:
+                medicine_ids.discard(medicine_id)
+                if not medicine_ids:
+                    del self._user_medicines[entry.user_id]
+            self._compact_if_needed()
+
+    def set_timezone(self, user_id: str, tz_name: Optional[str]):
+        """사용자 시간대 변경 시 해당 사용자의 슬롯만 다시 계산"""
+        try:
+            tz = ZoneInfo(tz_name) if tz_name else self.default_timezone
+        except (ZoneInfoNotFoundError, ValueError):
+            print(f"[AlarmIndex] 알 수 없는 시간대 무시: {user_id} ({tz_name})")
+            tz = self.default_timezone
+
+        with self._lock:
+            if self.timezone_of(user_id) == tz:
+                return
+            self._timezones[user_id] = tz
+            for medicine_id in self._user_medicines.get(user_id, ()):
+                self._schedule(self._entries[medicine_id])
+
+    def entries_at(self, user_id: str, fire_at: datetime) -> list[AlarmEntry]:
+        """사용자 시간대 기준으로 fire_at(UTC)에 울리는 약물 (발송 원장에서 슬롯 복원 시 사용)"""
+        local = fire_at.astimezone(self.timezone_of(user_id))
+        minute = local.hour * 60 + local.minute
+        with self._lock:
+            return [
+                entry for entry in map(self._entries.get, self._user_medicines.get(user_id, ()))
+                if minute in entry.minutes and entry.days_mask & (1 << local.weekday())
+            ]
+
+    def next_fire_at(self) -> Optional[datetime]:
+        """가장 빠른 울림 시각 (없으면 None)"""
+        with self._lock:
+            while self._heap and self._is_stale(self._heap[0]):
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(
+        self,
+        until: datetime,
+        not_before: Optional[datetime] = None
+    ) -> dict[tuple[str, datetime], list[AlarmEntry]]:
+        """
+        until(UTC)까지 울려야 할 슬롯을 꺼내 (user_id, 울림 시각) 단위로 그룹화
+        꺼낸 슬롯은 다음 울림 시각으로 다시 계산하며,
+        not_before보다 오래된 슬롯은 발송하지 않고 건너뜀
+        """
+        due: dict[tuple[str, datetime], list[AlarmEntry]] = {}
+        skipped = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= until:
+                item = heapq.heappop(self._heap)
+                if self._is_stale(item):
+                    continue
+
+                fire_at, version, medicine_id, minute = item
+                entry = self._entries[medicine_id]
+                heapq.heappush(self._heap, (
+                    next_fire_at(entry.days_mask, minute, self.timezone_of(entry.user_id), fire_at),
+                    version, medicine_id, minute
+                ))
+
+                if not_before is not None and fire_at < not_before:
+                    skipped += 1
+                    continue
+                group = due.setdefault((entry.user_id, fire_at), [])
+                if entry not in group:
+                    group.append(entry)
+
+            if until > self._cursor:
+                self._cursor = until
+
+        if skipped:
+            print(f"[AlarmIndex] 재처리 범위를 벗어난 슬롯 {skipped}개 건너뜀")
+        return due
+
+    def load(self, supabase, after: Optional[datetime] = None):
+        """medicines/profiles 전체를 페이지 단위로 읽어 인덱스를 재구성"""
+        profiles = list(self._fetch_pages(supabase, "profiles", PROFILE_COLUMNS))
+        rows = list(self._fetch_pages(supabase, "medicines", INDEX_COLUMNS))
+
+        with self._lock:
+            self._entries.clear()
+            self._user_medicines.clear()
+            self._timezones.clear()
+            self._heap.clear()
+            self._versions.clear()
+            self._live_slots = 0
+            self._cursor = after or datetime.now(timezone.utc)
+            self._last_updated_at = None
+            self._last_profile_updated_at = None
+
+            for profile in profiles:
+                self.set_timezone(profile["id"], profile.get("timezone"))
+                self._last_profile_updated_at = _max_updated_at(self._last_profile_updated_at, profile)
+            for row in rows:
+                self.upsert(row)
+                self._last_updated_at = _max_updated_at(self._last_updated_at, row)
+
+        self._last_reconciled = time.monotonic()
+        self.loaded = True
+        print(f"[AlarmIndex] 전체 로드 완료: 약물 {len(self._entries)}개, 슬롯 {len(self._heap)}개")
+
+    def refresh(self, supabase, after: Optional[datetime] = None):
+        """
+        updated_at이 바뀐 행만 가져와 반영하고, 주기적으로 삭제된 행을 정리
+        초기 로드가 실패한 상태면 after(마지막 처리 시각)부터 전체 로드하여 놓친 슬롯을 재처리
+        """
+        if not self.loaded:
+            self.load(supabase, after)
+            return
+
+        # 같은 시각에 기록된 행을 놓치지 않도록 gte 사용 (중복 반영은 멱등)
+        profiles = self._fetch_pages(
+            supabase, "profiles", PROFILE_COLUMNS, since=self._last_profile_updated_at
+        )
+        for profile in profiles:
+            self.set_timezone(profile["id"], profile.get("timezone"))
+            self._last_profile_updated_at = _max_updated_at(self._last_profile_updated_at, profile)
+
+        rows = self._fetch_pages(supabase, "medicines", INDEX_COLUMNS, since=self._last_updated_at)
+        for row in rows:
+            if self._is_unchanged(row):
+                continue
+            self.upsert(row)
+            self._last_updated_at = _max_updated_at(self._last_updated_at, row)
+
+        if time.monotonic() - self._last_reconciled >= self.reconcile_interval:
+            self._reconcile_deletions(supabase)
+
+    def _schedule(self, entry: AlarmEntry):
+        """약물의 모든 슬롯을 새 버전으로 힙에 추가 (기존 항목은 stale 처리)"""
+        if entry.medicine_id not in self._versions:
+            self._live_slots += len(entry.minutes)
+        self._version += 1
+        self._versions[entry.medicine_id] = self._version
+        tz = self.timezone_of(entry.user_id)
+        for minute in entry.minutes:
+            heapq.heappush(self._heap, (
+                next_fire_at(entry.days_mask, minute, tz, self._cursor),
+                self._version, entry.medicine_id, minute
+            ))
+        self._compact_if_needed()
+
+    def _is_stale(self, item: tuple[datetime, int, str, int]) -> bool:
+        return self._versions.get(item[2]) != item[1]
+
+    def _is_unchanged(self, row: dict) -> bool:
+        """gte 경계에서 다시 읽힌 행은 슬롯 재계산을 생략"""
+        entry = self._entries.get(row.get("id"))
+        if entry is None:
+            return False
+        return (
+            entry.user_id == row.get("user_id")
+            and entry.name == row.get("name", "")
+            and entry.timing == row.get("timing", "")
+            and entry.days_mask == days_to_mask(row.get("days"))
+            and entry.minutes == parse_minutes(row.get("times"))
+        )
+
+    def _compact_if_needed(self):
+        """지연 삭제된 항목이 절반을 넘으면 힙 재구성"""
+        if len(self._heap) > 2 * self._live_slots + 64:
+            self._heap = [item for item in self._heap if not self._is_stale(item)]
+            heapq.heapify(self._heap)
+
+    def _reconcile_deletions(self, supabase):
+        """DB에 더 이상 없는 약물 id를 인덱스에서 제거 (id 컬럼만 조회)"""
+        live_ids = {row["id"] for row in self._fetch_pages(supabase, "medicines", "id")}
+        with self._lock:
+            removed = [medicine_id for medicine_id in self._entries if medicine_id not in live_ids]
+            for medicine_id in removed:
+                self.remove(medicine_id)
+        self._last_reconciled = time.monotonic()
+        if removed:
+            print(f"[AlarmIndex] 삭제된 약물 {len(removed)}개 정리")
+
+    @staticmethod
+    def _fetch_pages(supabase, table: str, columns: str, since: Optional[str] = None):
+        """
+        PostgREST 응답 행 수 제한을 넘기 위해 range로 페이지 조회
+        since가 있으면 updated_at이 since 이후인 행만 updated_at 순으로 조회
+        """
+        start = 0
+        while True:
+            query = supabase.table(table).select(columns)
+            if since:
+                query = query.gte("updated_at", since).order("updated_at")
+            result = query.order("id").range(start, start + PAGE_SIZE - 1).execute()
+            rows = result.data or []
+            yield from rows
+            if len(rows) < PAGE_SIZE:
+                break
+            start += PAGE_SIZE
+
+
+def _max_updated_at(current: Optional[str], row: dict) -> Optional[str]:
+    updated_at = row.get("updated_at")
+    if updated_at and (current is None or updated_at > current):
+        return updated_at
+    return current
@@ -1,13 +1,27 @@
 """
 알람 스케줄러 서비스
-- 매분 실행되어 알람 시간을 체크하고 Push 알림 발송
+- 가장 빠른 울림 시각까지 대기 후 알람을 체크하고 Push 알림 발송
+- 약물 조회는 사용자 시간대 기준 다음 울림 시각 힙(AlarmIndex)으로 처리
+- 알림은 아웃박스에 기록만 하고 발송은 PushDeliveryWorker가 별도로 처리
+- 다중 인스턴스 배포 시 SchedulerCoordinator로 리더/샤드 조율
+- 마지막 처리 시각(watermark) 이후 놓친 슬롯을 일괄 재처리, 발송 원장으로 중복 발송 방지
 """
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 import asyncio
 
+from app.core.config import settings
 from app.core.supabase import get_supabase_admin
-from app.api.endpoints.push import send_push_to_user
+from app.services.alarm_index import AlarmEntry, AlarmIndex
+from app.services.missed_dose_detector import FiredSlot, missed_dose_detector
+from app.services.push_delivery import push_delivery
+from app.services.push_fanout import PushMessage, push_fanout
+from app.services.scheduler_lease import SchedulerCoordinator
+from app.services.scheduler_store import create_scheduler_store
+
+WATERMARK_KEY = "alarm_tick"
+ERROR_RETRY_SECONDS = 5
+LEDGER_PRUNE_HOURS = 6  # 발송 원장 정리 주기 (시간)
 
 
 class AlarmScheduler:
@@ -16,6 +30,18 @@ class AlarmScheduler:
     def __init__(self):
         self.is_running = False
         self._task: Optional[asyncio.Task] = None
+        self.index = AlarmIndex(
+            reconcile_interval=settings.ALARM_INDEX_RECONCILE_MINUTES * 60,
+            default_timezone=settings.DEFAULT_TIMEZONE
+        )
+        self.store = create_scheduler_store()
+        self.coordinator = SchedulerCoordinator(
+            mode=settings.SCHEDULER_COORDINATION,
+            store=self.store,
+            ttl_seconds=settings.SCHEDULER_LEASE_TTL_SECONDS
+        )
+        self._last_processed: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
 
     async def start(self):
         """스케줄러 시작"""
@@ -25,8 +51,59 @@ class AlarmScheduler:
 
         self.is_running = True
         print("[AlarmScheduler] 스케줄러 시작")
+
+        # 마지막 처리 시각 복원 (재시작/배포 중 놓친 슬롯을 첫 틱에서 재처리)
+        await self._restore_watermark()
+
+        # 알람 인덱스 초기 로드 - watermark 이후의 울림 시각부터 계산 (실패 시 첫 틱에서 재시도)
+        try:
+            await asyncio.to_thread(
+                self.index.load, get_supabase_admin(), self._last_processed
+            )
+        except Exception as e:
+            print(f"[AlarmScheduler] 알람 인덱스 로드 오류: {e}")
+
+        await self.coordinator.sync()
+        await self._recover_fired_slots()
         self._task = asyncio.create_task(self._run_loop())
 
+    async def _restore_watermark(self):
+        try:
+            watermark = await asyncio.to_thread(self.store.get_watermark, WATERMARK_KEY)
+            if watermark:
+                self._last_processed = datetime.fromisoformat(watermark)
+                print(f"[AlarmScheduler] 마지막 처리 시각 복원: {watermark}")
+        except Exception as e:
+            print(f"[AlarmScheduler] watermark 조회 오류: {e}")
+
+    async def _recover_fired_slots(self):
+        """
+        재시작 직전에 발송했지만 미복용 검사 전이던 슬롯을 발송 원장에서 복원
+        (메모리에만 있던 검사 대상이 프로세스 종료로 사라지지 않도록 함, 재검사는 멱등)
+        """
+        if not self.index.loaded:
+            return
+        since = datetime.now(timezone.utc) - timedelta(minutes=settings.MISSED_DOSE_RECOVERY_MINUTES)
+        try:
+            deliveries = await asyncio.to_thread(self.store.list_deliveries, since.isoformat())
+        except Exception as e:
+            print(f"[AlarmScheduler] 발송 원장 조회 오류: {e}")
+            return
+
+        slots = []
+        for user_id, fire_minute in deliveries:
+            if not self.coordinator.owns(user_id):
+                continue
+            fire_at = datetime.fromisoformat(fire_minute)
+            local = fire_at.astimezone(self.index.timezone_of(user_id))
+            slots.extend(
+                FiredSlot(user_id, m.medicine_id, m.name, f"{local:%H:%M}", fire_at)
+                for m in self.index.entries_at(user_id, fire_at)
+            )
+        if slots:
+            missed_dose_detector.record(slots)
+            print(f"[AlarmScheduler] 미복용 검사 대상 {len(slots)}개 복원")
+
     async def stop(self):
         """스케줄러 중지"""
         self.is_running = False
@@ -36,16 +113,30 @@ class AlarmScheduler:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        await self.coordinator.release()
         print("[AlarmScheduler] 스케줄러 중지")
 
+    def notify_changed(self):
+        """약물/시간대 변경 시 대기 중인 루프를 깨워 다음 울림 시각을 다시 계산"""
+        self._wakeup.set()
+
+    def medicine_changed(self, row: dict):
+        """API로 등록/수정된 약물을 인덱스에 즉시 반영"""
+        self.index.upsert(row)
+        self.notify_changed()
+
+    def medicine_removed(self, medicine_id: str):
+        """API로 삭제된 약물을 인덱스에서 즉시 제거"""
+        self.index.remove(medicine_id)
+        self.notify_changed()
+
     async def _run_loop(self):
-        """매분 실행되는 루프"""
+        """가장 빠른 울림 시각(또는 동기화 주기)까지 대기 후 처리하는 루프"""
         while self.is_running:
             try:
-                # 다음 정각까지 대기
-                now = datetime.now()
-                seconds_until_next_minute = 60 - now.second
-                await asyncio.sleep(seconds_until_next_minute)
+                if await self._sleep_until_next_event():
+                    # 변경 알림으로 깬 경우 대기 시간만 다시 계산
+                    continue
 
                 # 알람 체크 및 발송
                 await self.check_and_send_alarms()
@@ -54,81 +145,148 @@ class AlarmScheduler:
                 break
             except Exception as e:
                 print(f"[AlarmScheduler] 루프 오류: {e}")
-                await asyncio.sleep(60)  # 오류 시 1분 대기
+                await asyncio.sleep(ERROR_RETRY_SECONDS)
 
-    async def check_and_send_alarms(self):
-        """현재 시간의 알람 체크 및 Push 발송"""
-        now = datetime.now()
-        current_time = now.strftime("%H:%M")
-        current_day = ['일', '월', '화', '수', '목', '금', '토'][now.weekday() + 1 if now.weekday() < 6 else 0]
+    async def _sleep_until_next_event(self) -> bool:
+        """
+        다음 울림 시각과 동기화 주기 중 빠른 시점까지 대기
 
-        # Python의 weekday()는 월요일=0, 일요일=6
-        # 한국어 요일 배열과 맞추기 위해 조정
-        weekday_map = {0: '월', 1: '화', 2: '수', 3: '목', 4: '금', 5: '토', 6: '일'}
-        current_day = weekday_map[now.weekday()]
+        Returns:
+            bool: 변경 알림(notify_changed)으로 깨어났는지 여부
+        """
+        now = datetime.now(timezone.utc)
+        wake_at = now + timedelta(seconds=settings.ALARM_SYNC_INTERVAL_SECONDS)
+        next_fire = self.index.next_fire_at()
+        if next_fire is not None and next_fire < wake_at:
+            wake_at = next_fire
 
-        print(f"[AlarmScheduler] 알람 체크: {current_time} ({current_day})")
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(
+                self._wakeup.wait(),
+                timeout=max(0.0, (wake_at - now).total_seconds())
+            )
+            return True
+        except asyncio.TimeoutError:
+            return False
 
-        supabase = get_supabase_admin()
+    async def check_and_send_alarms(self):
+        """마지막 처리 시각 이후 현재까지 울려야 할 알람 발송"""
+        now = datetime.now(timezone.utc)
 
         try:
-            # 현재 시간에 해당하는 약물 조회
-            # medicines 테이블에서 times 배열에 현재 시간이 포함되고,
-            # days 배열에 현재 요일이 포함된 것들 조회
-            medicines_result = supabase.table("medicines").select("*").execute()
+            # 하트비트 갱신 (다중 인스턴스 조율)
+            await self.coordinator.sync()
 
-            if not medicines_result.data:
-                return
+            # 변경된 약물/시간대만 증분 반영
+            # (기동 시 로드가 실패했다면 저장된 watermark부터 전체 로드하여 놓친 분을 재처리)
+            if not self.index.loaded and self._last_processed is None:
+                await self._restore_watermark()
+            await asyncio.to_thread(
+                self.index.refresh, get_supabase_admin(), self._last_processed
+            )
 
-            # 사용자별로 알림 발송할 약물 그룹화
-            user_medicines = {}
+            # 울림 시각이 지난 슬롯을 힙에서 꺼냄 (재처리 범위를 벗어난 슬롯은 건너뜀)
+            due = self.index.pop_due(
+                until=now,
+                not_before=now - timedelta(minutes=settings.ALARM_CATCHUP_MAX_MINUTES)
+            )
 
-            for medicine in medicines_result.data:
-                # times 배열에 현재 시간이 포함되는지 확인
-                times = medicine.get("times", [])
-                if current_time not in times:
+            # (user_id, 울림 시각) 단위 메시지 구성
+            pending: dict[tuple[str, str], PushMessage] = {}
+            fired: dict[tuple[str, str], list[FiredSlot]] = {}
+            delayed_count = 0
+            for (user_id, fire_at), medicines in due.items():
+                if not self.coordinator.owns(user_id):
                     continue
+                delayed = now - fire_at >= timedelta(minutes=1)
+                delayed_count += delayed
+                local = fire_at.astimezone(self.index.timezone_of(user_id))
+                key = (user_id, fire_at.isoformat())
+                pending[key] = self._build_message(user_id, medicines, local, delayed=delayed)
+                fired[key] = [
+                    FiredSlot(user_id, m.medicine_id, m.name, f"{local:%H:%M}", fire_at)
+                    for m in medicines
+                ]
 
-                # days 배열에 현재 요일이 포함되는지 확인
-                days = medicine.get("days", [])
-                # days가 비어있으면 매일로 간주
-                if days and current_day not in days:
-                    continue
+            if pending:
+                if delayed_count:
+                    print(f"[AlarmScheduler] 지연된 알람 {delayed_count}건 재처리")
 
-                user_id = medicine.get("user_id")
-                if not user_id:
-                    continue
+                # 발송 원장 선점: 이미 발송된 (user_id, 울림 시각)은 제외
+                claimed = await self._claim(list(pending))
+                messages = [pending[key] for key in pending if key in claimed]
 
-                if user_id not in user_medicines:
-                    user_medicines[user_id] = []
-                user_medicines[user_id].append(medicine)
-
-            # 각 사용자에게 Push 발송
-            for user_id, medicines in user_medicines.items():
-                medicine_names = [m["name"] for m in medicines]
-                timing_text = self._get_timing_text(medicines[0].get("timing", ""))
-
-                title = "💊 복약 시간입니다!"
-                body = f"{current_time} {timing_text}\n{', '.join(medicine_names)}"
-
-                result = await send_push_to_user(
-                    user_id=user_id,
-                    title=title,
-                    body=body,
-                    data={
-                        "type": "alarm",
-                        "time": current_time,
-                        "medicines": medicine_names,
-                        "medicine_ids": [m["id"] for m in medicines]
-                    },
-                    tag=f"alarm-{current_time}-{user_id}"
-                )
-
-                print(f"[AlarmScheduler] {user_id}: {len(medicine_names)}개 약 알림 발송 "
-                      f"(성공: {result['sent']}, 실패: {result['failed']})")
+                # 미복용 감지 대상으로 등록
+                missed_dose_detector.record([
+                    slot for key in pending if key in claimed for slot in fired[key]
+                ])
+
+                if messages:
+                    await self._enqueue(messages)
 
         except Exception as e:
             print(f"[AlarmScheduler] 알람 체크 오류: {e}")
+            return
+
+        await self._advance_watermark(now)
+
+    async def _claim(self, keys: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        """발송 원장 선점 (원장 장애 시 알람 유실보다 중복을 택해 전체 발송)"""
+        try:
+            return await asyncio.to_thread(self.store.claim_deliveries, keys)
+        except Exception as e:
+            print(f"[AlarmScheduler] 발송 원장 기록 오류: {e}")
+            return set(keys)
+
+    async def _enqueue(self, messages: list[PushMessage]):
+        """아웃박스에 기록 (아웃박스 장애 시 알람 유실을 막기 위해 직접 발송)"""
+        try:
+            await push_delivery.enqueue(messages)
+            print(f"[AlarmScheduler] 알림 {len(messages)}건 발송 대기열 등록")
+        except Exception as e:
+            print(f"[AlarmScheduler] 아웃박스 기록 오류, 직접 발송: {e}")
+            stats = await push_fanout.send(messages)
+            print(f"[AlarmScheduler] 알림 발송: 사용자 {stats.users}명 "
+                  f"(성공: {stats.sent}, 실패: {stats.failed})")
+
+    async def _advance_watermark(self, processed_at: datetime):
+        """처리 완료 시각 기록 및 오래된 발송 원장 정리"""
+        previous = self._last_processed
+        self._last_processed = processed_at
+        try:
+            await asyncio.to_thread(self.store.set_watermark, WATERMARK_KEY, processed_at.isoformat())
+            if previous is None or previous.hour // LEDGER_PRUNE_HOURS != processed_at.hour // LEDGER_PRUNE_HOURS:
+                before = processed_at - timedelta(days=settings.ALARM_LEDGER_RETENTION_DAYS)
+                await asyncio.to_thread(self.store.prune_deliveries, before.isoformat())
+        except Exception as e:
+            print(f"[AlarmScheduler] watermark 기록 오류: {e}")
+
+    def _build_message(
+        self,
+        user_id: str,
+        medicines: list[AlarmEntry],
+        local: datetime,
+        delayed: bool = False
+    ) -> PushMessage:
+        """사용자 단위 알람 메시지 생성 (시각은 사용자 시간대 기준)"""
+        current_time = local.strftime("%H:%M")
+        medicine_names = [m.name for m in medicines]
+        timing_text = self._get_timing_text(medicines[0].timing)
+
+        return PushMessage(
+            user_id=user_id,
+            title="💊 복약 시간입니다!" if not delayed else "💊 복약 시간이 지났습니다!",
+            body=f"{current_time} {timing_text}\n{', '.join(medicine_names)}",
+            data={
+                "type": "alarm",
+                "time": current_time,
+                "medicines": medicine_names,
+                "medicine_ids": [m.medicine_id for m in medicines],
+                "delayed": delayed
+            },
+            tag=f"alarm-{current_time}-{user_id}"
+        )
 
     def _get_timing_text(self, timing: str) -> str:
         """복용 시기 텍스트 변환"""
@@ -0,0 +1,254 @@
+"""
+챗봇 답변 캐시
+- "이 약은 식전인가요?", "술 마셔도 되나요?" 처럼 반복되는 질문의 답변을 재사용
+- 키: 정규화한 질문(공백/문장부호/조사·어미 정리) + 복용 중인 약 목록(정렬 후 해시)
+- 표현만 조금 다른 질문은 문자 2-gram 유사도로 찾되, 식전/식후·부정어·용량(4000mg 등)처럼
+  답을 바꾸는 핵심어가 다르면 적중시키지 않음
+- TTL + 크기 제한 LRU, 적중률/절약한 응답 시간 통계 제공
+- 이전 대화가 있어도 혼자서 뜻이 정해지는 질문은 캐시를 사용하고,
+  앞 대화를 가리키는 후속 질문이나 앞에서 밝힌 개인 상황에 답이 달라지는 질문만 제외
+"""
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+import hashlib
+import re
+import time
+import unicodedata
+
+from app.core.config import settings
+from app.services.drug_names import normalize_drug_name
+
+CacheKey = tuple[str, str]  # (약 목록 해시, 정규화한 질문)
+
+# 너무 긴 질문은 개인 상황 설명이 섞여 있어 재사용하지 않음
+MAX_QUESTION_CHARS = 100
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+# 문장 끝 어미 (긴 것부터)
+_ENDINGS = (
+    "인가요", "인데요", "일까요", "할까요", "되나요", "하나요", "나요", "까요", "가요",
+    "에요", "예요", "어요", "아요", "죠", "요",
+)
+# 어절 끝 조사 (긴 것부터)
+_PARTICLES = (
+    "에서는", "에게는", "이랑", "에서", "에게", "한테", "까지", "부터", "으로", "하고",
+    "은", "는", "이", "가", "을", "를", "도", "에", "로", "와", "과", "랑", "의", "만",
+)
+# 답을 바꾸는 핵심어: 유사 질문이라도 이 단어 집합이 같아야 적중
+_KEY_TERMS = (
+    "식전", "식후", "식간", "공복", "아침", "점심", "저녁", "취침", "자기전",
+    "안", "않", "못", "말", "금지", "같이", "함께", "임신", "수유", "어린이", "아이",
+)
+# 용량/횟수 (숫자+단위): 값이 다르면 답이 달라지므로 핵심어와 같이 완전 일치해야 적중
+_DOSE_PATTERN = re.compile(r"\d+(?:\.\d+)?(?:mg|g|ml|정|알|회|시간)")
+# 앞 대화를 가리키는 표현 (공백 제거 후 포함 여부 / 어절 단위)
+_FOLLOW_UP_TERMS = (
+    "그럼", "그러면", "그렇다면", "그런데", "그래도", "그거", "그것", "그건", "그게", "그약",
+    "아까", "방금", "위에서", "앞에서", "말씀하신", "말씀드린", "말한", "얘기한", "이야기한",
+)
+_FOLLOW_UP_WORDS = frozenset({"또", "왜", "더", "그", "그때", "거기"})
+# 앞 대화에서 밝히면 이후 답이 달라지는 개인 상황
+_CONDITION_TERMS = (
+    "임신", "임산부", "수유", "모유", "어린이", "아이", "아기", "소아", "노인",
+    "알레르기", "알러지", "신장", "투석", "간질환", "간수치", "음주", "술",
+)
+# 이보다 짧은 질문("왜요?", "정말요?")은 앞 대화 없이는 뜻이 정해지지 않음
+MIN_STANDALONE_CHARS = 4
+
+
+def normalize_question(text: str) -> str:
+    """
+    비교용 질문 키 생성
+
+    예: "이 약은 식전인가요?" → "이 약 식전", "술 마셔도 되나요??" → "술 마셔 되"
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _PUNCTUATION.sub(" ", text)
+    words = text.split()
+    if not words:
+        return ""
+
+    for ending in _ENDINGS:
+        if words[-1].endswith(ending) and len(words[-1]) > len(ending):
+            words[-1] = words[-1][:-len(ending)]
+            break
+
+    normalized = []
+    for word in words:
+        for particle in _PARTICLES:
+            if word.endswith(particle) and len(word) > len(particle):
+                word = word[:-len(particle)]
+                break
+        normalized.append(word)
+    return " ".join(normalized)
+
+
+def depends_on_history(question: str, history: str = "") -> bool:
+    """
+    이전 대화에 따라 답이 달라지는 질문인지 (그런 질문은 캐시를 사용하지 않음)
+
+    예: "그럼 저녁에는요?", "아까 그 약은요?", "왜요?" → True
+        앞에서 "임신 중이에요"라고 한 뒤 "타이레놀 먹어도 되나요?" → True
+        "이 약은 식전인가요?" → False
+    """
+    if not history:
+        return False
+    normalized = normalize_question(question)
+    compact = normalized.replace(" ", "")
+    if len(compact) < MIN_STANDALONE_CHARS:
+        return True
+    if any(term in compact for term in _FOLLOW_UP_TERMS):
+        return True
+    if _FOLLOW_UP_WORDS.intersection(normalized.split()):
+        return True
+    history_compact = history.replace(" ", "")
+    return any(term in history_compact and term not in compact for term in _CONDITION_TERMS)
+
+
+def medicines_hash(medicines: list[str]) -> str:
+    """복용 중인 약 목록 해시 (순서/표기 차이 무시)"""
+    names = sorted({normalize_drug_name(name) for name in medicines or []} - {""})
+    return hashlib.sha1("|".join(names).encode("utf-8")).hexdigest()[:16]
+
+
+def _bigrams(question: str) -> frozenset[str]:
+    compact = question.replace(" ", "")
+    if len(compact) < 2:
+        return frozenset({compact})
+    return frozenset(compact[i:i + 2] for i in range(len(compact) - 1))
+
+
+def _key_terms(question: str) -> frozenset[str]:
+    compact = question.replace(" ", "")
+    terms = {term for term in _KEY_TERMS if term in compact}
+    terms.update(_DOSE_PATTERN.findall(compact))
+    return frozenset(terms)
+
+
+class _Entry(NamedTuple):
+    answer: dict
+    grams: frozenset[str]
+    terms: frozenset[str]
+    expires_at: float
+    latency_ms: float  # 원래 답변 생성에 걸린 시간 (적중 시 절약한 시간)
+
+
+class ChatAnswerCache:
+    """정규화 질문 기반 챗봇 답변 캐시 (이벤트 루프에서만 사용)"""
+
+    def __init__(
+        self,
+        ttl_seconds: int = 86400,
+        max_entries: int = 5000,
+        similarity: float = 0.85
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        # (약 목록 해시, 2-gram) → 해당 2-gram을 가진 질문 키
+        self._index: dict[tuple[str, str], set[CacheKey]] = {}
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def get(self, question: str, medicines: list[str]) -> Optional[dict]:
+        """캐시된 답변 ({"message", "suggestions"}) 또는 None"""
+        normalized = normalize_question(question)
+        if not normalized or len(normalized) > MAX_QUESTION_CHARS:
+            return None
+
+        context = medicines_hash(medicines)
+        key = (context, normalized)
+        entry = self._live(key)
+        if entry is not None:
+            self.exact_hits += 1
+        else:
+            key = self._nearest(context, normalized)
+            entry = self._live(key) if key is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.near_hits += 1
+
+        self._entries.move_to_end(key)
+        self.saved_ms += entry.latency_ms
+        return entry.answer
+
+    def put(self, question: str, medicines: list[str], answer: dict, latency_ms: float):
+        normalized = normalize_question(question)
+        if not normalized or len(normalized) > MAX_QUESTION_CHARS:
+            return
+
+        key = (medicines_hash(medicines), normalized)
+        self._remove(key)
+        entry = _Entry(
+            answer=answer,
+            grams=_bigrams(normalized),
+            terms=_key_terms(normalized),
+            expires_at=time.time() + self.ttl_seconds,
+            latency_ms=latency_ms
+        )
+        self._entries[key] = entry
+        for gram in entry.grams:
+            self._index.setdefault((key[0], gram), set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        hits = self.exact_hits + self.near_hits
+        return {
+            "entries": len(self._entries),
+            "lookups": lookups,
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_ms": round(self.saved_ms),
+        }
+
+    def _live(self, key: CacheKey) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.time():
+            self._remove(key)
+            return None
+        return entry
+
+    def _nearest(self, context: str, normalized: str) -> Optional[CacheKey]:
+        """같은 약 목록에서 2-gram Dice 계수가 기준 이상인 가장 비슷한 질문"""
+        grams = _bigrams(normalized)
+        terms = _key_terms(normalized)
+        shared: dict[CacheKey, int] = {}
+        for gram in grams:
+            for key in self._index.get((context, gram), ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        best_key, best_score = None, self.similarity
+        for key, count in shared.items():
+            entry = self._entries[key]
+            score = 2 * count / (len(grams) + len(entry.grams))
+            if score >= best_score and entry.terms == terms:
+                best_key, best_score = key, score
+        return best_key
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry.grams:
+            keys = self._index.get((key[0], gram))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[(key[0], gram)]
+
+
+# 싱글톤 인스턴스
+chat_answer_cache = ChatAnswerCache(
+    ttl_seconds=settings.CHAT_CACHE_TTL_SECONDS,
+    max_entries=settings.CHAT_CACHE_MAX_ENTRIES,
+    similarity=settings.CHAT_CACHE_SIMILARITY
+)
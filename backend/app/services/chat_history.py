@@ -0,0 +1,262 @@
+"""
+챗봇 대화 기록
+- 대화 메시지를 메모리에 먼저 반영하고 chat_messages 테이블에는 주기적으로 일괄 저장
+- 프롬프트에는 최근 N개 메시지 원문 + 그 이전 대화의 누적 요약만 넣고,
+  전체를 토큰 예산 안으로 잘라 대화가 길어져도 프롬프트 크기가 일정하게 유지됨
+- 사용자별 최근 기록을 메모리(LRU)에 두어 프롬프트 구성 시 DB를 읽지 않음
+  (서버 재시작 후 처음 질문할 때만 최근 메시지를 한 번 조회, 요약은 메모리에만 유지)
+"""
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+import asyncio
+import uuid
+
+from app.core.config import settings
+from app.core.supabase import get_supabase_admin
+from app.services.gemini_service import gemini_service
+
+
+class ChatTurn(NamedTuple):
+    """대화 메시지 한 건"""
+    message: str
+    is_user: bool
+    created_at: str  # ISO 8601 (UTC)
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정 (한글 등 비ASCII는 글자당 1토큰, ASCII는 4글자당 1토큰)"""
+    non_ascii = sum(1 for char in text if ord(char) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+def _format_turn(turn: ChatTurn) -> str:
+    return f"{'사용자' if turn.is_user else '어시스턴트'}: {turn.message}"
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+class _UserHistory:
+    def __init__(self, window: int):
+        self.recent: deque[ChatTurn] = deque(maxlen=window)
+        self.summary = ""
+        # 창에서 밀려났지만 아직 요약에 반영되지 않은 메시지
+        self.unsummarized: list[ChatTurn] = []
+        self.summarizing = False
+
+
+class ChatHistory:
+    """사용자별 대화 기록 (메모리 창 + 누적 요약 + 일괄 저장)"""
+
+    def __init__(
+        self,
+        window_messages: int = 10,
+        summary_batch: int = 6,
+        token_budget: int = 1200,
+        max_users: int = 10000,
+        flush_seconds: float = 2.0,
+        batch_size: int = 200
+    ):
+        self.window_messages = max(2, window_messages)
+        self.summary_batch = max(1, summary_batch)
+        self.token_budget = token_budget
+        self.max_users = max_users
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self.is_running = False
+        self._users: OrderedDict[str, _UserHistory] = OrderedDict()
+        self._pending_rows: list[dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._summary_tasks: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+    async def start(self):
+        """일괄 저장 루프 시작"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._flush_task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """저장 루프 중지 (남은 메시지는 마지막으로 한 번 저장)"""
+        self.is_running = False
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._summary_tasks):
+            task.cancel()
+        await self.flush()
+
+    async def prompt_context(self, user_id: str) -> str:
+        """
+        프롬프트에 넣을 이전 대화 (누적 요약 + 최근 메시지, 토큰 예산 이내)
+
+        Returns:
+            str: 이전 대화 텍스트 (기록이 없으면 빈 문자열)
+        """
+        history = await self._get(user_id)
+        budget = self.token_budget
+
+        summary = history.summary
+        if summary:
+            # 요약은 예산의 1/3까지만 사용
+            limit = budget // 3
+            while summary and estimate_tokens(summary) > limit:
+                summary = summary[:int(len(summary) * 0.9)]
+            budget -= estimate_tokens(summary)
+
+        # 최근 메시지를 최신 순으로 예산이 허락하는 만큼
+        lines: list[str] = []
+        for turn in reversed(history.recent):
+            line = _format_turn(turn)
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+        lines.reverse()
+
+        parts = []
+        if summary:
+            parts.append(f"(요약) {summary}")
+        parts.extend(lines)
+        return "\n".join(parts)
+
+    async def append(self, user_id: str, message: str, is_user: bool):
+        """메시지 기록 (메모리 즉시 반영, DB는 일괄 저장)"""
+        history = await self._get(user_id)
+        turn = ChatTurn(message, is_user, datetime.now(timezone.utc).isoformat())
+        if len(history.recent) == history.recent.maxlen:
+            history.unsummarized.append(history.recent[0])
+        history.recent.append(turn)
+
+        if _is_uuid(user_id):
+            self._pending_rows.append({
+                "user_id": user_id,
+                "message": turn.message,
+                "is_user": turn.is_user,
+                "created_at": turn.created_at
+            })
+            if len(self._pending_rows) >= self.batch_size:
+                self._wakeup.set()
+
+        if len(history.unsummarized) >= self.summary_batch and not history.summarizing:
+            task = asyncio.create_task(self._summarize(history))
+            self._summary_tasks.add(task)
+            task.add_done_callback(self._summary_tasks.discard)
+
+    async def flush(self) -> int:
+        """
+        대기 중인 메시지를 chat_messages에 일괄 저장
+
+        Returns:
+            int: 저장한 행 수
+        """
+        if not self._pending_rows:
+            return 0
+        rows, self._pending_rows = self._pending_rows, []
+        try:
+            await asyncio.to_thread(self._insert, rows)
+            return len(rows)
+        except Exception as e:
+            print(f"[ChatHistory] 일괄 저장 오류: {e}")
+
+        # 특정 사용자 행(프로필 없음 등) 때문에 전체가 실패하지 않도록 사용자별로 재시도
+        saved = 0
+        by_user: dict[str, list[dict]] = {}
+        for row in rows:
+            by_user.setdefault(row["user_id"], []).append(row)
+        for user_id, user_rows in by_user.items():
+            try:
+                await asyncio.to_thread(self._insert, user_rows)
+                saved += len(user_rows)
+            except Exception as e:
+                print(f"[ChatHistory] 저장 실패로 {len(user_rows)}건 폐기 (user: {user_id}): {e}")
+        return saved
+
+    def _insert(self, rows: list[dict]):
+        get_supabase_admin().table("chat_messages").insert(rows).execute()
+
+    async def _run_loop(self):
+        while self.is_running:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"[ChatHistory] 루프 오류: {e}")
+
+    async def _get(self, user_id: str) -> _UserHistory:
+        history = self._users.get(user_id)
+        if history is not None:
+            self._users.move_to_end(user_id)
+            return history
+
+        history = _UserHistory(self.window_messages)
+        if _is_uuid(user_id):
+            try:
+                turns = await asyncio.to_thread(self._load, user_id)
+                history.recent.extend(turns)
+            except Exception as e:
+                print(f"[ChatHistory] 기록 조회 오류: {e}")
+
+        # 조회 중 다른 요청이 먼저 채웠으면 그쪽을 사용
+        history = self._users.setdefault(user_id, history)
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return history
+
+    def _load(self, user_id: str) -> list[ChatTurn]:
+        """최근 메시지 조회 (메모리에 없는 사용자만)"""
+        result = get_supabase_admin().table("chat_messages").select(
+            "message,is_user,created_at"
+        ).eq("user_id", user_id).order("created_at", desc=True).limit(
+            self.window_messages
+        ).execute()
+        return [
+            ChatTurn(row["message"], row["is_user"], row["created_at"])
+            for row in reversed(result.data or [])
+        ]
+
+    async def _summarize(self, history: _UserHistory):
+        """창에서 밀려난 메시지를 누적 요약에 반영"""
+        history.summarizing = True
+        try:
+            turns = list(history.unsummarized)
+            summary = await gemini_service.summarize_conversation(
+                history.summary, "\n".join(_format_turn(turn) for turn in turns)
+            )
+            if summary is not None:
+                history.summary = summary
+                del history.unsummarized[:len(turns)]
+            elif len(history.unsummarized) > self.summary_batch * 3:
+                # 요약이 계속 실패하면 가장 오래된 메시지부터 버림
+                del history.unsummarized[:self.summary_batch]
+        finally:
+            history.summarizing = False
+
+
+# 싱글톤 인스턴스
+chat_history = ChatHistory(
+    window_messages=settings.CHAT_HISTORY_WINDOW_MESSAGES,
+    summary_batch=settings.CHAT_HISTORY_SUMMARY_BATCH,
+    token_budget=settings.CHAT_HISTORY_TOKEN_BUDGET,
+    max_users=settings.CHAT_HISTORY_MAX_USERS,
+    flush_seconds=settings.CHAT_HISTORY_FLUSH_SECONDS,
+    batch_size=settings.CHAT_HISTORY_BATCH_SIZE
+)
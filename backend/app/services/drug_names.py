@@ -0,0 +1,36 @@
+"""
+약물 이름 정규화
+- OCR/사용자 입력의 표기 차이(공백, 대소문자, 함량, 제형, 괄호 부가정보)를 제거하여
+  같은 약을 같은 키로 비교하기 위한 유틸리티
+"""
+import re
+
+# 괄호 안 부가정보: "타이레놀정(아세트아미노펜)" → "타이레놀정"
+_PARENTHESES = re.compile(r"[\(\[（][^\)\]）]*[\)\]）]")
+# 함량: 5mg, 0.5 g, 10밀리그램, 100㎎, 2.5mg/5ml, 복합제 5/50mg
+_STRENGTH = re.compile(
+    r"\d+(?:[.,]\d+)?(?:\s*/\s*\d+(?:[.,]\d+)?)*\s*(?:mg|mcg|µg|μg|g|ml|mL|iu|IU|%|㎎|㎍|㎖|밀리그램|마이크로그램|그램|밀리리터|단위)"
+    r"(?:\s*/\s*\d*(?:[.,]\d+)?\s*(?:ml|mL|㎖|g|정|캡슐))?",
+    re.IGNORECASE,
+)
+# 제형 접미사 (긴 것부터)
+_DOSAGE_FORMS = (
+    "서방정", "장용정", "필름코팅정", "연질캡슐", "경질캡슐", "캡슐", "츄정", "구강붕해정",
+    "정", "시럽", "현탁액", "액", "산", "과립", "주사", "주", "크림", "연고", "패치",
+)
+
+
+def normalize_drug_name(name: str) -> str:
+    """
+    비교용 약물 키 생성
+
+    예: "암로디핀정 5mg" → "암로디핀", "Aspirin 100 mg" → "aspirin"
+    """
+    text = _PARENTHESES.sub(" ", name or "")
+    text = _STRENGTH.sub(" ", text)
+    text = re.sub(r"\s+", "", text).lower()
+    for form in _DOSAGE_FORMS:
+        if text.endswith(form) and len(text) > len(form):
+            text = text[:-len(form)]
+            break
+    return text
@@ -0,0 +1,227 @@
+"""
+DUR(의약품 안심사용) 병용금기 인덱스
+- 식약처 DUR 병용금기 CSV(성분 A/B, 금기 사유)와 품목 CSV(제품명 → 성분)를 성분 id 인덱스로 컴파일
+- n개 약물 검사는 O(n²) dict 조회 (LLM 호출 없음, 결정적)
+- 컴파일 결과는 바이너리 스냅샷(pickle)으로 저장하여 기동 시 CSV를 다시 파싱하지 않음
+- 원본 CSV가 바뀌면(크기/수정 시각) 스냅샷을 다시 만듦
+  (스냅샷에 원본 fingerprint를 함께 저장하므로 CSV 없이 스냅샷만 배포해도 그대로 로드)
+"""
+from typing import Optional
+import csv
+import os
+import pickle
+import threading
+
+from app.core.config import settings
+from app.services.drug_names import normalize_drug_name
+
+SNAPSHOT_VERSION = 1
+SEVERITY_RANK = {"high": 3, "medium": 2, "low": 1}
+
+# CSV 헤더 후보 (직접 만든 파일 / 식약처 공공데이터 파일)
+INGREDIENT_A_COLUMNS = ("ingredient_a", "성분명A", "DUR성분명A")
+INGREDIENT_B_COLUMNS = ("ingredient_b", "성분명B", "DUR성분명B")
+SEVERITY_COLUMNS = ("severity", "심각도")
+DESCRIPTION_COLUMNS = ("description", "금기내용", "상세정보", "비고")
+PRODUCT_NAME_COLUMNS = ("product_name", "제품명", "품목명")
+PRODUCT_INGREDIENT_COLUMNS = ("ingredient", "성분명", "주성분명", "DUR성분명")
+
+# 염/수화물 표기는 사용자 입력에서 흔히 생략됨: "암로디핀베실산염" → "암로디핀"
+_SALT_SUFFIXES = (
+    "베실산염", "염산염", "말레산염", "타르타르산염", "숙신산염", "황산염", "메실산염",
+    "칼슘수화물", "나트륨수화물", "칼슘", "나트륨", "칼륨", "수화물",
+)
+
+
+def _column(row: dict, candidates: tuple[str, ...]) -> str:
+    for name in candidates:
+        value = row.get(name)
+        if value:
+            return value.strip()
+    return ""
+
+
+def _name_keys(name: str) -> set[str]:
+    """이름 하나에서 조회 키 생성 (정규화 이름 + 염 표기를 뗀 이름)"""
+    key = normalize_drug_name(name)
+    keys = {key} if key else set()
+    for suffix in _SALT_SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix):
+            keys.add(key[:-len(suffix)])
+            break
+    return keys
+
+
+def _source_fingerprint(paths: list[str]) -> tuple:
+    return tuple(
+        (path, os.path.getsize(path), os.path.getmtime(path)) if os.path.exists(path) else (path, None, None)
+        for path in paths
+    )
+
+
+def _snapshot_is_current(stored: tuple, fingerprint: tuple) -> bool:
+    """현재 있는 원본 파일이 모두 스냅샷을 만들 때와 같으면 True (없는 파일은 비교하지 않음)"""
+    stored_by_path = {entry[0]: entry for entry in stored or ()}
+    return all(
+        stored_by_path.get(entry[0]) == entry
+        for entry in fingerprint
+        if entry[1] is not None
+    )
+
+
+class DurIndex:
+    """성분 id 기반 병용금기 조회 인덱스"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ingredients: list[str] = []
+        # 정규화 이름 → 성분 id 목록 (복합제는 여러 개)
+        self.aliases: dict[str, tuple[int, ...]] = {}
+        # (작은 id, 큰 id) → (severity, description)
+        self.pairs: dict[tuple[int, int], tuple[str, str]] = {}
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.pairs)
+
+    def load(
+        self,
+        interactions_csv: str,
+        products_csv: Optional[str] = None,
+        snapshot_path: Optional[str] = None
+    ) -> bool:
+        """
+        스냅샷이 최신이면 스냅샷을, 아니면 CSV를 컴파일하여 로드
+
+        Returns:
+            bool: 인덱스 로드 여부 (CSV가 없으면 False - LLM만 사용)
+        """
+        sources = [path for path in (interactions_csv, products_csv) if path]
+        fingerprint = _source_fingerprint(sources)
+
+        if snapshot_path and os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, "rb") as f:
+                    snapshot = pickle.load(f)
+                if (
+                    snapshot.get("version") == SNAPSHOT_VERSION
+                    and _snapshot_is_current(snapshot.get("fingerprint"), fingerprint)
+                ):
+                    self._apply(snapshot)
+                    return True
+            except Exception as e:
+                print(f"[DUR] 스냅샷 로드 오류, CSV에서 다시 생성: {e}")
+
+        if not os.path.exists(interactions_csv):
+            return False
+
+        snapshot = self.compile(interactions_csv, products_csv)
+        snapshot["fingerprint"] = fingerprint
+        self._apply(snapshot)
+
+        if snapshot_path:
+            tmp_path = f"{snapshot_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, snapshot_path)
+        return True
+
+    @staticmethod
+    def compile(interactions_csv: str, products_csv: Optional[str] = None) -> dict:
+        """CSV를 스냅샷 dict로 컴파일"""
+        ingredient_ids: dict[str, int] = {}
+        ingredients: list[str] = []
+        aliases: dict[str, set[int]] = {}
+
+        def ingredient_id(name: str) -> Optional[int]:
+            keys = _name_keys(name)
+            if not keys:
+                return None
+            canonical = normalize_drug_name(name)
+            if canonical not in ingredient_ids:
+                ingredient_ids[canonical] = len(ingredients)
+                ingredients.append(name)
+            item_id = ingredient_ids[canonical]
+            for key in keys:
+                aliases.setdefault(key, set()).add(item_id)
+            return item_id
+
+        pairs: dict[tuple[int, int], tuple[str, str]] = {}
+        with open(interactions_csv, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                a = ingredient_id(_column(row, INGREDIENT_A_COLUMNS))
+                b = ingredient_id(_column(row, INGREDIENT_B_COLUMNS))
+                if a is None or b is None or a == b:
+                    continue
+                severity = _column(row, SEVERITY_COLUMNS).lower()
+                if severity not in SEVERITY_RANK:
+                    severity = "high"  # DUR 병용금기
+                description = _column(row, DESCRIPTION_COLUMNS) or "병용금기 성분입니다."
+                key = (a, b) if a < b else (b, a)
+                current = pairs.get(key)
+                if current is None or SEVERITY_RANK[severity] > SEVERITY_RANK[current[0]]:
+                    pairs[key] = (severity, description)
+
+        if products_csv and os.path.exists(products_csv):
+            with open(products_csv, encoding="utf-8-sig", newline="") as f:
+                for row in csv.DictReader(f):
+                    product_keys = _name_keys(_column(row, PRODUCT_NAME_COLUMNS))
+                    # 복합제 성분은 "/", "," 또는 "+"로 구분
+                    raw = _column(row, PRODUCT_INGREDIENT_COLUMNS).replace("+", "/").replace(",", "/")
+                    ids = {ingredient_id(part) for part in raw.split("/") if part.strip()}
+                    ids.discard(None)
+                    for key in product_keys:
+                        aliases.setdefault(key, set()).update(ids)
+
+        return {
+            "version": SNAPSHOT_VERSION,
+            "ingredients": ingredients,
+            "aliases": {key: tuple(sorted(ids)) for key, ids in aliases.items()},
+            "pairs": pairs,
+        }
+
+    def _apply(self, snapshot: dict):
+        with self._lock:
+            self.ingredients = snapshot["ingredients"]
+            self.aliases = snapshot["aliases"]
+            self.pairs = snapshot["pairs"]
+
+    def resolve(self, name: str) -> Optional[tuple[int, ...]]:
+        """약물 이름 → 성분 id 목록 (인덱스에 없으면 None)"""
+        for key in _name_keys(name):
+            ids = self.aliases.get(key)
+            if ids:
+                return ids
+        return None
+
+    def lookup(self, ids1: tuple[int, ...], ids2: tuple[int, ...]) -> Optional[dict]:
+        """
+        두 약물(성분 id 목록) 간 병용금기 조회
+
+        Returns:
+            dict | None: 가장 심각한 상호작용 {"severity", "description"} (없으면 None)
+        """
+        found: Optional[tuple[str, str]] = None
+        for a in ids1:
+            for b in ids2:
+                if a == b:
+                    continue
+                hit = self.pairs.get((a, b) if a < b else (b, a))
+                if hit and (found is None or SEVERITY_RANK[hit[0]] > SEVERITY_RANK[found[0]]):
+                    found = hit
+        if found is None:
+            return None
+        return {"severity": found[0], "description": found[1]}
+
+
+# 싱글톤 인스턴스 (lifespan에서 load)
+dur_index = DurIndex()
+
+
+def load_dur_index() -> bool:
+    """설정된 경로에서 DUR 인덱스 로드"""
+    return dur_index.load(
+        settings.DUR_INTERACTIONS_CSV,
+        settings.DUR_PRODUCTS_CSV or None,
+        settings.DUR_SNAPSHOT_PATH or None
+    )
@@ -1,11 +1,34 @@
 import google.generativeai as genai
-from PIL import Image
-import io
+import asyncio
 import json
+import time
 import uuid
-from typing import Optional
+from functools import partial
+from typing import AsyncIterator, Optional, TypeVar
+from pydantic import ValidationError
 from app.core.config import settings
-from app.schemas.medicine import MedicineResult, DrugInteraction
+from app.schemas.gemini import (
+    ChatReply, ChatSummary, InteractionReport, PrescriptionExtraction, ScheduleReport
+)
+from app.schemas.medicine import MedicineResult, DrugInteraction, MealTimes
+from app.services.chat_cache import chat_answer_cache, depends_on_history
+from app.services.dur_index import dur_index
+from app.services.interaction_cache import DrugPair, interaction_cache, pair_key
+from app.services.llm_json import JsonOutput, StreamingJsonField
+from app.services.schedule_rules import build_schedule_times
+from app.services.single_flight import SingleFlight
+
+T = TypeVar("T")
+
+# 응답 스키마/검증기 (호출마다 다시 만들지 않도록 모듈 로드 시 생성)
+PRESCRIPTION_OUTPUT = JsonOutput("prescription", PrescriptionExtraction)
+INTERACTION_OUTPUT = JsonOutput("interactions", InteractionReport)
+SCHEDULE_OUTPUT = JsonOutput("schedule", ScheduleReport)
+CHAT_OUTPUT = JsonOutput("chat", ChatReply)
+CHAT_SUMMARY_OUTPUT = JsonOutput("chat_summary", ChatSummary)
+
+CHAT_EMPTY_MESSAGE = "죄송합니다. 답변을 생성하지 못했습니다."
+CHAT_ERROR_MESSAGE = "죄송합니다. 일시적인 오류가 발생했습니다. 다시 시도해주세요."
 
 # Configure Gemini
 genai.configure(api_key=settings.GOOGLE_API_KEY)
@@ -15,14 +38,103 @@ class GeminiService:
     def __init__(self):
         self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
         self.vision_model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        # 프로세스 전체 동시 호출 수 제한 (OCR 폭주 시에도 다른 요청이 굶지 않도록)
+        self._semaphore = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+        # 같은 내용의 상호작용/스케줄 LLM 호출이 동시에 들어오면 한 번만 실행
+        self.single_flight = SingleFlight()
 
-    async def analyze_prescription_image(self, image_data: bytes) -> dict:
+    async def _generate(
+        self,
+        contents,
+        model: Optional[genai.GenerativeModel] = None,
+        timeout: Optional[float] = None,
+        generation_config: Optional[dict] = None
+    ):
+        """
+        이벤트 루프를 막지 않는 Gemini 호출 (동시성 제한 + 제한 시간)
+
+        Raises:
+            asyncio.TimeoutError: 제한 시간 초과
+        """
+        async with self._semaphore:
+            return await asyncio.wait_for(
+                (model or self.model).generate_content_async(
+                    contents, generation_config=generation_config
+                ),
+                timeout=timeout or settings.GEMINI_TIMEOUT_SECONDS
+            )
+
+    async def _generate_stream(
+        self,
+        contents,
+        timeout: Optional[float] = None,
+        generation_config: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Gemini 스트리밍 호출 (응답 조각 텍스트를 도착하는 대로 반환)
+        동시성 슬롯은 스트림이 끝날 때까지 유지하고, 제한 시간은 스트림 전체에 적용
+
+        Raises:
+            asyncio.TimeoutError: 제한 시간 초과
+        """
+        deadline = asyncio.get_running_loop().time() + (timeout or settings.GEMINI_TIMEOUT_SECONDS)
+
+        def remaining() -> float:
+            return max(0.0, deadline - asyncio.get_running_loop().time())
+
+        async with self._semaphore:
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(
+                    contents, generation_config=generation_config, stream=True
+                ),
+                timeout=remaining()
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining())
+                except StopAsyncIteration:
+                    return
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # 텍스트가 없는 조각 (종료 사유/안전 필터 정보만 있는 경우)
+                    continue
+                if text:
+                    yield text
+
+    async def _generate_json(
+        self,
+        contents,
+        output: JsonOutput[T],
+        model: Optional[genai.GenerativeModel] = None,
+        timeout: Optional[float] = None
+    ) -> T:
+        """
+        응답 스키마로 JSON 출력을 강제하고 검증된 모델로 반환
+
+        Raises:
+            asyncio.TimeoutError: 제한 시간 초과
+            ValidationError: 복구 후에도 스키마에 맞지 않는 응답
+        """
+        response = await self._generate(
+            contents, model=model, timeout=timeout, generation_config=output.generation_config
+        )
+        text = response.text
+        if settings.GEMINI_RESPONSE_LOG_PATH:
+            await asyncio.to_thread(output.record, settings.GEMINI_RESPONSE_LOG_PATH, text)
+        return output.parse(text)
+
+    async def analyze_prescription_image(
+        self,
+        image_data: bytes,
+        mime_type: str = "image/jpeg"
+    ) -> dict:
         """
-        처방전 이미지를 분석하여 약물 정보를 추출합니다.
+        처방전 이미지(전처리된 인코딩 바이트)를 분석하여 약물 정보를 추출합니다.
         """
         try:
-            # 이미지 로드
-            image = Image.open(io.BytesIO(image_data))
+            image = {"mime_type": mime_type, "data": image_data}
 
             # OCR 및 약물 정보 추출 프롬프트
             prompt = """
@@ -50,58 +162,45 @@ class GeminiService:
             4. JSON 형식만 응답해주세요. 다른 텍스트는 포함하지 마세요.
             """
 
-            response = self.vision_model.generate_content([prompt, image])
-
-            # JSON 파싱
-            response_text = response.text.strip()
-            # JSON 블록 추출 (```json ... ``` 형식 처리)
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                json_lines = []
-                in_json = False
-                for line in lines:
-                    if line.startswith("```json"):
-                        in_json = True
-                        continue
-                    elif line.startswith("```"):
-                        in_json = False
-                        continue
-                    if in_json:
-                        json_lines.append(line)
-                response_text = "\n".join(json_lines)
-
-            result = json.loads(response_text)
+            result = await self._generate_json(
+                [prompt, image],
+                PRESCRIPTION_OUTPUT,
+                model=self.vision_model,
+                timeout=settings.GEMINI_VISION_TIMEOUT_SECONDS
+            )
 
             # MedicineResult 형식으로 변환
             medicines = []
-            for med in result.get("medicines", []):
-                confidence = med.get("confidence", 50)
+            for med in result.medicines:
+                confidence = med.confidence
                 status = "auto" if confidence >= 85 else "check" if confidence >= 60 else "review"
                 medicines.append(MedicineResult(
                     id=str(uuid.uuid4()),
-                    name=med.get("name", ""),
-                    dosage=med.get("dosage", ""),
-                    frequency=med.get("frequency", ""),
-                    timing=med.get("timing", "식후"),
-                    confidence=confidence,
-                    originalText=med.get("originalText", ""),
                     status=status,
-                    warning=None
+                    warning=None,
+                    **med.model_dump()
                 ))
 
             return {
                 "success": True,
                 "medicines": medicines,
-                "raw_text": result.get("raw_text", "")
+                "raw_text": result.raw_text
             }
 
-        except json.JSONDecodeError as e:
+        except ValidationError as e:
             return {
                 "success": False,
                 "medicines": [],
                 "raw_text": "",
                 "error": f"JSON 파싱 오류: {str(e)}"
             }
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "medicines": [],
+                "raw_text": "",
+                "error": "AI 응답 시간이 초과되었습니다. 다시 시도해주세요."
+            }
         except Exception as e:
             return {
                 "success": False,
@@ -116,19 +215,108 @@ class GeminiService:
         existing_medicines: list[str]
     ) -> list[DrugInteraction]:
         """
-        신규 약물과 기존 약물 간의 상호작용을 분석합니다.
+        신규 약물과 기존 약물(및 신규 약물끼리) 간의 상호작용을 분석합니다.
+        DUR 인덱스 → 쌍 단위 캐시 순으로 확인하고, 둘 다 모르는 쌍만 LLM에 질의합니다.
+        DUR에는 병용금기 쌍만 있으므로 DUR에 없는 쌍도 (중간/낮은 위험 확인을 위해) 캐시·LLM으로 확인합니다.
         """
+        # 정규화한 쌍 → 요청에 들어온 이름 그대로의 쌍 (응답 표시용)
+        pairs: dict[DrugPair, tuple[str, str]] = {}
+        for i, drug1 in enumerate(new_medicines):
+            for drug2 in new_medicines[i + 1:] + existing_medicines:
+                key = pair_key(drug1, drug2)
+                if key is not None and key not in pairs:
+                    pairs[key] = (drug1, drug2)
+        if not pairs:
+            return []
+
+        # DUR 병용금기에 있는 쌍만 인덱스 결과로 확정 (DUR에 없다고 상호작용이 없는 것은 아님)
+        known: dict[DrugPair, Optional[dict]] = {}
+        if dur_index.loaded:
+            resolved = {name: dur_index.resolve(name) for name in {*new_medicines, *existing_medicines}}
+            for key, (drug1, drug2) in pairs.items():
+                if resolved[drug1] and resolved[drug2]:
+                    found = dur_index.lookup(resolved[drug1], resolved[drug2])
+                    if found is not None:
+                        known[key] = found
+
+        unresolved = [key for key in pairs if key not in known]
+        if unresolved:
+            try:
+                known.update(await asyncio.to_thread(interaction_cache.get_many, unresolved))
+            except Exception as e:
+                print(f"Interaction cache read error: {str(e)}")
+
+        missing = sorted(key for key in pairs if key not in known)
+        if missing:
+            # 같은 쌍 집합을 동시에 묻는 요청(같은 약 목록 제출 등)은 LLM 호출 하나를 공유
+            fresh = await self.single_flight.do(
+                ("interactions", tuple(missing)),
+                partial(self._resolve_interactions, {key: pairs[key] for key in missing})
+            )
+            if fresh is not None:
+                known.update(fresh)
+
+        interactions = []
+        for key, (drug1, drug2) in pairs.items():
+            found = known.get(key)
+            if found:
+                interactions.append(DrugInteraction(
+                    drug1=drug1,
+                    drug2=drug2,
+                    severity=found["severity"],
+                    description=found["description"]
+                ))
+
+        return interactions
+
+    async def _resolve_interactions(
+        self,
+        pairs: dict[DrugPair, tuple[str, str]]
+    ) -> Optional[dict[DrugPair, Optional[dict]]]:
+        """
+        캐시에 없는 쌍을 LLM에 질의하고 결과를 캐시에 저장합니다.
+
+        Returns:
+            dict | None: 쌍별 결과 (None 값 = 상호작용 없음), 질의 실패 시 None
+        """
+        answers = await self._query_interactions(list(pairs.values()))
+        if answers is None:
+            return None
+
+        fresh = dict(zip(pairs, answers))
+        try:
+            await asyncio.to_thread(interaction_cache.put_many, fresh)
+        except Exception as e:
+            print(f"Interaction cache write error: {str(e)}")
+        return fresh
+
+    async def _query_interactions(
+        self,
+        pairs: list[tuple[str, str]]
+    ) -> Optional[list[Optional[dict]]]:
+        """
+        약물 쌍 목록의 상호작용을 LLM에 질의하여 쌍별 결과로 나눕니다.
+
+        Returns:
+            list | None: pairs와 같은 순서의 결과 (None 항목 = 상호작용 없음),
+                         호출/파싱 실패 시 None (캐시에 남기지 않음)
+        """
+        pair_lines = "\n".join(
+            f"{i}. {drug1} + {drug2}" for i, (drug1, drug2) in enumerate(pairs, 1)
+        )
+
         try:
             prompt = f"""
-            다음 약물들 간의 상호작용을 분석해주세요.
+            다음 약물 쌍들의 상호작용을 각각 분석해주세요.
 
-            신규 약물: {', '.join(new_medicines)}
-            기존 복용 약물: {', '.join(existing_medicines)}
+            약물 쌍:
+            {pair_lines}
 
             다음 JSON 형식으로 응답해주세요:
             {{
                 "interactions": [
                     {{
+                        "pair": 약물 쌍 번호 (숫자),
                         "drug1": "약물1 이름",
                         "drug2": "약물2 이름",
                         "severity": "high/medium/low",
@@ -140,46 +328,72 @@ class GeminiService:
             주의사항:
             1. 실제 의학적으로 알려진 상호작용만 포함해주세요.
             2. severity는 high(병용금기), medium(주의), low(경미)로 구분해주세요.
-            3. 상호작용이 없으면 빈 배열을 반환해주세요.
+            3. 상호작용이 없는 쌍은 포함하지 마세요. 모두 없으면 빈 배열을 반환해주세요.
             4. JSON 형식만 응답해주세요.
             """
 
-            response = self.model.generate_content(prompt)
-
-            # JSON 파싱
-            response_text = response.text.strip()
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                json_lines = []
-                in_json = False
-                for line in lines:
-                    if line.startswith("```json") or line.startswith("```"):
-                        in_json = not in_json
-                        continue
-                    if in_json:
-                        json_lines.append(line)
-                response_text = "\n".join(json_lines)
-
-            result = json.loads(response_text)
-
-            interactions = []
-            for interaction in result.get("interactions", []):
-                interactions.append(DrugInteraction(
-                    drug1=interaction.get("drug1", ""),
-                    drug2=interaction.get("drug2", ""),
-                    severity=interaction.get("severity", "low"),
-                    description=interaction.get("description", "")
-                ))
-
-            return interactions
+            result = await self._generate_json(prompt, INTERACTION_OUTPUT)
 
         except Exception as e:
             print(f"Drug interaction check error: {str(e)}")
-            return []
+            return None
+
+        answers: list[Optional[dict]] = [None] * len(pairs)
+        index_by_key = {pair_key(drug1, drug2): i for i, (drug1, drug2) in enumerate(pairs)}
+        for interaction in result.interactions:
+            number = interaction.pair
+            if number is not None and 1 <= number <= len(pairs):
+                index = number - 1
+            else:
+                # 번호가 없거나 잘못된 경우 약물 이름으로 매칭
+                index = index_by_key.get(pair_key(interaction.drug1, interaction.drug2))
+                if index is None:
+                    continue
+            answers[index] = {
+                "severity": interaction.severity,
+                "description": interaction.description
+            }
+
+        return answers
 
-    async def generate_schedule(self, medicines: list[dict]) -> list[dict]:
+    async def generate_schedule(
+        self,
+        medicines: list[dict],
+        meal_times: Optional[MealTimes] = None
+    ) -> list[dict]:
         """
         약물 정보를 기반으로 최적의 복용 스케줄을 생성합니다.
+        복용 횟수/시기를 규칙으로 해석하고, 해석하지 못한 약물만 LLM에 요청합니다.
+        """
+        meals = meal_times or MealTimes()
+        schedules: list[Optional[dict]] = []
+        unparsed: list[dict] = []
+        for medicine in medicines:
+            times = build_schedule_times(
+                medicine.get("frequency", ""), medicine.get("timing", ""), meals
+            )
+            if times is None:
+                unparsed.append(medicine)
+                schedules.append(None)
+            else:
+                schedules.append({"medicine_name": medicine.get("name", ""), "times": times})
+
+        if unparsed:
+            request_key = json.dumps(
+                [unparsed, meals.model_dump()], sort_keys=True, ensure_ascii=False, default=str
+            )
+            generated = iter(await self.single_flight.do(
+                ("schedule", request_key),
+                partial(self._generate_schedule_with_llm, unparsed, meals)
+            ))
+            # LLM 결과는 요청 순서대로 빈 자리에 채움 (누락 시 제외)
+            schedules = [s if s is not None else next(generated, None) for s in schedules]
+
+        return [s for s in schedules if s is not None]
+
+    async def _generate_schedule_with_llm(self, medicines: list[dict], meals: MealTimes) -> list[dict]:
+        """
+        규칙으로 해석하지 못한 약물의 복용 스케줄을 LLM으로 생성합니다.
         """
         try:
             medicines_info = json.dumps(medicines, ensure_ascii=False)
@@ -204,46 +418,25 @@ class GeminiService:
             1. 식전 약은 식사 30분 전 시간으로 설정
             2. 식후 약은 식사 직후 시간으로 설정
             3. 1일 1회는 아침, 1일 2회는 아침/저녁, 1일 3회는 아침/점심/저녁으로 배정
-            4. 기본 식사 시간: 아침 08:00, 점심 12:00, 저녁 18:00
+            4. 식사 시간: 아침 {meals.breakfast}, 점심 {meals.lunch}, 저녁 {meals.dinner}, 취침 {meals.bedtime}
             5. JSON 형식만 응답해주세요.
             """
 
-            response = self.model.generate_content(prompt)
-
-            response_text = response.text.strip()
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                json_lines = []
-                in_json = False
-                for line in lines:
-                    if line.startswith("```json") or line.startswith("```"):
-                        in_json = not in_json
-                        continue
-                    if in_json:
-                        json_lines.append(line)
-                response_text = "\n".join(json_lines)
-
-            result = json.loads(response_text)
-            return result.get("schedules", [])
+            result = await self._generate_json(prompt, SCHEDULE_OUTPUT)
+            return [schedule.model_dump() for schedule in result.schedules]
 
         except Exception as e:
             print(f"Schedule generation error: {str(e)}")
             return []
 
-    async def chat_response(
-        self,
-        message: str,
-        context: Optional[dict] = None
-    ) -> dict:
-        """
-        사용자 질문에 대한 AI 응답을 생성합니다.
-        """
-        try:
-            context_info = ""
-            if context and context.get("medicines"):
-                context_info = f"\n\n사용자가 현재 복용 중인 약: {', '.join(context['medicines'])}"
+    def _chat_prompt(self, message: str, context: Optional[dict] = None, history: str = "") -> str:
+        context_info = ""
+        if context and context.get("medicines"):
+            context_info = f"\n\n사용자가 현재 복용 중인 약: {', '.join(context['medicines'])}"
+        if history:
+            context_info += f"\n\n이전 대화:\n{history}"
 
-            prompt = f"""
+        return f"""
             너는 복약 관리 AI 어시스턴트야. 사용자의 약물 관련 질문에 친절하고 정확하게 답변해줘.
             {context_info}
 
@@ -262,36 +455,141 @@ class GeminiService:
             4. JSON 형식만 응답해주세요.
             """
 
-            response = self.model.generate_content(prompt)
-
-            response_text = response.text.strip()
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                json_lines = []
-                in_json = False
-                for line in lines:
-                    if line.startswith("```json") or line.startswith("```"):
-                        in_json = not in_json
-                        continue
-                    if in_json:
-                        json_lines.append(line)
-                response_text = "\n".join(json_lines)
-
-            result = json.loads(response_text)
+    async def chat_response(
+        self,
+        message: str,
+        context: Optional[dict] = None,
+        history: str = ""
+    ) -> dict:
+        """
+        사용자 질문에 대한 AI 응답을 생성합니다.
+        같은 약 목록으로 같은(비슷한) 질문을 받은 적이 있으면 캐시된 답변을 반환합니다.
+        (이전 대화에 따라 답이 달라지는 후속 질문은 캐시를 사용하지 않고,
+         이전 대화가 들어간 프롬프트의 답변은 캐시에 저장하지 않음)
+        """
+        medicines = (context or {}).get("medicines") or []
+        use_cache = not depends_on_history(message, history)
+        cached = chat_answer_cache.get(message, medicines) if use_cache else None
+        if cached is not None:
+            return {"success": True, **cached}
 
+        try:
+            started = time.perf_counter()
+            result = await self._generate_json(self._chat_prompt(message, context, history), CHAT_OUTPUT)
+
+            # 이전 대화(요약 포함)가 들어간 프롬프트의 답변은 개인 상황이 반영될 수 있어 공유 캐시에 저장하지 않음
+            if result.message and not history:
+                chat_answer_cache.put(
+                    message,
+                    medicines,
+                    {"message": result.message, "suggestions": result.suggestions},
+                    (time.perf_counter() - started) * 1000
+                )
             return {
                 "success": True,
-                "message": result.get("message", "죄송합니다. 답변을 생성하지 못했습니다."),
-                "suggestions": result.get("suggestions", [])
+                "message": result.message or CHAT_EMPTY_MESSAGE,
+                "suggestions": result.suggestions
             }
 
         except Exception as e:
             return {
                 "success": False,
-                "message": "죄송합니다. 일시적인 오류가 발생했습니다. 다시 시도해주세요.",
+                "message": CHAT_ERROR_MESSAGE,
                 "suggestions": []
             }
 
+    async def chat_response_stream(
+        self,
+        message: str,
+        context: Optional[dict] = None,
+        history: str = ""
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        사용자 질문에 대한 AI 응답을 생성되는 대로 전달합니다.
+
+        Yields:
+            ("token", {"text"}): 답변 조각 (JSON 응답의 message 값만 디코딩)
+            ("done", {"success", "message", "suggestions"}): 전체 답변과 후속 질문 제안
+        """
+        medicines = (context or {}).get("medicines") or []
+        use_cache = not depends_on_history(message, history)
+        cached = chat_answer_cache.get(message, medicines) if use_cache else None
+        if cached is not None:
+            yield "token", {"text": cached["message"]}
+            yield "done", {"success": True, **cached}
+            return
+
+        answer = StreamingJsonField("message")
+        chunks: list[str] = []
+        streamed = False
+        started = time.perf_counter()
+        try:
+            async for chunk in self._generate_stream(
+                self._chat_prompt(message, context, history),
+                generation_config=CHAT_OUTPUT.generation_config
+            ):
+                chunks.append(chunk)
+                text = answer.feed(chunk)
+                if text:
+                    streamed = True
+                    yield "token", {"text": text}
+
+            response_text = "".join(chunks)
+            if settings.GEMINI_RESPONSE_LOG_PATH:
+                await asyncio.to_thread(CHAT_OUTPUT.record, settings.GEMINI_RESPONSE_LOG_PATH, response_text)
+            result = CHAT_OUTPUT.parse(response_text)
+        except Exception as e:
+            print(f"Chat stream error: {str(e)}")
+            yield "done", {"success": False, "message": CHAT_ERROR_MESSAGE, "suggestions": []}
+            return
+
+        if result.message and not history:
+            chat_answer_cache.put(
+                message,
+                medicines,
+                {"message": result.message, "suggestions": result.suggestions},
+                (time.perf_counter() - started) * 1000
+            )
+        full_message = result.message or CHAT_EMPTY_MESSAGE
+        if not streamed:
+            # message 필드를 찾지 못한 경우(복구 파싱 등) 전체 답변을 한 번에 전달
+            yield "token", {"text": full_message}
+        yield "done", {"success": True, "message": full_message, "suggestions": result.suggestions}
+
+    async def summarize_conversation(self, summary: str, conversation: str) -> Optional[str]:
+        """
+        기존 요약에 오래된 대화를 합쳐 새 요약을 생성합니다.
+
+        Returns:
+            str | None: 새 요약 (실패 시 None, 기존 요약 유지)
+        """
+        try:
+            prompt = f"""
+            복약 관리 챗봇과 사용자의 대화를 이어서 요약해주세요.
+
+            기존 요약:
+            {summary or "(없음)"}
+
+            추가된 대화:
+            {conversation}
+
+            다음 JSON 형식으로 응답해주세요:
+            {{
+                "summary": "갱신된 요약 (한글로, 300자 이내)"
+            }}
+
+            주의사항:
+            1. 사용자가 언급한 약, 증상, 복용 습관, 이미 답변한 내용 위주로 남겨주세요.
+            2. 인사말 등 이후 답변에 필요 없는 내용은 빼주세요.
+            """
+
+            result = await self._generate_json(prompt, CHAT_SUMMARY_OUTPUT)
+            return result.summary or None
+
+        except Exception as e:
+            print(f"Chat summary error: {str(e)}")
+            return None
+
 
 # 싱글톤 인스턴스
 gemini_service = GeminiService()
@@ -0,0 +1,190 @@
+"""
+OCR 이미지 전처리
+- 휴대폰 원본 사진(수 MB, 4000px 이상)을 Gemini에 올리기 전에 OCR에 충분한 크기로 줄임
+- EXIF 회전 보정 → 축소 → (선택) 흑백/대비 정규화 → JPEG/WebP 재인코딩(목표 용량 이하)
+- CPU 작업이므로 프로세스 풀에서 실행하여 이벤트 루프를 막지 않음
+  (워커가 비정상 종료되어 풀이 깨지면 풀을 새로 만들어 한 번 재시도)
+- 요청별 전처리 통계를 로그(및 선택적으로 JSONL 파일)에 남겨 해상도 튜닝에 사용
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import NamedTuple, Optional
+import asyncio
+import hashlib
+import io
+import json
+import threading
+import time
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+MIN_QUALITY = 50
+QUALITY_STEP = 10
+DOWNSCALE_STEP = 0.8  # 최저 품질로도 용량을 넘으면 이 비율로 추가 축소
+
+
+class PreprocessStats(NamedTuple):
+    """요청별 전처리 통계"""
+    original_bytes: int
+    original_width: int
+    original_height: int
+    output_bytes: int
+    output_width: int
+    output_height: int
+    format: str
+    quality: int
+    elapsed_ms: float
+
+
+class PreprocessedImage(NamedTuple):
+    """Gemini 업로드용 이미지"""
+    data: bytes
+    mime_type: str
+    stats: PreprocessStats
+    digest: str  # 업로드 원본의 SHA-256 (OCR 결과 캐시 키)
+
+
+def preprocess_image(
+    data: bytes,
+    max_side: int = 2048,
+    grayscale: bool = False,
+    autocontrast: bool = True,
+    image_format: str = "jpeg",
+    max_bytes: int = 1_000_000,
+    quality: int = 85
+) -> PreprocessedImage:
+    """
+    이미지 전처리 (워커 프로세스에서 실행)
+
+    Raises:
+        PIL.UnidentifiedImageError: 이미지가 아닌 파일
+        PIL.Image.DecompressionBombError: 픽셀 수가 비정상적으로 큰 이미지
+        OSError: 중간에 잘리거나 손상된 이미지
+    """
+    started = time.perf_counter()
+    digest = hashlib.sha256(data).hexdigest()
+    image = Image.open(io.BytesIO(data))
+    original_width, original_height = image.size
+    # JPEG는 디코딩 단계에서 목표 크기 이상인 범위로 축소 (전체 해상도 디코딩 생략)
+    image.draft("RGB", (max_side, max_side))
+
+    # 휴대폰 사진의 회전 정보(EXIF Orientation)를 픽셀에 반영
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("L" if grayscale else "RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    if autocontrast:
+        # 그림자/역광으로 흐린 글씨 보정 (양 끝 1% 픽셀은 무시)
+        image = ImageOps.autocontrast(image, cutoff=1)
+
+    pil_format = "WEBP" if image_format.lower() == "webp" else "JPEG"
+    while True:
+        current_quality = quality
+        while True:
+            buffer = io.BytesIO()
+            image.save(buffer, format=pil_format, quality=current_quality, optimize=True)
+            encoded = buffer.getvalue()
+            if len(encoded) <= max_bytes or current_quality <= MIN_QUALITY:
+                break
+            current_quality = max(MIN_QUALITY, current_quality - QUALITY_STEP)
+        if len(encoded) <= max_bytes or max(image.size) <= 512:
+            break
+        image = image.resize(
+            (int(image.width * DOWNSCALE_STEP), int(image.height * DOWNSCALE_STEP)),
+            Image.LANCZOS
+        )
+
+    stats = PreprocessStats(
+        original_bytes=len(data),
+        original_width=original_width,
+        original_height=original_height,
+        output_bytes=len(encoded),
+        output_width=image.width,
+        output_height=image.height,
+        format=pil_format.lower(),
+        quality=current_quality,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+    return PreprocessedImage(encoded, f"image/{pil_format.lower()}", stats, digest)
+
+
+class ImagePreprocessor:
+    """프로세스 풀 기반 OCR 이미지 전처리기"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_side: int = 2048,
+        grayscale: bool = False,
+        autocontrast: bool = True,
+        image_format: str = "jpeg",
+        max_bytes: int = 1_000_000,
+        stats_path: Optional[str] = None
+    ):
+        self.workers = max(1, workers)
+        self.options = {
+            "max_side": max_side,
+            "grayscale": grayscale,
+            "autocontrast": autocontrast,
+            "image_format": image_format,
+            "max_bytes": max_bytes,
+        }
+        self.stats_path = stats_path
+        self._stats_lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def process(self, data: bytes) -> PreprocessedImage:
+        """이미지를 전처리하고 통계를 기록"""
+        loop = asyncio.get_running_loop()
+        task = partial(preprocess_image, data, **self.options)
+        pool = self._get_pool()
+        try:
+            result = await loop.run_in_executor(pool, task)
+        except BrokenProcessPool as e:
+            print(f"[OCR] 전처리 프로세스 풀 오류로 풀 재생성: {e}")
+            self._reset_pool(pool)
+            result = await loop.run_in_executor(self._get_pool(), task)
+        stats = result.stats
+        print(f"[OCR] 전처리: {stats.original_width}x{stats.original_height} "
+              f"{stats.original_bytes // 1024}KB → {stats.output_width}x{stats.output_height} "
+              f"{stats.output_bytes // 1024}KB ({stats.format} q{stats.quality}, {stats.elapsed_ms:.0f}ms)")
+        if self.stats_path:
+            await asyncio.to_thread(self._append_stats, stats)
+        return result
+
+    def _append_stats(self, stats: PreprocessStats):
+        record = {"at": time.time(), **stats._asdict(), **self.options}
+        with self._stats_lock, open(self.stats_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        """깨진 풀 폐기 (다음 호출에서 새로 생성)"""
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """프로세스 풀 종료"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# 싱글톤 인스턴스
+image_preprocessor = ImagePreprocessor(
+    workers=settings.OCR_PREPROCESS_WORKERS,
+    max_side=settings.OCR_MAX_IMAGE_SIDE,
+    grayscale=settings.OCR_GRAYSCALE,
+    autocontrast=settings.OCR_AUTOCONTRAST,
+    image_format=settings.OCR_IMAGE_FORMAT,
+    max_bytes=settings.OCR_MAX_IMAGE_BYTES,
+    stats_path=settings.OCR_PREPROCESS_STATS_PATH or None
+)
@@ -0,0 +1,122 @@
+"""
+약물 상호작용 캐시
+- 키: 정규화한 약물 이름의 순서 없는 쌍 (A+B == B+A)
+- 값: 상호작용(severity, description) 또는 "상호작용 없음"(None)도 저장
+- 메모리 LRU → SQLite(TTL) 순으로 조회하며, 둘 다 없는 쌍만 LLM에 질의
+"""
+from collections import OrderedDict
+from typing import Optional
+import json
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+from app.services.drug_names import normalize_drug_name
+
+DrugPair = tuple[str, str]
+
+
+def pair_key(drug1: str, drug2: str) -> Optional[DrugPair]:
+    """정규화한 순서 없는 쌍 (같은 약이거나 이름이 비면 None)"""
+    a, b = normalize_drug_name(drug1), normalize_drug_name(drug2)
+    if not a or not b or a == b:
+        return None
+    return (a, b) if a < b else (b, a)
+
+
+class InteractionCache:
+    """LRU + SQLite 2단계 상호작용 캐시"""
+
+    def __init__(self, path: str, ttl_seconds: float, lru_size: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.lru_size = lru_size
+        self._lock = threading.Lock()
+        # pair → (만료 시각, 상호작용 dict 또는 None)
+        self._lru: OrderedDict[DrugPair, tuple[float, Optional[dict]]] = OrderedDict()
+        # 모듈 import만으로 DB 파일이 생기지 않도록 처음 사용할 때 연결
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """SQLite 연결 (처음 호출 시 생성, 잠금 안에서 호출)"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS drug_interactions ("
+                " drug_a TEXT NOT NULL,"
+                " drug_b TEXT NOT NULL,"
+                " interaction TEXT,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (drug_a, drug_b))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, pairs: list[DrugPair]) -> dict[DrugPair, Optional[dict]]:
+        """
+        캐시에 있는 쌍만 반환 (값이 None이면 "상호작용 없음"으로 확인된 쌍)
+        """
+        now = time.time()
+        found: dict[DrugPair, Optional[dict]] = {}
+        with self._lock:
+            missing = []
+            for pair in pairs:
+                cached = self._lru.get(pair)
+                if cached is not None and cached[0] > now:
+                    self._lru.move_to_end(pair)
+                    found[pair] = cached[1]
+                else:
+                    missing.append(pair)
+
+            for pair in missing:
+                row = self._connection().execute(
+                    "SELECT interaction, expires_at FROM drug_interactions"
+                    " WHERE drug_a = ? AND drug_b = ? AND expires_at > ?",
+                    (pair[0], pair[1], now)
+                ).fetchone()
+                if row is None:
+                    continue
+                value = json.loads(row[0]) if row[0] else None
+                self._remember(pair, row[1], value)
+                found[pair] = value
+
+            self.hits += len(found)
+            self.misses += len(pairs) - len(found)
+        return found
+
+    def put_many(self, entries: dict[DrugPair, Optional[dict]]):
+        """쌍별 결과 저장 (None = 상호작용 없음)"""
+        if not entries:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._connection().executemany(
+                "INSERT INTO drug_interactions (drug_a, drug_b, interaction, expires_at)"
+                " VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(drug_a, drug_b) DO UPDATE SET"
+                " interaction = excluded.interaction, expires_at = excluded.expires_at",
+                [
+                    (pair[0], pair[1], json.dumps(value, ensure_ascii=False) if value else None, expires_at)
+                    for pair, value in entries.items()
+                ]
+            )
+            for pair, value in entries.items():
+                self._remember(pair, expires_at, value)
+
+    def _remember(self, pair: DrugPair, expires_at: float, value: Optional[dict]):
+        self._lru[pair] = (expires_at, value)
+        self._lru.move_to_end(pair)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+
+# 싱글톤 인스턴스
+interaction_cache = InteractionCache(
+    path=settings.INTERACTION_CACHE_PATH,
+    ttl_seconds=settings.INTERACTION_CACHE_TTL_DAYS * 24 * 60 * 60,
+    lru_size=settings.INTERACTION_CACHE_LRU_SIZE
+)
@@ -0,0 +1,238 @@
+"""
+LLM JSON 응답 파싱
+- Pydantic 모델 → Gemini 응답 스키마 변환 (response_mime_type=application/json과 함께 사용)
+- 미리 만들어 둔 TypeAdapter로 응답 문자열을 한 번에 검증
+- 검증 실패 시 코드 펜스/앞뒤 설명문/잘린 JSON을 복구하여 다시 검증
+"""
+from typing import Any, Generic, Optional, TypeVar
+import json
+import re
+import threading
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+T = TypeVar("T")
+
+# Gemini Schema가 받는 JSON Schema 키
+_SCHEMA_KEYS = ("type", "format", "description", "enum", "properties", "required", "items")
+_CLOSERS = {"{": "}", "[": "]"}
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+
+def gemini_schema(model: type[BaseModel]) -> dict:
+    """
+    Pydantic 모델의 JSON Schema를 Gemini 응답 스키마로 변환
+    ($ref 인라인, anyOf[X, null] → nullable X, default/title 등 미지원 키 제거,
+    모든 속성을 required로 두어 빠짐없이 생성하도록 함)
+    """
+    schema = model.model_json_schema()
+    definitions = schema.get("$defs", {})
+
+    def convert(node: dict) -> dict:
+        if "$ref" in node:
+            return convert(definitions[node["$ref"].rsplit("/", 1)[-1]])
+        if "anyOf" in node:
+            options = [option for option in node["anyOf"] if option.get("type") != "null"]
+            converted = convert(options[0])
+            if len(options) < len(node["anyOf"]):
+                converted["nullable"] = True
+            return converted
+
+        converted = {key: node[key] for key in _SCHEMA_KEYS if key in node}
+        if "properties" in node:
+            converted["properties"] = {
+                name: convert(prop) for name, prop in node["properties"].items()
+            }
+            converted["required"] = list(node["properties"])
+        if "items" in node:
+            converted["items"] = convert(node["items"])
+        return converted
+
+    return convert(schema)
+
+
+def repair_json(text: str) -> Optional[str]:
+    """
+    응답 문자열에서 JSON 부분을 찾아 복구
+
+    - 앞뒤 설명문/코드 펜스 제거 (첫 '{' 또는 '['부터 짝이 맞는 곳까지)
+    - 닫는 괄호 앞의 쉼표 제거
+    - 중간에 잘린 경우 마지막으로 완성된 항목(쉼표 앞, 닫힌 괄호, 끝난 문자열 값)까지 남기고 괄호를 닫음
+
+    Returns:
+        str | None: 복구한 JSON 문자열 (JSON 시작 위치가 없으면 None)
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None
+
+    out: list[str] = []
+    stack: list[str] = []
+    # (출력 길이, 열린 괄호) - 잘렸을 때 되돌아갈 마지막 완성 지점
+    safe: Optional[tuple[int, list[str]]] = None
+    in_string = escaped = False
+    # 객체에서 ':' 뒤(값 위치)인지, 지금 문자열이 값인지(키가 아닌지)
+    after_colon = string_is_value = False
+
+    for char in text[min(starts):]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                # 배열 원소나 객체 값인 문자열이 끝나면 완성 지점
+                if string_is_value:
+                    safe = (len(out), list(stack))
+            continue
+
+        if char == '"':
+            in_string = True
+            string_is_value = bool(stack) and (stack[-1] == "]" or after_colon)
+            after_colon = False
+        elif char == ":":
+            after_colon = True
+        elif char in _CLOSERS:
+            after_colon = False
+            stack.append(_CLOSERS[char])
+            out.append(char)
+            # 빈 배열/최상위 객체는 그대로 닫아도 유효 (빈 하위 객체는 필수 필드가 빠져 무효)
+            if char == "[" or len(stack) == 1:
+                safe = (len(out), list(stack))
+            continue
+        elif char in "}]":
+            if not stack or char != stack[-1]:
+                break
+            after_colon = False
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            stack.pop()
+            out.append(char)
+            if not stack:
+                return "".join(out)
+            safe = (len(out), list(stack))
+            continue
+        elif char == ",":
+            after_colon = False
+            safe = (len(out), list(stack))
+        out.append(char)
+
+    # 잘린 JSON: 마지막 완성 지점에서 열린 괄호를 역순으로 닫음
+    if safe is None:
+        return None
+    length, open_stack = safe
+    return "".join(out[:length]).rstrip(" \t\r\n,") + "".join(reversed(open_stack))
+
+
+class JsonOutput(Generic[T]):
+    """응답 스키마 + 검증기 묶음 (모듈 로드 시 한 번 생성하여 재사용)"""
+
+    def __init__(self, name: str, model: type[T]):
+        self.name = name
+        self.adapter: TypeAdapter[T] = TypeAdapter(model)
+        self.generation_config: dict[str, Any] = {
+            "response_mime_type": "application/json",
+            "response_schema": gemini_schema(model),
+        }
+        self._lock = threading.Lock()
+        self.parsed = 0
+        self.repaired = 0
+        self.failed = 0
+
+    def parse(self, text: str) -> T:
+        """
+        응답 문자열 검증 (실패 시 복구 후 재검증)
+
+        Raises:
+            ValidationError: 복구 후에도 스키마에 맞지 않음
+        """
+        try:
+            result = self.adapter.validate_json(text)
+            self._count("parsed")
+            return result
+        except ValidationError:
+            repaired = repair_json(text)
+            if repaired is None:
+                self._count("failed")
+                raise
+        try:
+            result = self.adapter.validate_json(repaired)
+        except ValidationError:
+            self._count("failed")
+            raise
+        self._count("repaired")
+        return result
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def record(self, path: str, text: str):
+        """튜닝/벤치마크용 원본 응답 기록 (JSONL)"""
+        with self._lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"kind": self.name, "text": text}, ensure_ascii=False) + "\n")
+
+
+class StreamingJsonField:
+    """
+    스트리밍 중인 JSON 응답에서 문자열 필드 하나의 값을 조각 단위로 디코딩
+    (예: {"message": "...", ...} 의 message를 생성되는 대로 전달)
+    """
+
+    def __init__(self, field: str):
+        self._prefix = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._started = False
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """응답 조각을 넣고 새로 디코딩된 값 부분을 반환"""
+        if self.done:
+            return ""
+        self._buffer += chunk
+        if not self._started:
+            match = self._prefix.search(self._buffer)
+            if match is None:
+                return ""
+            self._started = True
+            self._buffer = self._buffer[match.end():]
+
+        buffer = self._buffer
+        out: list[str] = []
+        i = 0
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            # 이스케이프가 조각 경계에서 잘리면 다음 조각까지 대기
+            if i + 1 >= len(buffer):
+                break
+            escape = buffer[i + 1]
+            if escape != "u":
+                out.append(_ESCAPES.get(escape, escape))
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            code = int(buffer[i + 2:i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # 서로게이트 쌍 (이모지 등)
+                if i + 12 > len(buffer):
+                    break
+                low = int(buffer[i + 8:i + 12], 16)
+                out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                i += 12
+            else:
+                out.append(chr(code))
+                i += 6
+
+        self._buffer = buffer[i:]
+        return "".join(out)
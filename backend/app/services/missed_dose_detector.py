@@ -0,0 +1,216 @@
+"""
+미복용(missed) 감지 서비스
+- 스케줄러가 발송한 알람 슬롯을 모아두었다가 유예 시간이 지나면
+- medicine_logs의 taken/skipped(및 이미 기록된 missed) 기록과 비교하여 누락된 슬롯을 missed로 일괄 기록
+- 비용은 사용자 수가 아닌 유예 시간이 지난 슬롯 수에 비례
+- 삭제된 약물 id는 비워서 기록하고, 저장에 계속 실패하는 슬롯은 시도 횟수 제한 후 버림
+  (한 행의 오류가 이후 모든 미복용 기록을 막지 않도록 함)
+"""
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+import asyncio
+
+from app.core.config import settings
+from app.core.supabase import get_supabase_admin
+
+# in_ 필터 URL 길이 제한을 피하기 위한 사용자 id 청크 크기
+LOG_QUERY_CHUNK = 200
+
+
+class FiredSlot(NamedTuple):
+    """발송된 알람 슬롯 (약물 단위)"""
+    user_id: str
+    medicine_id: str
+    medicine_name: str
+    scheduled_time: str  # 사용자 시간대 기준 HH:MM
+    fire_at: datetime  # UTC
+
+
+class MissedDoseDetector:
+    """유예 시간 내 복용 기록이 없는 알람 슬롯을 missed로 기록"""
+
+    def __init__(self, grace_minutes: int = 60, interval_seconds: int = 300, max_attempts: int = 5):
+        self.grace = timedelta(minutes=grace_minutes)
+        self.interval_seconds = interval_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+        # fire_at 순서로 유지하여 앞에서부터 유예 시간이 지난 슬롯을 꺼냄
+        self._pending: deque[FiredSlot] = deque()
+        # 실패한 슬롯별 시도 횟수
+        self._attempts: dict[FiredSlot, int] = {}
+
+    def record(self, slots: list[FiredSlot]):
+        """스케줄러가 발송한 슬롯 등록 (발송 원장에서 복원한 과거 슬롯도 순서에 맞게 병합)"""
+        slots = sorted(slots, key=lambda slot: slot.fire_at)
+        if slots and self._pending and slots[0].fire_at < self._pending[-1].fire_at:
+            self._pending = deque(sorted([*self._pending, *slots], key=lambda slot: slot.fire_at))
+        else:
+            self._pending.extend(slots)
+
+    async def start(self):
+        """감지 루프 시작"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """감지 루프 중지 (유예 시간이 지난 슬롯은 마지막으로 한 번 처리)"""
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.run_once()
+
+    async def _run_loop(self):
+        while self.is_running:
+            try:
+                await asyncio.sleep(self.interval_seconds)
+                await self.run_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"[MissedDose] 루프 오류: {e}")
+
+    async def run_once(self) -> int:
+        """
+        유예 시간이 지난 슬롯을 검사하여 missed 기록 일괄 삽입
+
+        Returns:
+            int: 새로 기록한 missed 행 수
+        """
+        cutoff = datetime.now(timezone.utc) - self.grace
+        expired: list[FiredSlot] = []
+        while self._pending and self._pending[0].fire_at <= cutoff:
+            expired.append(self._pending.popleft())
+        if not expired:
+            return 0
+
+        try:
+            rows, failed = await asyncio.to_thread(self._detect, expired)
+        except Exception as e:
+            print(f"[MissedDose] 감지 오류: {e}")
+            rows, failed = [], expired
+
+        failed_set = set(failed)
+        for slot in expired:
+            if slot not in failed_set:
+                self._attempts.pop(slot, None)
+        self._retry(failed)
+
+        if rows:
+            print(f"[MissedDose] 미복용 {len(rows)}건 기록 (검사 슬롯 {len(expired)}개)")
+        return len(rows)
+
+    def _retry(self, slots: list[FiredSlot]):
+        """실패한 슬롯을 다음 실행에서 다시 검사하도록 되돌림 (시도 횟수 초과 시 버림)"""
+        retry = []
+        for slot in slots:
+            attempts = self._attempts.get(slot, 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(slot, None)
+                print(f"[MissedDose] {attempts}회 실패로 슬롯 폐기: "
+                      f"{slot.user_id} {slot.medicine_name} {slot.fire_at.isoformat()}")
+                continue
+            self._attempts[slot] = attempts
+            retry.append(slot)
+        self._pending.extendleft(reversed(retry))
+
+    def _detect(self, slots: list[FiredSlot]) -> tuple[list[dict], list[FiredSlot]]:
+        """
+        슬롯 사용자들의 기록을 한 번에 조회해 매칭하고 누락분을 한 번에 삽입
+
+        Returns:
+            tuple: (기록한 행, 저장에 실패한 슬롯)
+        """
+        supabase = get_supabase_admin()
+        since = min(slot.fire_at for slot in slots) - self.grace
+        user_ids = list({slot.user_id for slot in slots})
+
+        # (user_id, 약물 키, 예정 시간) → 기록 시각 목록
+        logged: dict[tuple[str, str, str], list[datetime]] = {}
+        for i in range(0, len(user_ids), LOG_QUERY_CHUNK):
+            result = supabase.table("medicine_logs").select(
+                "user_id,medicine_id,medicine_name,scheduled_time,taken_at"
+            ).in_("user_id", user_ids[i:i + LOG_QUERY_CHUNK]).gte(
+                "taken_at", since.isoformat()
+            ).execute()
+            for log in result.data or []:
+                taken_at = datetime.fromisoformat(log["taken_at"])
+                if taken_at.tzinfo is None:
+                    taken_at = taken_at.replace(tzinfo=timezone.utc)
+                # 프론트엔드 기록은 medicine_id 없이 이름만 있을 수 있음
+                for key in (log.get("medicine_id"), log.get("medicine_name")):
+                    if key:
+                        logged.setdefault(
+                            (log["user_id"], key, log["scheduled_time"]), []
+                        ).append(taken_at)
+
+        missed: list[tuple[FiredSlot, dict]] = []
+        for slot in slots:
+            window_start, window_end = slot.fire_at - self.grace, slot.fire_at + self.grace
+            candidates = (
+                logged.get((slot.user_id, slot.medicine_id, slot.scheduled_time), [])
+                + logged.get((slot.user_id, slot.medicine_name, slot.scheduled_time), [])
+            )
+            if any(window_start <= taken_at <= window_end for taken_at in candidates):
+                continue
+            missed.append((slot, {
+                "user_id": slot.user_id,
+                "medicine_id": slot.medicine_id,
+                "medicine_name": slot.medicine_name,
+                "scheduled_time": slot.scheduled_time,
+                "taken_at": slot.fire_at.isoformat(),
+                "status": "missed"
+            }))
+        if not missed:
+            return [], []
+
+        # 발송 후 삭제된 약물은 외래 키 오류가 나지 않도록 id 없이 이름만 기록
+        existing = self._existing_medicine_ids(supabase, {row["medicine_id"] for _, row in missed})
+        for _, row in missed:
+            if row["medicine_id"] not in existing:
+                row["medicine_id"] = None
+
+        rows = [row for _, row in missed]
+        try:
+            supabase.table("medicine_logs").insert(rows).execute()
+            return rows, []
+        except Exception as e:
+            print(f"[MissedDose] 일괄 기록 오류, 행 단위로 재시도: {e}")
+
+        # 특정 행(탈퇴한 사용자 등) 때문에 전체가 실패하지 않도록 행 단위로 재시도
+        saved, failed = [], []
+        for slot, row in missed:
+            try:
+                supabase.table("medicine_logs").insert(row).execute()
+                saved.append(row)
+            except Exception as e:
+                print(f"[MissedDose] 기록 실패 ({slot.user_id} {slot.medicine_name}): {e}")
+                failed.append(slot)
+        return saved, failed
+
+    @staticmethod
+    def _existing_medicine_ids(supabase, medicine_ids: set[str]) -> set[str]:
+        """medicines 테이블에 아직 남아있는 약물 id"""
+        medicine_ids = sorted(medicine_id for medicine_id in medicine_ids if medicine_id)
+        existing = set()
+        for i in range(0, len(medicine_ids), LOG_QUERY_CHUNK):
+            result = supabase.table("medicines").select("id").in_(
+                "id", medicine_ids[i:i + LOG_QUERY_CHUNK]
+            ).execute()
+            existing.update(row["id"] for row in result.data or [])
+        return existing
+
+
+# 싱글톤 인스턴스
+missed_dose_detector = MissedDoseDetector(
+    grace_minutes=settings.MISSED_DOSE_GRACE_MINUTES,
+    interval_seconds=settings.MISSED_DOSE_CHECK_INTERVAL_SECONDS,
+    max_attempts=settings.MISSED_DOSE_MAX_ATTEMPTS
+)
@@ -0,0 +1,116 @@
+"""
+처방전 사진 OCR 결과 캐시
+- 업로드 원본의 SHA-256을 키로 OCR 결과(약물 목록, 원문)를 저장
+- 완전히 같은 파일을 다시 올린 경우에만 적중
+  (지각 해시 근사 일치는 같은 양식의 다른 처방전끼리가 같은 사진 재촬영보다 더 가까운 경우가 있어
+   다른 처방전 결과를 돌려줄 수 있으므로 사용하지 않음)
+- 메모리 LRU(크기 제한) + 선택적 SQLite 디스크 계층
+- 사용자 id가 있으면 사용자 범위로 나누어 저장
+"""
+from collections import OrderedDict
+from typing import Optional
+import json
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+CacheKey = tuple[str, str]  # (사용자 범위, 업로드 원본 해시)
+
+
+class OcrResultCache:
+    """업로드 원본 해시 기반 OCR 결과 캐시"""
+
+    def __init__(
+        self,
+        max_entries: int = 2000,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 50000
+    ):
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[CacheKey, dict] = OrderedDict()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_inserts = 0
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, timeout=10, check_same_thread=False, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " scope TEXT NOT NULL,"
+                " hash TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS ocr_results_scope_hash ON ocr_results (scope, hash)"
+            )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str, scope: Optional[str] = None) -> Optional[dict]:
+        """같은 파일의 캐시 결과 (없으면 None)"""
+        key = (scope or "", digest)
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return result
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT result FROM ocr_results WHERE scope = ? AND hash = ?"
+                    " ORDER BY id DESC LIMIT 1",
+                    key
+                ).fetchone()
+                if row is not None:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.hits += 1
+                    return result
+
+            self.misses += 1
+            return None
+
+    def put(self, digest: str, result: dict, scope: Optional[str] = None):
+        """OCR 결과 저장"""
+        key = (scope or "", digest)
+        with self._lock:
+            self._remember(key, result)
+            if self._disk is not None:
+                self._put_to_disk(key, result)
+
+    def _remember(self, key: CacheKey, result: dict):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _put_to_disk(self, key: CacheKey, result: dict):
+        self._disk.execute("DELETE FROM ocr_results WHERE scope = ? AND hash = ?", key)
+        self._disk.execute(
+            "INSERT INTO ocr_results (scope, hash, result, created_at) VALUES (?, ?, ?, ?)",
+            (*key, json.dumps(result, ensure_ascii=False), time.time())
+        )
+
+        # 삽입이 보관 한도의 10%만큼 쌓일 때마다 오래된 행 정리
+        self._disk_inserts += 1
+        if self._disk_inserts >= max(1, self.disk_max_entries // 10):
+            self._disk.execute(
+                "DELETE FROM ocr_results WHERE id NOT IN"
+                " (SELECT id FROM ocr_results ORDER BY id DESC LIMIT ?)",
+                (self.disk_max_entries,)
+            )
+            self._disk_inserts = 0
+
+
+# 싱글톤 인스턴스
+ocr_result_cache = OcrResultCache(
+    max_entries=settings.OCR_CACHE_MAX_ENTRIES,
+    disk_path=settings.OCR_CACHE_DISK_PATH or None,
+    disk_max_entries=settings.OCR_CACHE_DISK_MAX_ENTRIES
+)
@@ -0,0 +1,130 @@
+"""
+Push 발송 워커
+- 아웃박스(PushOutbox)에서 알림을 배치 단위로 꺼내 PushFanout으로 발송
+- 스케줄러 틱은 아웃박스 기록까지만 하고 끝나며, 발송 처리량은 워커 수/배치 크기로 조정
+- 너무 오래 대기한 알림(재시작이 길어진 경우 등)은 발송하지 않고 폐기
+- 종료 시 제한 시간 동안 대기열을 비우고, 남은 항목은 디스크에 두어 다음 기동 시 발송
+- 아웃박스는 import 시점이 아닌 start()(앱 lifespan)에서 생성
+"""
+from typing import Optional
+import asyncio
+import time
+
+from app.core.config import settings
+from app.services.push_fanout import PushMessage, push_fanout
+from app.services.push_outbox import PushOutbox, create_push_outbox
+
+ERROR_RETRY_SECONDS = 5
+IDLE_POLL_SECONDS = 30  # 깨우기 신호를 놓친 경우 대비
+
+
+class PushDeliveryWorker:
+    """아웃박스 발송 워커 풀"""
+
+    def __init__(
+        self,
+        outbox: Optional[PushOutbox] = None,
+        workers: int = 2,
+        batch_size: int = 500,
+        max_age_seconds: float = 1800
+    ):
+        self.outbox = outbox
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_age_seconds = max_age_seconds
+        self.is_running = False
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    async def enqueue(self, messages: list[PushMessage]):
+        """알림을 아웃박스에 기록하고 워커를 깨움"""
+        if not messages:
+            return
+        if self.outbox is None:
+            raise RuntimeError("아웃박스가 아직 생성되지 않았습니다.")
+        await asyncio.to_thread(self.outbox.enqueue, messages)
+        self._wakeup.set()
+
+    async def start(self):
+        """워커 시작 (이전 프로세스가 남긴 항목부터 발송)"""
+        if self.is_running:
+            return
+        if self.outbox is None:
+            self.outbox = await asyncio.to_thread(create_push_outbox)
+        self.is_running = True
+        pending = await asyncio.to_thread(self.outbox.pending)
+        if pending:
+            print(f"[PushDelivery] 아웃박스 미발송 {pending}건 복원")
+        self._tasks = [asyncio.create_task(self._run_worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 10.0):
+        """대기열을 제한 시간 동안 비운 뒤 워커 중지 (남은 항목은 디스크에 보존)"""
+        if self.outbox is None:
+            return
+        deadline = time.monotonic() + drain_timeout
+        while time.monotonic() < deadline:
+            if await asyncio.to_thread(self.outbox.pending) == 0:
+                break
+            await asyncio.sleep(0.2)
+
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        remaining = await asyncio.to_thread(self.outbox.pending)
+        if remaining:
+            print(f"[PushDelivery] 미발송 {remaining}건을 아웃박스에 보존")
+        await asyncio.to_thread(self.outbox.checkpoint)
+        await asyncio.to_thread(self.outbox.close)
+        self.outbox = None
+
+    async def _run_worker(self):
+        while self.is_running:
+            try:
+                self._wakeup.clear()
+                items = await asyncio.to_thread(self.outbox.lease, self.batch_size)
+                if not items:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=IDLE_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._deliver(items)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"[PushDelivery] 워커 오류: {e}")
+                await asyncio.sleep(ERROR_RETRY_SECONDS)
+
+    async def _deliver(self, items: list[tuple[int, float, PushMessage]]):
+        """꺼낸 항목 발송 후 ack (실패·취소 시 대기열로 되돌림)"""
+        ids = [item_id for item_id, _, _ in items]
+        cutoff = time.time() - self.max_age_seconds
+        messages = [message for _, created_at, message in items if created_at >= cutoff]
+        expired = len(items) - len(messages)
+
+        try:
+            if messages:
+                stats = await push_fanout.send(messages)
+                print(f"[PushDelivery] 알림 발송: 사용자 {stats.users}명 "
+                      f"(성공: {stats.sent}, 실패: {stats.failed}, "
+                      f"재시도 대기: {stats.retrying}, 만료 구독 삭제: {stats.pruned}, "
+                      f"소요: {stats.elapsed_ms:.0f}ms, 평균 지연: {stats.avg_latency_ms:.0f}ms, "
+                      f"최대 지연: {stats.max_latency_ms:.0f}ms)")
+        except BaseException:
+            await asyncio.shield(asyncio.to_thread(self.outbox.release, ids))
+            raise
+
+        if expired:
+            print(f"[PushDelivery] 오래된 알림 {expired}건 폐기")
+        await asyncio.to_thread(self.outbox.ack, ids)
+
+
+# 싱글톤 인스턴스
+push_delivery = PushDeliveryWorker(
+    workers=settings.PUSH_DELIVERY_WORKERS,
+    batch_size=settings.PUSH_DELIVERY_BATCH_SIZE,
+    max_age_seconds=settings.PUSH_OUTBOX_MAX_AGE_SECONDS
+)
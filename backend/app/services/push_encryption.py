@@ -0,0 +1,111 @@
+"""
+Push payload 암호화 엔진
+- Web Push payload는 구독마다 ECDH 키 교환 + HKDF + AES-128-GCM(aes128gcm)이 필요한 CPU 작업
+- 대량 발송 시 (구독 키, payload) 묶음을 청크로 나눠 프로세스 풀에서 병렬 암호화
+- 결과는 바로 POST 가능한 본문(bytes)이며, 네트워크 전송과 분리되어 코어 수만큼 확장
+- 워커가 비정상 종료(OOM, 시그널)되어 풀이 깨지면 풀을 새로 만들어 한 번 재시도하고,
+  그래도 실패하면 해당 배치는 스레드에서 암호화
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple, Optional
+import asyncio
+import os
+
+from pywebpush import WebPusher
+
+from app.core.config import settings
+
+
+class EncryptionJob(NamedTuple):
+    """암호화 대상 (구독 키 + payload)"""
+    p256dh: str
+    auth: str
+    payload: str
+
+
+def encrypt_payload(p256dh: str, auth: str, payload: str) -> bytes:
+    """단일 payload를 aes128gcm으로 암호화"""
+    subscription_info = {"endpoint": "", "keys": {"p256dh": p256dh, "auth": auth}}
+    return WebPusher(subscription_info).encode(payload, "aes128gcm")["body"]
+
+
+def _encrypt_chunk(jobs: list[EncryptionJob]) -> list[Optional[bytes]]:
+    """워커 프로세스에서 실행 (잘못된 키는 None)"""
+    bodies: list[Optional[bytes]] = []
+    for job in jobs:
+        try:
+            bodies.append(encrypt_payload(job.p256dh, job.auth, job.payload))
+        except Exception:
+            bodies.append(None)
+    return bodies
+
+
+class PushEncryptionEngine:
+    """청크 단위 프로세스 풀 암호화"""
+
+    def __init__(self, workers: int = 0, chunk_size: int = 500, pool_min_batch: int = 1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        # 이보다 작은 배치는 프로세스 간 직렬화 비용이 더 커서 스레드 하나로 처리
+        self.pool_min_batch = pool_min_batch
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def encrypt_batch(self, jobs: list[EncryptionJob]) -> list[Optional[bytes]]:
+        """
+        작업 목록을 암호화하여 같은 순서의 본문 목록 반환
+
+        Returns:
+            list: 암호화된 본문 (실패한 항목은 None)
+        """
+        if not jobs:
+            return []
+        if len(jobs) < self.pool_min_batch or self.workers <= 1:
+            return await asyncio.to_thread(_encrypt_chunk, jobs)
+
+        chunks = [jobs[i:i + self.chunk_size] for i in range(0, len(jobs), self.chunk_size)]
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                return await self._encrypt_in_pool(pool, chunks)
+            except BrokenProcessPool as e:
+                print(f"[PushEncryption] 프로세스 풀 오류로 풀 재생성 (시도 {attempt + 1}): {e}")
+                self._reset_pool(pool)
+
+        return await asyncio.to_thread(_encrypt_chunk, jobs)
+
+    async def _encrypt_in_pool(
+        self,
+        pool: ProcessPoolExecutor,
+        chunks: list[list[EncryptionJob]]
+    ) -> list[Optional[bytes]]:
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(pool, _encrypt_chunk, chunk) for chunk in chunks
+        ])
+        return [body for chunk in results for body in chunk]
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        """깨진 풀 폐기 (다음 호출에서 새로 생성)"""
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """프로세스 풀 종료"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# 싱글톤 인스턴스
+push_encryption_engine = PushEncryptionEngine(
+    workers=settings.PUSH_ENCRYPTION_WORKERS,
+    chunk_size=settings.PUSH_ENCRYPTION_CHUNK_SIZE,
+    pool_min_batch=settings.PUSH_ENCRYPTION_POOL_MIN_BATCH
+)
@@ -0,0 +1,134 @@
+"""
+Push 팬아웃 엔진
+- 한 틱에서 발송할 알림을 모아 구독 정보를 캐시에서 한 번에 가져오고
+- payload 암호화를 일괄 처리(PushEncryptionEngine)한 뒤
+- 동시 발송 수를 제한(Semaphore)하여 병렬로 발송
+- 만료(404/410) 구독은 팬아웃이 끝난 뒤 한 번에 삭제, 429/5xx는 재시도 큐로 넘김
+- 틱 단위 성공/실패/지연 시간 통계를 반환
+"""
+from typing import NamedTuple, Optional
+import asyncio
+import json
+import time
+
+from app.core.config import settings
+from app.api.endpoints.push import (
+    DELIVERY_FAILED,
+    DELIVERY_GONE,
+    DELIVERY_RETRY,
+    DELIVERY_SENT,
+    DeliveryResult,
+    build_push_payload,
+    prune_subscriptions,
+    send_encrypted_push,
+)
+from app.services.push_encryption import EncryptionJob, push_encryption_engine
+from app.services.push_retry_queue import push_retry_queue
+from app.services.subscription_cache import subscription_cache
+
+
+class PushMessage(NamedTuple):
+    """사용자 단위 알림 메시지"""
+    user_id: str
+    title: str
+    body: str
+    data: Optional[dict] = None
+    tag: Optional[str] = None
+
+
+class FanoutStats(NamedTuple):
+    """틱 단위 발송 통계"""
+    users: int
+    sent: int
+    failed: int
+    pruned: int  # 삭제한 만료 구독 수
+    retrying: int  # 재시도 큐에 넘긴 수
+    elapsed_ms: float
+    avg_latency_ms: float
+    max_latency_ms: float
+
+
+class PushFanout:
+    """동시성 제한 Push 팬아웃"""
+
+    def __init__(self, concurrency: int = 32):
+        self.concurrency = max(1, concurrency)
+
+    async def send(self, messages: list[PushMessage]) -> FanoutStats:
+        """메시지 목록을 병렬 발송하고 통계를 반환"""
+        started = time.perf_counter()
+        if not messages:
+            return FanoutStats(0, 0, 0, 0, 0, 0.0, 0.0, 0.0)
+
+        user_ids = list({m.user_id for m in messages})
+        if not settings.VAPID_PRIVATE_KEY:
+            print("[PushFanout] VAPID_PRIVATE_KEY가 설정되지 않았습니다.")
+            return FanoutStats(len(user_ids), 0, len(messages), 0, 0, 0.0, 0.0, 0.0)
+
+        # 캐시 적중 시 조회 없음, 미스인 사용자만 한 번에 조회
+        subscriptions = await asyncio.to_thread(subscription_cache.get_many, user_ids)
+
+        # 1단계: (메시지, 구독) 쌍을 한 번에 암호화 (대량이면 프로세스 풀)
+        deliveries: list[tuple[dict, str]] = []
+        jobs: list[EncryptionJob] = []
+        for message in messages:
+            payload = build_push_payload(message.title, message.body, message.data, message.tag)
+            payload_json = json.dumps(payload)
+            for sub in subscriptions.get(message.user_id, []):
+                deliveries.append((sub, payload["tag"]))
+                jobs.append(EncryptionJob(sub["p256dh"], sub["auth"], payload_json))
+
+        bodies = await push_encryption_engine.encrypt_batch(jobs)
+
+        # 2단계: 암호화된 본문을 동시성 제한 하에 전송
+        semaphore = asyncio.Semaphore(self.concurrency)
+        latencies: list[float] = []
+
+        async def deliver(sub: dict, tag: str, encrypted_body: Optional[bytes]) -> DeliveryResult:
+            if encrypted_body is None:
+                print(f"[PushFanout] 암호화 실패: {sub['endpoint'][:50]}...")
+                return DeliveryResult(DELIVERY_FAILED)
+            async with semaphore:
+                sent_at = time.perf_counter()
+                result = await send_encrypted_push(sub["endpoint"], encrypted_body, tag)
+                latencies.append((time.perf_counter() - sent_at) * 1000)
+            if result.status == DELIVERY_RETRY:
+                push_retry_queue.schedule(
+                    sub["endpoint"], encrypted_body, tag, retry_after=result.retry_after
+                )
+            return result
+
+        tasks = [
+            deliver(sub, tag, encrypted_body)
+            for (sub, tag), encrypted_body in zip(deliveries, bodies)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        statuses = [r.status for r in results if isinstance(r, DeliveryResult)]
+        dead = [
+            sub["endpoint"]
+            for (sub, _), r in zip(deliveries, results)
+            if isinstance(r, DeliveryResult) and r.status == DELIVERY_GONE
+        ]
+        pruned = 0
+        if dead:
+            try:
+                pruned = await asyncio.to_thread(prune_subscriptions, dead)
+            except Exception as e:
+                print(f"[PushFanout] 만료 구독 삭제 오류: {e}")
+
+        sent = statuses.count(DELIVERY_SENT)
+        return FanoutStats(
+            users=len(user_ids),
+            sent=sent,
+            failed=len(results) - sent,
+            pruned=pruned,
+            retrying=statuses.count(DELIVERY_RETRY),
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+            avg_latency_ms=sum(latencies) / len(latencies) if latencies else 0.0,
+            max_latency_ms=max(latencies, default=0.0),
+        )
+
+
+# 싱글톤 인스턴스
+push_fanout = PushFanout(concurrency=settings.PUSH_FANOUT_CONCURRENCY)
@@ -0,0 +1,303 @@
+"""
+Push 발송 아웃박스
+- 스케줄러가 만든 알림을 로컬 디스크에 먼저 기록하고, 발송은 PushDeliveryWorker가 별도로 처리
+- 프로세스가 재시작되어도 발송 전 알림이 남아 다음 기동 시 이어서 발송
+- SQLite(기본) 또는 append-only 로그 파일(JSON Lines) 백엔드
+- 꺼낸 항목은 발송이 끝나면 ack(삭제), 발송하지 못하면 release(대기열로 복귀)
+- SQLite는 여러 워커 프로세스가 같은 파일을 공유할 수 있도록 항목마다 lease 소유자/만료 시각을 기록
+  (종료된 프로세스가 꺼낸 항목은 lease가 만료되면 다른 프로세스가 다시 발송)
+- 로그 파일은 프로세스마다 대기열 전체를 재생하므로 단일 프로세스에서만 사용
+"""
+from abc import ABC, abstractmethod
+from typing import Optional
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from app.core.config import settings
+from app.services.push_fanout import PushMessage
+
+
+def _dump(message: PushMessage) -> str:
+    return json.dumps(message._asdict(), ensure_ascii=False)
+
+
+def _load(payload: str) -> PushMessage:
+    return PushMessage(**json.loads(payload))
+
+
+class PushOutbox(ABC):
+    """아웃박스 인터페이스 (항목: (id, 등록 시각 epoch 초, 메시지))"""
+
+    @abstractmethod
+    def enqueue(self, messages: list[PushMessage]):
+        """메시지 기록 (반환 시점에 디스크에 반영됨)"""
+
+    @abstractmethod
+    def lease(self, limit: int) -> list[tuple[int, float, PushMessage]]:
+        """발송할 항목을 등록 순서대로 꺼냄 (ack/release 전까지 다른 워커에 주지 않음)"""
+
+    @abstractmethod
+    def ack(self, ids: list[int]):
+        """발송 완료(또는 폐기)한 항목 삭제"""
+
+    @abstractmethod
+    def release(self, ids: list[int]):
+        """꺼낸 항목을 대기열로 되돌림"""
+
+    @abstractmethod
+    def pending(self) -> int:
+        """대기 중 + 발송 중 항목 수"""
+
+    def checkpoint(self):
+        """종료 전 디스크 정리"""
+
+    def close(self):
+        """파일/연결 닫기"""
+
+
+class SQLitePushOutbox(PushOutbox):
+    """SQLite 파일 기반 아웃박스 (같은 호스트의 여러 프로세스가 공유 가능)"""
+
+    def __init__(self, path: str, owner: Optional[str] = None, lease_seconds: float = 300):
+        self.path = path
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS push_outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " created_at REAL NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " lease_owner TEXT,"
+            " lease_expires_at REAL)"
+        )
+
+    def enqueue(self, messages: list[PushMessage]):
+        if not messages:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO push_outbox (created_at, payload) VALUES (?, ?)",
+                    [(now, _dump(message)) for message in messages]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def lease(self, limit: int) -> list[tuple[int, float, PushMessage]]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 아무도 꺼내지 않았거나 lease가 만료된(발송 중 종료된 프로세스의) 항목
+                rows = self._conn.execute(
+                    "SELECT id, created_at, payload FROM push_outbox"
+                    " WHERE lease_owner IS NULL OR lease_expires_at < ? ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                if rows:
+                    self._conn.execute(
+                        "UPDATE push_outbox SET lease_owner = ?, lease_expires_at = ?"
+                        f" WHERE id IN ({','.join('?' * len(rows))})",
+                        [self.owner, now + self.lease_seconds, *(row[0] for row in rows)]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(row[0], row[1], _load(row[2])) for row in rows]
+
+    def ack(self, ids: list[int]):
+        self._update_ids("DELETE FROM push_outbox WHERE id IN ({})", ids)
+
+    def release(self, ids: list[int]):
+        # lease가 만료되어 다른 프로세스가 가져간 항목은 건드리지 않음
+        self._update_ids(
+            "UPDATE push_outbox SET lease_owner = NULL, lease_expires_at = NULL"
+            " WHERE lease_owner = ? AND id IN ({})",
+            ids, self.owner
+        )
+
+    def _update_ids(self, sql: str, ids: list[int], *params):
+        # SQLite 바인딩 변수 개수 제한(기본 999) 이내로 나눔
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                self._conn.execute(sql.format(",".join("?" * len(chunk))), [*params, *chunk])
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM push_outbox").fetchone()[0]
+
+    def checkpoint(self):
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FilePushOutbox(PushOutbox):
+    """
+    append-only 로그 파일 기반 아웃박스
+    - enqueue/ack를 한 줄씩 이어 쓰고(fsync), 기동 시 로그를 재생해 대기열 복원
+    - ack된 기록이 쌓이면 대기 항목만 남기도록 로그를 다시 씀(compaction)
+    - 다른 프로세스가 같은 로그를 열면 같은 항목을 중복 발송하므로 잠금 파일로 막음
+    """
+
+    def __init__(self, path: str, compact_threshold: int = 10000):
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self._lock_file = self._acquire_process_lock(f"{path}.lock")
+        self._lock = threading.Lock()
+        # id → (등록 시각, payload); 삽입 순서 = 등록 순서
+        self._pending: dict[int, tuple[float, str]] = {}
+        self._leased: dict[int, tuple[float, str]] = {}
+        self._next_id = 1
+        self._acked_since_compact = 0
+        self._replay()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _acquire_process_lock(lock_path: str):
+        lock_file = open(lock_path, "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                raise RuntimeError(
+                    f"다른 프로세스가 아웃박스 로그를 사용 중입니다: {lock_path} "
+                    "(다중 워커에서는 PUSH_OUTBOX_BACKEND=sqlite 사용)"
+                )
+        return lock_file
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 마지막 줄이 쓰다 만 상태로 종료된 경우
+                    continue
+                if record["op"] == "enq":
+                    self._pending[record["id"]] = (record["at"], record["msg"])
+                    self._next_id = max(self._next_id, record["id"] + 1)
+                elif record["op"] == "ack":
+                    for item_id in record["ids"]:
+                        self._pending.pop(item_id, None)
+
+    def _append(self, records: list[dict]):
+        self._file.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def enqueue(self, messages: list[PushMessage]):
+        if not messages:
+            return
+        now = time.time()
+        with self._lock:
+            records = []
+            for message in messages:
+                records.append({"op": "enq", "id": self._next_id, "at": now, "msg": _dump(message)})
+                self._next_id += 1
+            self._append(records)
+            for record in records:
+                self._pending[record["id"]] = (now, record["msg"])
+
+    def lease(self, limit: int) -> list[tuple[int, float, PushMessage]]:
+        with self._lock:
+            ids = list(self._pending)[:limit]
+            items = []
+            for item_id in ids:
+                created_at, payload = self._pending.pop(item_id)
+                self._leased[item_id] = (created_at, payload)
+                items.append((item_id, created_at, _load(payload)))
+        return items
+
+    def ack(self, ids: list[int]):
+        if not ids:
+            return
+        with self._lock:
+            self._append([{"op": "ack", "ids": ids}])
+            for item_id in ids:
+                self._leased.pop(item_id, None)
+                self._pending.pop(item_id, None)
+            self._acked_since_compact += len(ids)
+            if self._acked_since_compact >= self.compact_threshold:
+                self._compact()
+
+    def release(self, ids: list[int]):
+        with self._lock:
+            for item_id in ids:
+                item = self._leased.pop(item_id, None)
+                if item is not None:
+                    self._pending[item_id] = item
+            # 되돌린 항목이 먼저 발송되도록 id 순으로 재정렬
+            self._pending = dict(sorted(self._pending.items()))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending) + len(self._leased)
+
+    def _compact(self):
+        """대기/발송 중 항목만 새 파일에 쓰고 원자적으로 교체"""
+        items = sorted({**self._pending, **self._leased}.items())
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for item_id, (created_at, payload) in items:
+                f.write(json.dumps(
+                    {"op": "enq", "id": item_id, "at": created_at, "msg": payload},
+                    ensure_ascii=False
+                ) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._acked_since_compact = 0
+
+    def checkpoint(self):
+        with self._lock:
+            self._compact()
+
+    def close(self):
+        """로그 파일과 프로세스 잠금 해제"""
+        with self._lock:
+            self._file.close()
+            self._lock_file.close()
+
+
+def create_push_outbox() -> PushOutbox:
+    """설정(PUSH_OUTBOX_BACKEND)에 맞는 아웃박스 생성"""
+    if settings.PUSH_OUTBOX_BACKEND == "file":
+        if settings.SCHEDULER_COORDINATION != "none":
+            raise RuntimeError(
+                "PUSH_OUTBOX_BACKEND=file은 단일 프로세스 전용입니다. "
+                "SCHEDULER_COORDINATION을 사용하는 다중 워커에서는 sqlite를 사용하세요."
+            )
+        return FilePushOutbox(settings.PUSH_OUTBOX_PATH)
+    return SQLitePushOutbox(
+        settings.PUSH_OUTBOX_PATH,
+        lease_seconds=settings.PUSH_OUTBOX_LEASE_SECONDS
+    )
@@ -0,0 +1,204 @@
+"""
+Push 재시도 지연 큐
+- 429(쓰로틀링) / 5xx / 네트워크 오류로 실패한 발송을 암호화된 본문 그대로 보관했다가 재전송
+- 대기 시간은 Retry-After를 우선하고, 없으면 지터를 섞은 지수 백오프
+- 알람이 의미 없어지는 마감 시각(deadline)이 지나면 폐기
+- 재시도 중 만료(404/410)된 구독은 라운드 단위로 모아 한 번에 삭제
+"""
+from typing import NamedTuple, Optional
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+from app.core.config import settings
+from app.api.endpoints.push import (
+    DELIVERY_GONE,
+    DELIVERY_RETRY,
+    DELIVERY_SENT,
+    prune_subscriptions,
+    send_encrypted_push,
+)
+
+
+class RetryItem(NamedTuple):
+    """재시도 대기 항목 (due/deadline은 time.monotonic 기준)"""
+    due: float
+    seq: int
+    endpoint: str
+    body: bytes
+    tag: str
+    attempt: int
+    deadline: float
+
+
+class PushRetryQueue:
+    """Retry-After/지수 백오프 기반 재시도 큐"""
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_seconds: float = 2.0,
+        max_backoff_seconds: float = 120.0,
+        deadline_seconds: float = 600.0,
+        concurrency: int = 32
+    ):
+        self.max_attempts = max_attempts
+        self.base_seconds = base_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.deadline_seconds = deadline_seconds
+        self.concurrency = max(1, concurrency)
+        self.is_running = False
+        self._task: Optional[asyncio.Task] = None
+        self._heap: list[RetryItem] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.recovered = 0
+        self.expired = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        다음 재시도까지 대기 시간 (초)
+        - 지수 백오프의 절반 + 무작위 절반(equal jitter)으로 동시 재시도 분산
+        - Retry-After가 있으면 그 이전에는 재시도하지 않음
+        """
+        ceiling = min(self.max_backoff_seconds, self.base_seconds * (2 ** attempt))
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        if retry_after is not None:
+            delay = max(delay, retry_after + random.uniform(0, self.base_seconds))
+        return delay
+
+    def schedule(
+        self,
+        endpoint: str,
+        body: bytes,
+        tag: str,
+        attempt: int = 0,
+        retry_after: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> bool:
+        """
+        실패한 발송을 재시도 큐에 등록
+
+        Returns:
+            bool: 등록 여부 (시도 횟수 초과 또는 마감 시각 이후면 폐기)
+        """
+        now = time.monotonic()
+        if deadline is None:
+            deadline = now + self.deadline_seconds
+        due = now + self.backoff(attempt, retry_after)
+
+        if attempt >= self.max_attempts or due >= deadline:
+            self.expired += 1
+            return False
+
+        heapq.heappush(self._heap, RetryItem(due, next(self._seq), endpoint, body, tag, attempt, deadline))
+        self._wakeup.set()
+        return True
+
+    async def start(self):
+        """재시도 루프 시작"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._run_loop())
+
+    async def stop(self):
+        """재시도 루프 중지 (대기 중인 항목은 폐기)"""
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._heap:
+            print(f"[PushRetry] 종료 시 재시도 대기 {len(self._heap)}건 폐기")
+            self._heap.clear()
+
+    async def _run_loop(self):
+        while self.is_running:
+            try:
+                await self._wait_until_due()
+                await self.run_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"[PushRetry] 루프 오류: {e}")
+
+    async def _wait_until_due(self):
+        """가장 이른 재시도 시각까지 대기 (새 항목 등록 시 깨어남)"""
+        self._wakeup.clear()
+        timeout = None
+        if self._heap:
+            timeout = self._heap[0].due - time.monotonic()
+            if timeout <= 0:
+                return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run_once(self) -> int:
+        """
+        재시도 시각이 된 항목을 동시성 제한 하에 재전송
+
+        Returns:
+            int: 재전송한 항목 수
+        """
+        now = time.monotonic()
+        due: list[RetryItem] = []
+        while self._heap and self._heap[0].due <= now:
+            due.append(heapq.heappop(self._heap))
+        if not due:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        dead: list[str] = []
+
+        async def retry(item: RetryItem):
+            if item.deadline <= time.monotonic():
+                self.expired += 1
+                return
+            async with semaphore:
+                # 마감 시각 이후에는 Push 서비스도 보관하지 않도록 남은 시간만 TTL로 전달
+                ttl = min(settings.PUSH_TTL_SECONDS, int(item.deadline - time.monotonic()))
+                result = await send_encrypted_push(item.endpoint, item.body, item.tag, ttl=max(0, ttl))
+            if result.status == DELIVERY_SENT:
+                self.recovered += 1
+            elif result.status == DELIVERY_GONE:
+                dead.append(item.endpoint)
+            elif result.status == DELIVERY_RETRY:
+                self.schedule(
+                    item.endpoint, item.body, item.tag,
+                    attempt=item.attempt + 1,
+                    retry_after=result.retry_after,
+                    deadline=item.deadline
+                )
+
+        await asyncio.gather(*[retry(item) for item in due], return_exceptions=True)
+
+        if dead:
+            try:
+                await asyncio.to_thread(prune_subscriptions, dead)
+            except Exception as e:
+                print(f"[PushRetry] 만료 구독 삭제 오류: {e}")
+
+        print(f"[PushRetry] 재시도 {len(due)}건 (누적 복구: {self.recovered}, "
+              f"누적 폐기: {self.expired}, 대기: {len(self._heap)})")
+        return len(due)
+
+
+# 싱글톤 인스턴스
+push_retry_queue = PushRetryQueue(
+    max_attempts=settings.PUSH_RETRY_MAX_ATTEMPTS,
+    base_seconds=settings.PUSH_RETRY_BASE_SECONDS,
+    max_backoff_seconds=settings.PUSH_RETRY_MAX_BACKOFF_SECONDS,
+    deadline_seconds=settings.PUSH_RETRY_DEADLINE_SECONDS,
+    concurrency=settings.PUSH_FANOUT_CONCURRENCY
+)
@@ -0,0 +1,135 @@
+"""
+규칙 기반 복용 스케줄 생성
+- 처방전의 한글 복용 횟수/시기 문자열을 해석하여 복용 시각 목록을 만듦
+  예: "1일 3회" + "식전" → 아침/점심/저녁 식사 30분 전
+      "8시간마다" → 아침 식사 시각부터 8시간 간격
+      "1일 1회 취침 전" → 취침 시각
+- 식사/취침 시각은 사용자별로 받고, 해석할 수 없는 약만 LLM으로 넘김
+"""
+from typing import Optional
+import re
+
+from app.schemas.medicine import MealTimes
+
+BEFORE_MEAL_MINUTES = 30  # 식전 기본값 (식사 30분 전)
+BETWEEN_MEALS_MINUTES = 120  # 식간 (식후 2시간)
+
+_KOREAN_COUNTS = {"한": 1, "두": 2, "세": 3, "네": 4, "다섯": 5, "여섯": 6}
+# 하루 복용 횟수는 "1일/하루/매일" 뒤에 오는 횟수만 인정 ("1회 1정"의 1회는 1회 복용량)
+_COUNT_PATTERN = re.compile(
+    r"(?:(?<!\d)1\s*일|하루|매일)\s*(?:에\s*)?(\d+|한|두|세|네|다섯|여섯)\s*(?:회|번|차례)"
+)
+# 매일 복용이 아닌 횟수 (2일 1회, 격일, 주 1회, 매주, 월 1회 등) → 규칙으로 만들지 않음
+_NON_DAILY_PATTERN = re.compile(
+    r"(?<!\d)(?:[2-9]|[1-9]\d+)\s*일\s*(?:에|마다|간격|(?=\d|한|두))"
+    r"|격일|격주|매주|매월|개월|달에"
+    r"|주\s*(?:에\s*)?(?:\d+|한|두|세|네|다섯|여섯)\s*(?:회|번|차례)"
+    r"|월\s*(?:에\s*)?(?:\d+|한|두|세)\s*(?:회|번|차례)"
+)
+_INTERVAL_PATTERN = re.compile(r"(\d+)\s*시간\s*(?:마다|간격|에\s*한\s*번|에\s*1\s*회)")
+_OFFSET_PATTERN = re.compile(r"(\d+)\s*(분|시간)")
+
+# 명시적 시점 단어 → 슬롯
+_SLOT_WORDS = (
+    ("breakfast", ("아침", "조식")),
+    ("lunch", ("점심", "중식")),
+    ("dinner", ("저녁", "석식")),
+    ("bedtime", ("취침", "자기 전", "자기전", "잠자기", "잘 때", "수면 전")),
+)
+# 1일 n회 → 슬롯 배정
+_SLOTS_BY_COUNT = {
+    1: ("breakfast",),
+    2: ("breakfast", "dinner"),
+    3: ("breakfast", "lunch", "dinner"),
+    4: ("breakfast", "lunch", "dinner", "bedtime"),
+}
+
+
+def _to_minutes(hhmm: str) -> int:
+    hour, minute = hhmm.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def _to_hhmm(minutes: int) -> str:
+    minutes %= 24 * 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _meal_offset(timing: str) -> Optional[int]:
+    """복용 시기 → 식사 시각 기준 분 단위 오프셋 (해석 불가 시 None)"""
+    text = timing.replace(" ", "")
+    if not text or text in ("anytime", "상관없음", "무관"):
+        return 0
+    if text == "before_meal":
+        return -BEFORE_MEAL_MINUTES
+    if text == "after_meal":
+        return 0
+
+    offset = _OFFSET_PATTERN.search(timing)
+    amount = None
+    if offset:
+        amount = int(offset.group(1)) * (60 if offset.group(2) == "시간" else 1)
+
+    if "식전" in text or "공복" in text:
+        return -(amount if amount is not None else BEFORE_MEAL_MINUTES)
+    if "식후" in text:
+        return amount or 0
+    if "식간" in text:
+        return BETWEEN_MEALS_MINUTES
+    if any(word in text for word in ("취침", "자기전", "잠자기", "수면전")):
+        return 0
+    if "식사와함께" in text or "식사중" in text or "식중" in text:
+        return 0
+    return None
+
+
+def build_schedule_times(frequency: str, timing: str, meals: MealTimes) -> Optional[list[str]]:
+    """
+    복용 횟수/시기 문자열로 복용 시각 목록 생성
+
+    Returns:
+        list[str] | None: 정렬된 "HH:MM" 목록 (해석할 수 없으면 None)
+    """
+    frequency = frequency or ""
+    timing = timing or ""
+    text = f"{frequency} {timing}"
+
+    if "필요시" in text.replace(" ", "") or "prn" in text.lower():
+        return None
+    if _NON_DAILY_PATTERN.search(frequency):
+        return None
+
+    # 시간 간격 복용: 아침 식사 시각부터 하루 안에 들어가는 만큼
+    interval = _INTERVAL_PATTERN.search(text)
+    if interval:
+        hours = int(interval.group(1))
+        if not 1 <= hours <= 24:
+            return None
+        start = _to_minutes(meals.breakfast)
+        return sorted({_to_hhmm(start + i * hours * 60) for i in range(24 // hours)})
+
+    offset = _meal_offset(timing)
+    if offset is None:
+        return None
+
+    slots = [slot for slot, words in _SLOT_WORDS if any(word in text for word in words)]
+    count_match = _COUNT_PATTERN.search(frequency)
+    count = None
+    if count_match:
+        value = count_match.group(1)
+        count = int(value) if value.isdigit() else _KOREAN_COUNTS[value]
+
+    if not slots:
+        if count not in _SLOTS_BY_COUNT:
+            return None
+        slots = list(_SLOTS_BY_COUNT[count])
+    elif count and count > len(slots):
+        # "1일 2회 아침" 처럼 시점이 부족하면 해석하지 않음
+        return None
+
+    times = set()
+    for slot in slots:
+        base = _to_minutes(getattr(meals, slot))
+        # 취침 시각에는 식사 기준 오프셋을 적용하지 않음
+        times.add(_to_hhmm(base if slot == "bedtime" else base + offset))
+    return sorted(times)
@@ -0,0 +1,95 @@
+"""
+스케줄러 인스턴스 조율
+- 여러 워커/레플리카가 같은 알람을 중복 발송하지 않도록 lease 테이블로 조율
+- leader: 살아있는 인스턴스 중 id가 가장 작은 하나만 발송
+- shard: user_id 해시로 사용자를 살아있는 인스턴스들에 분배
+- none: 조율 없이 모든 알람 발송 (단일 프로세스 배포)
+"""
+from typing import Optional
+import asyncio
+import os
+import socket
+import uuid
+import zlib
+
+from app.services.scheduler_store import SchedulerStore
+
+COORDINATION_MODES = ("none", "leader", "shard")
+
+
+def user_shard(user_id: str, shard_count: int) -> int:
+    """프로세스와 무관하게 고정된 user_id 해시 샤드 번호"""
+    return zlib.crc32(user_id.encode("utf-8")) % shard_count
+
+
+class SchedulerCoordinator:
+    """하트비트 기반 리더 선출 / 사용자 샤딩"""
+
+    def __init__(
+        self,
+        mode: str = "none",
+        store: Optional[SchedulerStore] = None,
+        ttl_seconds: float = 150
+    ):
+        if mode not in COORDINATION_MODES:
+            raise ValueError(f"지원하지 않는 조율 모드입니다: {mode}")
+        if mode != "none" and store is None:
+            raise ValueError("조율 모드에는 SchedulerStore가 필요합니다.")
+
+        self.mode = mode
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.instance_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.members: list[str] = []
+
+    @property
+    def shard_index(self) -> Optional[int]:
+        try:
+            return self.members.index(self.instance_id)
+        except ValueError:
+            return None
+
+    @property
+    def is_leader(self) -> bool:
+        return bool(self.members) and self.members[0] == self.instance_id
+
+    async def sync(self):
+        """하트비트 갱신 및 멤버 목록 재계산 (실패 시 마지막으로 본 목록 유지)"""
+        if self.mode == "none":
+            return
+
+        try:
+            members = await asyncio.to_thread(
+                self.store.heartbeat, self.instance_id, self.ttl_seconds
+            )
+        except Exception as e:
+            print(f"[SchedulerCoordinator] 하트비트 오류: {e}")
+            return
+
+        if members != self.members:
+            print(f"[SchedulerCoordinator] 멤버 변경: {len(self.members)} → {len(members)}개 "
+                  f"(모드: {self.mode}, 내 인덱스: "
+                  f"{members.index(self.instance_id) if self.instance_id in members else '-'})")
+        self.members = members
+
+    async def release(self):
+        """종료 시 lease 반납"""
+        if self.mode == "none":
+            return
+        try:
+            await asyncio.to_thread(self.store.release, self.instance_id)
+        except Exception as e:
+            print(f"[SchedulerCoordinator] lease 반납 오류: {e}")
+        self.members = []
+
+    def owns(self, user_id: str) -> bool:
+        """이 인스턴스가 해당 사용자의 알람을 발송해야 하는지 여부"""
+        if self.mode == "none":
+            return True
+        if self.mode == "leader":
+            return self.is_leader
+
+        index = self.shard_index
+        if index is None:
+            return False
+        return user_shard(user_id, len(self.members)) == index
@@ -0,0 +1,247 @@
+"""
+스케줄러 공유 저장소
+- 여러 프로세스/인스턴스의 AlarmScheduler가 하트비트(lease)를 공유하는 저장소
+- 마지막 처리 분(watermark)과 발송 원장(user_id, fire_minute) 보관
+- 운영: Supabase(Postgres) 테이블 / 로컬 테스트: SQLite 파일
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+from app.core.supabase import get_supabase_admin
+
+# 발송 원장 upsert 1회당 최대 행 수
+LEDGER_CHUNK = 500
+
+
+class SchedulerStore(ABC):
+    """스케줄러 저장소 인터페이스"""
+
+    @abstractmethod
+    def heartbeat(self, instance_id: str, ttl_seconds: float) -> list[str]:
+        """
+        내 하트비트를 갱신하고 살아있는 인스턴스 id 목록을 반환
+
+        Returns:
+            list[str]: TTL 이내에 하트비트가 있는 인스턴스 id (정렬됨)
+        """
+
+    @abstractmethod
+    def release(self, instance_id: str):
+        """종료 시 lease 반납 (다른 인스턴스가 즉시 재분배하도록)"""
+
+    @abstractmethod
+    def get_watermark(self, key: str) -> Optional[str]:
+        """마지막으로 처리한 분 (UTC ISO 문자열)"""
+
+    @abstractmethod
+    def set_watermark(self, key: str, value: str):
+        """마지막으로 처리한 분 기록"""
+
+    @abstractmethod
+    def claim_deliveries(self, keys: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        """
+        (user_id, fire_minute) 발송 권한을 한 번에 선점
+
+        Returns:
+            set: 이번 호출로 새로 기록된 키 (이미 발송된 키는 제외)
+        """
+
+    @abstractmethod
+    def list_deliveries(self, since: str) -> list[tuple[str, str]]:
+        """since(UTC ISO 문자열) 이후 발송 원장에 기록된 (user_id, fire_minute) 목록"""
+
+    @abstractmethod
+    def prune_deliveries(self, before: str):
+        """보관 기간이 지난 발송 원장 정리"""
+
+
+class SupabaseSchedulerStore(SchedulerStore):
+    """Supabase scheduler_instances / scheduler_state / alarm_deliveries 테이블 기반 저장소"""
+
+    def heartbeat(self, instance_id: str, ttl_seconds: float) -> list[str]:
+        supabase = get_supabase_admin()
+        now = datetime.now(timezone.utc)
+
+        supabase.table("scheduler_instances").upsert({
+            "instance_id": instance_id,
+            "heartbeat_at": now.isoformat()
+        }, on_conflict="instance_id").execute()
+
+        cutoff = (now - timedelta(seconds=ttl_seconds)).isoformat()
+        # 만료된 인스턴스 정리 후 살아있는 목록 조회
+        supabase.table("scheduler_instances").delete().lt("heartbeat_at", cutoff).execute()
+        result = supabase.table("scheduler_instances").select("instance_id").gte(
+            "heartbeat_at", cutoff
+        ).order("instance_id").execute()
+
+        return [row["instance_id"] for row in result.data or []]
+
+    def release(self, instance_id: str):
+        get_supabase_admin().table("scheduler_instances").delete().eq(
+            "instance_id", instance_id
+        ).execute()
+
+    def get_watermark(self, key: str) -> Optional[str]:
+        result = get_supabase_admin().table("scheduler_state").select("value").eq(
+            "key", key
+        ).execute()
+        return result.data[0]["value"] if result.data else None
+
+    def set_watermark(self, key: str, value: str):
+        get_supabase_admin().table("scheduler_state").upsert({
+            "key": key,
+            "value": value,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }, on_conflict="key").execute()
+
+    def claim_deliveries(self, keys: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        supabase = get_supabase_admin()
+        claimed = set()
+        for i in range(0, len(keys), LEDGER_CHUNK):
+            chunk = keys[i:i + LEDGER_CHUNK]
+            # ON CONFLICT DO NOTHING: 응답에는 새로 삽입된 행만 포함됨
+            result = supabase.table("alarm_deliveries").upsert(
+                [{"user_id": user_id, "fire_minute": fire_minute} for user_id, fire_minute in chunk],
+                on_conflict="user_id,fire_minute",
+                ignore_duplicates=True
+            ).execute()
+            for row in result.data or []:
+                # Postgres가 timestamptz를 다른 표기로 돌려줄 수 있으므로 정규화
+                fire_minute = datetime.fromisoformat(row["fire_minute"]).astimezone(timezone.utc)
+                claimed.add((row["user_id"], fire_minute.isoformat()))
+        return claimed
+
+    def list_deliveries(self, since: str) -> list[tuple[str, str]]:
+        supabase = get_supabase_admin()
+        deliveries = []
+        start = 0
+        while True:
+            rows = supabase.table("alarm_deliveries").select("user_id,fire_minute").gte(
+                "fire_minute", since
+            ).order("fire_minute").range(start, start + LEDGER_CHUNK - 1).execute().data or []
+            for row in rows:
+                fire_minute = datetime.fromisoformat(row["fire_minute"]).astimezone(timezone.utc)
+                deliveries.append((row["user_id"], fire_minute.isoformat()))
+            if len(rows) < LEDGER_CHUNK:
+                return deliveries
+            start += LEDGER_CHUNK
+
+    def prune_deliveries(self, before: str):
+        get_supabase_admin().table("alarm_deliveries").delete().lt(
+            "fire_minute", before
+        ).execute()
+
+
+class SQLiteSchedulerStore(SchedulerStore):
+    """SQLite 파일 기반 저장소 (로컬 개발/테스트 및 단일 호스트 다중 워커용)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scheduler_instances ("
+            " instance_id TEXT PRIMARY KEY,"
+            " heartbeat_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scheduler_state ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS alarm_deliveries ("
+            " user_id TEXT NOT NULL,"
+            " fire_minute TEXT NOT NULL,"
+            " PRIMARY KEY (user_id, fire_minute))"
+        )
+
+    def heartbeat(self, instance_id: str, ttl_seconds: float) -> list[str]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO scheduler_instances (instance_id, heartbeat_at) VALUES (?, ?)"
+                    " ON CONFLICT(instance_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                    (instance_id, now)
+                )
+                self._conn.execute(
+                    "DELETE FROM scheduler_instances WHERE heartbeat_at < ?",
+                    (now - ttl_seconds,)
+                )
+                rows = self._conn.execute(
+                    "SELECT instance_id FROM scheduler_instances ORDER BY instance_id"
+                ).fetchall()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [row[0] for row in rows]
+
+    def release(self, instance_id: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM scheduler_instances WHERE instance_id = ?", (instance_id,)
+            )
+
+    def get_watermark(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM scheduler_state WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO scheduler_state (key, value) VALUES (?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    def claim_deliveries(self, keys: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        claimed = set()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key in keys:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO alarm_deliveries (user_id, fire_minute) VALUES (?, ?)",
+                        key
+                    )
+                    if cursor.rowcount:
+                        claimed.add(key)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return claimed
+
+    def list_deliveries(self, since: str) -> list[tuple[str, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, fire_minute FROM alarm_deliveries"
+                " WHERE fire_minute >= ? ORDER BY fire_minute",
+                (since,)
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def prune_deliveries(self, before: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM alarm_deliveries WHERE fire_minute < ?", (before,)
+            )
+
+
+def create_scheduler_store() -> SchedulerStore:
+    """설정(SCHEDULER_STORE)에 맞는 저장소 생성"""
+    if settings.SCHEDULER_STORE == "sqlite":
+        return SQLiteSchedulerStore(settings.SCHEDULER_SQLITE_PATH)
+    return SupabaseSchedulerStore()
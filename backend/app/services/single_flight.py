@@ -0,0 +1,51 @@
+"""
+동일 요청 합치기 (single-flight)
+- 같은 키의 호출이 진행 중이면 새로 호출하지 않고 진행 중인 작업의 결과를 함께 기다림
+- 작업은 별도 Task로 실행하고 호출자는 shield로 기다리므로,
+  한 호출자가 취소(클라이언트 연결 끊김 등)되어도 다른 호출자의 작업은 계속 진행
+"""
+from typing import Awaitable, Callable, Hashable, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """진행 중인 동일 키 호출을 하나의 작업으로 합침"""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0  # 실제로 실행한 작업 수
+        self.coalesced = 0  # 진행 중인 작업에 합쳐진 호출 수
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        key로 진행 중인 작업이 있으면 그 결과를, 없으면 factory()를 실행한 결과를 반환
+
+        작업이 예외로 끝나면 기다리던 모든 호출자에게 같은 예외가 전달됩니다.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 호출자가 취소된 경우에도 예외를 회수하여 경고 로그가 남지 않도록 함
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        total = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "coalesce_rate": round(self.coalesced / total, 4) if total else 0.0,
+        }
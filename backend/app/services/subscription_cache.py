@@ -0,0 +1,151 @@
+"""
+Push 구독 캐시
+- user_id → 구독 목록을 프로세스 메모리에 보관하여 알람 틱마다 구독을 조회하지 않음
+- 캐시에 없는 사용자만 모아 한 번의 in_ 조회로 채움 (구독이 없는 사용자도 캐시)
+- /push/subscribe, /push/unsubscribe, 만료(404/410) 구독 정리 시 무효화
+- 무효화에 의존하므로 TTL은 길게 두고, 다른 인스턴스에서 변경된 구독만 TTL이 지나면 다시 조회
+- 조회 중 무효화된 사용자는 세대(generation) 번호로 감지하여 오래된 결과를 저장하지 않음
+  (세대 번호는 조회 중인 사용자만 유지하고 조회가 끝나면 삭제)
+"""
+from collections import OrderedDict
+import threading
+import time
+
+from app.core.config import settings
+from app.core.supabase import get_supabase_admin
+
+# in_ 필터 URL 길이 제한을 피하기 위한 사용자 id 청크 크기
+SUBSCRIPTION_QUERY_CHUNK = 200
+SUBSCRIPTION_COLUMNS = "user_id,endpoint,p256dh,auth"
+
+
+class SubscriptionCache:
+    """TTL + 크기 제한(LRU) 사용자별 구독 캐시"""
+
+    def __init__(self, ttl_seconds: float = 21600, max_users: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._endpoint_owner: dict[str, str] = {}
+        # 조회 중인 사용자별 진행 중 조회 수와, 그동안 무효화될 때마다 증가하는 세대 번호
+        # (소유자를 모르는 엔드포인트 무효화는 전체 세대를 증가)
+        self._fetching: dict[str, int] = {}
+        self._generations: dict[str, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, user_ids: list[str]) -> dict[str, list[dict]]:
+        """사용자별 구독 목록 반환 (캐시 미스는 한 번에 조회)"""
+        now = time.monotonic()
+        result: dict[str, list[dict]] = {}
+        missing: list[str] = []
+
+        with self._lock:
+            for user_id in user_ids:
+                cached = self._entries.get(user_id)
+                if cached is not None and now - cached[0] < self.ttl_seconds:
+                    self._entries.move_to_end(user_id)
+                    result[user_id] = cached[1]
+                else:
+                    missing.append(user_id)
+            self.hits += len(result)
+            self.misses += len(missing)
+            generation = self._generation
+            user_generations = {user_id: self._generations.get(user_id, 0) for user_id in missing}
+            for user_id in missing:
+                self._fetching[user_id] = self._fetching.get(user_id, 0) + 1
+
+        if missing:
+            try:
+                fetched = self._fetch(missing)
+            except Exception:
+                with self._lock:
+                    for user_id in missing:
+                        self._finish_fetch(user_id)
+                raise
+            with self._lock:
+                for user_id in missing:
+                    subscriptions = fetched.get(user_id, [])
+                    result[user_id] = subscriptions
+                    # 조회 중 무효화되었으면 이번 결과는 반환만 하고 캐시하지 않음
+                    if (
+                        self._generation == generation
+                        and self._generations.get(user_id, 0) == user_generations[user_id]
+                    ):
+                        self._store(user_id, subscriptions, now)
+                    self._finish_fetch(user_id)
+
+        return result
+
+    def get(self, user_id: str) -> list[dict]:
+        return self.get_many([user_id])[user_id]
+
+    def invalidate(self, user_id: str):
+        """사용자 구독 캐시 무효화"""
+        with self._lock:
+            self._bump(user_id)
+            self._drop(user_id)
+
+    def invalidate_endpoint(self, endpoint: str):
+        """엔드포인트를 가진 사용자의 캐시 무효화 (소유자가 바뀌거나 만료된 경우)"""
+        with self._lock:
+            user_id = self._endpoint_owner.get(endpoint)
+            if user_id is None:
+                # 조회 중인 사용자의 엔드포인트일 수 있으므로 진행 중인 조회 결과를 모두 버림
+                self._generation += 1
+                return
+            self._bump(user_id)
+            self._drop(user_id)
+
+    def _bump(self, user_id: str):
+        # 조회 중이 아닌 사용자는 비교할 세대가 없으므로 기록하지 않음
+        if user_id in self._fetching:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def _finish_fetch(self, user_id: str):
+        remaining = self._fetching[user_id] - 1
+        if remaining:
+            self._fetching[user_id] = remaining
+        else:
+            del self._fetching[user_id]
+            self._generations.pop(user_id, None)
+
+    def _store(self, user_id: str, subscriptions: list[dict], now: float):
+        self._drop(user_id)
+        self._entries[user_id] = (now, subscriptions)
+        for sub in subscriptions:
+            self._endpoint_owner[sub["endpoint"]] = user_id
+        while len(self._entries) > self.max_users:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _drop(self, user_id: str):
+        cached = self._entries.pop(user_id, None)
+        if cached is None:
+            return
+        for sub in cached[1]:
+            if self._endpoint_owner.get(sub["endpoint"]) == user_id:
+                del self._endpoint_owner[sub["endpoint"]]
+
+    @staticmethod
+    def _fetch(user_ids: list[str]) -> dict[str, list[dict]]:
+        """사용자별 구독 정보를 청크 단위 in_ 조회로 가져옴"""
+        supabase = get_supabase_admin()
+        by_user: dict[str, list[dict]] = {}
+        for i in range(0, len(user_ids), SUBSCRIPTION_QUERY_CHUNK):
+            chunk = user_ids[i:i + SUBSCRIPTION_QUERY_CHUNK]
+            result = supabase.table("push_subscriptions").select(
+                SUBSCRIPTION_COLUMNS
+            ).in_("user_id", chunk).execute()
+            for sub in result.data or []:
+                by_user.setdefault(sub["user_id"], []).append(sub)
+        return by_user
+
+
+# 싱글톤 인스턴스
+subscription_cache = SubscriptionCache(
+    ttl_seconds=settings.PUSH_SUBSCRIPTION_CACHE_TTL_SECONDS,
+    max_users=settings.PUSH_SUBSCRIPTION_CACHE_MAX_USERS
+)
@@ -0,0 +1,145 @@
+"""
+비동기 Web Push 전송 클라이언트
+- Push 서비스 origin(FCM, Apple, Mozilla autopush 등)별 HTTP/2 연결 풀을 유지하여
+  알림마다 TLS 핸드셰이크를 반복하지 않음
+- TTL / Urgency / Topic 헤더로 오래된 알람은 Push 서비스에서 교체·폐기되도록 함
+- VAPID 서명 헤더는 audience(origin)별로 캐시하여 만료 전까지 재사용
+"""
+from typing import Optional
+from urllib.parse import urlparse
+import base64
+import hashlib
+import time
+
+import httpx
+from py_vapid import Vapid02
+
+from app.core.config import settings
+
+VAPID_EXPIRY_SECONDS = 12 * 60 * 60
+# 만료까지 이 시간보다 적게 남으면 새로 서명 (Push 서비스와의 시계 오차 대비)
+VAPID_REFRESH_MARGIN_SECONDS = 60 * 60
+
+
+def push_origin(endpoint: str) -> str:
+    """엔드포인트 URL의 origin (VAPID aud 및 연결 풀 키)"""
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+def push_topic(tag: str) -> str:
+    """
+    알림 tag를 Topic 헤더 값으로 변환
+    (RFC 8030: URL-safe base64 문자 32자 이하 → sha256 앞 24바이트 사용)
+    """
+    digest = hashlib.sha256(tag.encode("utf-8")).digest()[:24]
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+
+class VapidHeaderCache:
+    """audience별 VAPID Authorization 헤더 캐시 (ES256 서명은 만료 시에만 수행)"""
+
+    def __init__(
+        self,
+        expiry_seconds: int = VAPID_EXPIRY_SECONDS,
+        refresh_margin_seconds: int = VAPID_REFRESH_MARGIN_SECONDS
+    ):
+        self.expiry_seconds = expiry_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._vapid: Optional[Vapid02] = None
+        self._headers: dict[str, tuple[dict, int]] = {}
+        self.signatures = 0
+
+    def get(self, origin: str) -> dict:
+        """origin에 대한 서명 헤더 반환 (없거나 만료 임박 시 새로 서명)"""
+        now = int(time.time())
+        cached = self._headers.get(origin)
+        if cached is not None and cached[1] - now > self.refresh_margin_seconds:
+            return cached[0]
+
+        if self._vapid is None:
+            self._vapid = Vapid02.from_string(private_key=settings.VAPID_PRIVATE_KEY)
+        exp = now + self.expiry_seconds
+        headers = self._vapid.sign({
+            "sub": settings.VAPID_CLAIMS_EMAIL,
+            "aud": origin,
+            "exp": exp,
+        })
+        self.signatures += 1
+        self._headers[origin] = (headers, exp)
+        return headers
+
+    def clear(self):
+        """VAPID 키 변경 시 캐시 초기화"""
+        self._headers.clear()
+        self._vapid = None
+
+
+class AsyncWebPushClient:
+    """origin별 HTTP/2 연결 풀 기반 Web Push 전송기"""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_connections_per_origin: int = 20
+    ):
+        self.timeout = timeout
+        self.max_connections_per_origin = max_connections_per_origin
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self.vapid_headers = VapidHeaderCache()
+
+    def _client(self, origin: str) -> httpx.AsyncClient:
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections_per_origin,
+                    max_keepalive_connections=self.max_connections_per_origin,
+                ),
+            )
+            self._clients[origin] = client
+        return client
+
+    async def send_encrypted(
+        self,
+        endpoint: str,
+        body: bytes,
+        ttl: int = 0,
+        urgency: Optional[str] = None,
+        topic: Optional[str] = None
+    ) -> httpx.Response:
+        """
+        이미 암호화된(aes128gcm) 본문을 Push 서비스로 전송
+
+        Returns:
+            httpx.Response: Push 서비스 응답 (상태 코드 확인은 호출 측에서)
+        """
+        origin = push_origin(endpoint)
+
+        headers = {
+            "Content-Encoding": "aes128gcm",
+            "Content-Type": "application/octet-stream",
+            "TTL": str(ttl),
+        }
+        if urgency:
+            headers["Urgency"] = urgency
+        if topic:
+            headers["Topic"] = topic
+        headers.update(self.vapid_headers.get(origin))
+
+        return await self._client(origin).post(endpoint, content=body, headers=headers)
+
+    async def aclose(self):
+        """모든 연결 풀 종료"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+# 싱글톤 인스턴스
+webpush_client = AsyncWebPushClient(
+    timeout=settings.PUSH_TIMEOUT_SECONDS,
+    max_connections_per_origin=settings.PUSH_MAX_CONNECTIONS_PER_ORIGIN
+)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Gemini 응답 파싱 벤치마크
+기록해 둔 원본 응답(GEMINI_RESPONSE_LOG_PATH JSONL)에 대해
+기존 코드 펜스 제거 + json.loads 방식과 스키마 검증(+복구) 방식의
+파싱 시간과 실패율을 비교합니다.
+
+기록 형식: 한 줄에 {"kind": "prescription|interactions|schedule|chat|chat_summary", "text": "<응답 원문>"}
+
+사용법:
+    python scripts/bench_llm_parse.py <응답 기록 JSONL> [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.schemas.gemini import (  # noqa: E402
+    ChatReply, ChatSummary, InteractionReport, PrescriptionExtraction, ScheduleReport
+)
+from app.services.llm_json import JsonOutput  # noqa: E402
+
+OUTPUTS = {
+    "prescription": JsonOutput("prescription", PrescriptionExtraction),
+    "interactions": JsonOutput("interactions", InteractionReport),
+    "schedule": JsonOutput("schedule", ScheduleReport),
+    "chat": JsonOutput("chat", ChatReply),
+    "chat_summary": JsonOutput("chat_summary", ChatSummary),
+}
+
+
+def legacy_parse(text: str) -> dict:
+    """이전 GeminiService의 코드 펜스 제거 + json.loads"""
+    response_text = text.strip()
+    if response_text.startswith("```"):
+        lines = response_text.split("\n")
+        json_lines = []
+        in_json = False
+        for line in lines:
+            if line.startswith("```json") or line.startswith("```"):
+                in_json = not in_json
+                continue
+            if in_json:
+                json_lines.append(line)
+        response_text = "\n".join(json_lines)
+    return json.loads(response_text)
+
+
+def count_failures(parse, texts: list[str]) -> int:
+    failures = 0
+    for text in texts:
+        try:
+            parse(text)
+        except ValueError:
+            failures += 1
+    return failures
+
+
+def measure(parse, texts: list[str], repeat: int) -> float:
+    """건당 평균 파싱 시간 (마이크로초)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            try:
+                parse(text)
+            except ValueError:
+                pass
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(texts)) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    args.repeat = max(1, args.repeat)
+
+    by_kind: dict[str, list[str]] = defaultdict(list)
+    with open(args.path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("kind") in OUTPUTS:
+                    by_kind[record["kind"]].append(record["text"])
+
+    if not by_kind:
+        print("기록된 응답이 없습니다.")
+        sys.exit(1)
+
+    print(f"{'종류':<14} {'건수':>5} {'기존 us':>9} {'기존 실패':>9} {'스키마 us':>10} {'스키마 실패':>11} {'복구':>5}")
+    for kind, texts in sorted(by_kind.items()):
+        output = OUTPUTS[kind]
+        legacy_failures = count_failures(legacy_parse, texts)
+        schema_failures = count_failures(output.parse, texts)
+        repaired = output.repaired
+        legacy_us = measure(legacy_parse, texts, args.repeat)
+        schema_us = measure(output.parse, texts, args.repeat)
+        print(f"{kind:<14} {len(texts):>5} {legacy_us:>9.1f} {legacy_failures:>9} "
+              f"{schema_us:>10.1f} {schema_failures:>11} {repaired:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+OCR 전처리 해상도 튜닝 스크립트
+로컬 처방전 이미지 모음에 대해 긴 변 해상도별 전처리 결과(용량/시간)를 비교하고,
+--ocr 옵션을 주면 Gemini로 인식까지 실행하여 정답 대비 약물 인식률을 계산합니다.
+
+정답 파일: 이미지와 같은 이름의 .json (약물 이름 목록), 예) rx01.jpg + rx01.json = ["암로디핀정 5mg", ...]
+
+사용법:
+    python scripts/bench_ocr_preprocess.py <이미지 폴더> [--sides 1024,1536,2048] [--ocr]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings  # noqa: E402
+from app.services.drug_names import normalize_drug_name  # noqa: E402
+from app.services.image_preprocess import preprocess_image  # noqa: E402
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".heic")
+
+
+def load_corpus(folder: str) -> list[tuple[str, bytes, list[str] | None]]:
+    corpus = []
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in IMAGE_EXTENSIONS:
+            continue
+        with open(os.path.join(folder, name), "rb") as f:
+            data = f.read()
+        expected = None
+        answer_path = os.path.join(folder, f"{stem}.json")
+        if os.path.exists(answer_path):
+            with open(answer_path, encoding="utf-8") as f:
+                expected = json.load(f)
+        corpus.append((name, data, expected))
+    return corpus
+
+
+async def recognition_rate(images: list[tuple[bytes, str, list[str]]]) -> float:
+    from app.services.gemini_service import gemini_service
+
+    found = total = 0
+    for data, mime_type, expected in images:
+        result = await gemini_service.analyze_prescription_image(data, mime_type)
+        recognized = {normalize_drug_name(m.name) for m in result.get("medicines", [])}
+        wanted = {normalize_drug_name(name) for name in expected}
+        found += len(wanted & recognized)
+        total += len(wanted)
+    return found / total if total else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder")
+    parser.add_argument("--sides", default="1024,1536,2048,3072")
+    parser.add_argument("--ocr", action="store_true", help="Gemini 인식률까지 측정 (API 호출 발생)")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.folder)
+    if not corpus:
+        print("이미지가 없습니다.")
+        sys.exit(1)
+
+    original_kb = statistics.mean(len(data) for _, data, _ in corpus) / 1024
+    print(f"이미지 {len(corpus)}장, 원본 평균 {original_kb:.0f}KB")
+    print(f"{'긴 변':>6} {'평균 KB':>8} {'평균 ms':>8} {'인식률':>7}")
+
+    for side in (int(s) for s in args.sides.split(",")):
+        results = [
+            preprocess_image(
+                data,
+                max_side=side,
+                grayscale=settings.OCR_GRAYSCALE,
+                autocontrast=settings.OCR_AUTOCONTRAST,
+                image_format=settings.OCR_IMAGE_FORMAT,
+                max_bytes=settings.OCR_MAX_IMAGE_BYTES,
+            )
+            for _, data, _ in corpus
+        ]
+        avg_kb = statistics.mean(r.stats.output_bytes for r in results) / 1024
+        avg_ms = statistics.mean(r.stats.elapsed_ms for r in results)
+
+        rate = "-"
+        labeled = [
+            (r.data, r.mime_type, expected)
+            for r, (_, _, expected) in zip(results, corpus) if expected
+        ]
+        if args.ocr and labeled:
+            rate = f"{asyncio.run(recognition_rate(labeled)) * 100:.1f}%"
+        print(f"{side:>6} {avg_kb:>8.0f} {avg_ms:>8.0f} {rate:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+VAPID 서명 캐시 마이크로 벤치마크
+Push 1건당 CPU 시간을 서명 캐시 적용 전/후로 비교합니다.
+(네트워크 전송은 제외, 암호화 + VAPID 헤더 생성만 측정)
+
+사용법:
+    python scripts/bench_vapid_signing.py [알림 수]
+"""
+
+import base64
+import os
+import sys
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from py_vapid import Vapid02
+from pywebpush import WebPusher
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings  # noqa: E402
+from app.services.webpush_client import VapidHeaderCache, push_origin  # noqa: E402
+
+# 실제 구독 분포와 비슷하게 소수의 Push 서비스 origin 사용
+ENDPOINTS = [
+    "https://fcm.googleapis.com/fcm/send/",
+    "https://web.push.apple.com/",
+    "https://updates.push.services.mozilla.com/wpush/v2/",
+]
+
+
+def b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().strip("=")
+
+
+def make_subscriptions(count: int) -> list[dict]:
+    """테스트용 구독 정보 생성"""
+    subscriptions = []
+    for i in range(count):
+        key = ec.generate_private_key(ec.SECP256R1())
+        subscriptions.append({
+            "endpoint": f"{ENDPOINTS[i % len(ENDPOINTS)]}{i}",
+            "keys": {
+                "p256dh": b64(key.public_key().public_bytes(
+                    serialization.Encoding.X962,
+                    serialization.PublicFormat.UncompressedPoint
+                )),
+                "auth": b64(os.urandom(16)),
+            },
+        })
+    return subscriptions
+
+
+def run(subscriptions: list[dict], headers_for) -> float:
+    """알림 1건당 CPU 시간(ms)"""
+    payload = '{"title": "💊 복약 시간입니다!", "body": "08:00 식후\\n암로디핀정 5mg"}'
+    started = time.process_time()
+    for sub in subscriptions:
+        WebPusher(sub).encode(payload, "aes128gcm")
+        headers_for(push_origin(sub["endpoint"]))
+    return (time.process_time() - started) * 1000 / len(subscriptions)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    vapid = Vapid02()
+    vapid.generate_keys()
+    settings.VAPID_PRIVATE_KEY = b64(
+        vapid.private_key.private_numbers().private_value.to_bytes(32, "big")
+    )
+
+    subscriptions = make_subscriptions(count)
+
+    def sign_every_time(origin: str) -> dict:
+        return Vapid02.from_string(private_key=settings.VAPID_PRIVATE_KEY).sign({
+            "sub": settings.VAPID_CLAIMS_EMAIL,
+            "aud": origin,
+            "exp": int(time.time()) + 12 * 60 * 60,
+        })
+
+    cache = VapidHeaderCache()
+
+    before = run(subscriptions, sign_every_time)
+    after = run(subscriptions, cache.get)
+
+    print("=" * 60)
+    print(f"알림 {count}건 (origin {len(ENDPOINTS)}개)")
+    print("=" * 60)
+    print(f"서명 캐시 미적용: {before:.3f} ms/건 (서명 {count}회)")
+    print(f"서명 캐시 적용:   {after:.3f} ms/건 (서명 {cache.signatures}회)")
+    print(f"절감: {(1 - after / before) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+DUR 병용금기 인덱스 스냅샷 생성 스크립트
+식약처 DUR 병용금기 CSV(및 품목 CSV)를 성분 id 인덱스로 컴파일하여
+서버 기동 시 바로 로드할 수 있는 바이너리 스냅샷으로 저장합니다.
+
+사용법:
+    python scripts/build_dur_index.py [병용금기 CSV] [품목 CSV] [스냅샷 경로]
+
+인자를 생략하면 .env의 DUR_INTERACTIONS_CSV / DUR_PRODUCTS_CSV / DUR_SNAPSHOT_PATH를 사용합니다.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings  # noqa: E402
+from app.services.dur_index import DurIndex  # noqa: E402
+
+
+def main():
+    interactions_csv = sys.argv[1] if len(sys.argv) > 1 else settings.DUR_INTERACTIONS_CSV
+    products_csv = sys.argv[2] if len(sys.argv) > 2 else settings.DUR_PRODUCTS_CSV
+    snapshot_path = sys.argv[3] if len(sys.argv) > 3 else settings.DUR_SNAPSHOT_PATH
+
+    if not os.path.exists(interactions_csv):
+        print(f"병용금기 CSV를 찾을 수 없습니다: {interactions_csv}")
+        sys.exit(1)
+
+    # 기존 스냅샷은 무시하고 새로 컴파일
+    if os.path.exists(snapshot_path):
+        os.remove(snapshot_path)
+
+    started = time.perf_counter()
+    index = DurIndex()
+    index.load(interactions_csv, products_csv or None, snapshot_path)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    DurIndex().load(interactions_csv, products_csv or None, snapshot_path)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    print(f"성분 {len(index.ingredients)}개, 별칭 {len(index.aliases)}개, 병용금기 쌍 {len(index.pairs)}개")
+    print(f"CSV 컴파일: {compile_ms:.0f}ms, 스냅샷 로드: {load_ms:.0f}ms")
+    print(f"스냅샷 저장: {snapshot_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services.alarm_index import AlarmIndex, days_to_mask, next_fire_at, parse_minutes
+
+SEOUL = ZoneInfo("Asia/Seoul")
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = []
+
+    def select(self, *_):
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def gte(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def range(self, start, end):
+        self.start, self.end = start, end
+        return self
+
+    def execute(self):
+        if self.client.failing:
+            raise ConnectionError("supabase unavailable")
+        rows = [
+            row for row in self.client.tables.get(self.table, [])
+            if all(row[column] >= value for column, value in self.filters)
+        ]
+        if hasattr(self, "start"):
+            rows = rows[self.start:self.end + 1]
+        # PostgREST 응답 행 수 제한
+        return SimpleNamespace(data=rows[:self.client.max_rows])
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+        self.failing = False
+        self.max_rows = None
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_parse_helpers():
+    assert parse_minutes(["08:00", "8:00", "21:30", "25:00", "x"]) == (480, 1290)
+    assert days_to_mask(None) == 0b1111111
+    assert days_to_mask(["월", "일"]) == 0b1000001
+
+
+def test_next_fire_at_uses_user_timezone():
+    # 서울 08:00 = 전날 23:00 UTC
+    after = utc(2026, 3, 2, 0, 0)  # 월요일 09:00 KST
+    assert next_fire_at(0b1111111, 8 * 60, SEOUL, after) == utc(2026, 3, 2, 23, 0)
+    # 정확히 울림 시각이면 다음 날로 넘어감
+    assert next_fire_at(0b1111111, 8 * 60, SEOUL, utc(2026, 3, 2, 23, 0)) == utc(2026, 3, 3, 23, 0)
+
+
+def test_next_fire_at_skips_days_outside_mask():
+    after = utc(2026, 3, 2, 0, 0)  # 월요일 09:00 KST
+    friday_only = days_to_mask(["금"])
+    assert next_fire_at(friday_only, 8 * 60, SEOUL, after) == utc(2026, 3, 5, 23, 0)
+
+
+def test_next_fire_at_follows_dst_change():
+    # 2026-03-08 미국 서머타임 시작: 08:00 EST(13:00 UTC) → 08:00 EDT(12:00 UTC)
+    before = next_fire_at(0b1111111, 8 * 60, NEW_YORK, utc(2026, 3, 7, 0, 0))
+    after = next_fire_at(0b1111111, 8 * 60, NEW_YORK, before)
+    assert before == utc(2026, 3, 7, 13, 0)
+    assert after == utc(2026, 3, 8, 12, 0)
+
+
+def _tables():
+    return {
+        "profiles": [{"id": "u1", "timezone": "Asia/Seoul", "updated_at": "1"}],
+        "medicines": [{
+            "id": "m1", "user_id": "u1", "name": "타이레놀", "timing": "식후",
+            "times": ["08:00"], "days": [], "updated_at": "1",
+        }],
+    }
+
+
+def test_pop_due_groups_and_reschedules():
+    index = AlarmIndex()
+    index.load(FakeSupabase(_tables()), after=utc(2026, 3, 2, 22, 0))
+
+    due = index.pop_due(until=utc(2026, 3, 2, 23, 0))
+    assert list(due) == [("u1", utc(2026, 3, 2, 23, 0))]
+    assert index.next_fire_at() == utc(2026, 3, 3, 23, 0)
+    assert index.pop_due(until=utc(2026, 3, 2, 23, 30)) == {}
+
+
+def test_pop_due_skips_slots_older_than_not_before():
+    index = AlarmIndex()
+    index.load(FakeSupabase(_tables()), after=utc(2026, 3, 2, 22, 0))
+
+    due = index.pop_due(until=utc(2026, 3, 3, 1, 0), not_before=utc(2026, 3, 3, 0, 0))
+    assert due == {}
+    assert index.next_fire_at() == utc(2026, 3, 3, 23, 0)
+
+
+def test_refresh_after_failed_load_replays_from_watermark():
+    supabase = FakeSupabase(_tables())
+    index = AlarmIndex()
+    watermark = utc(2026, 3, 2, 22, 50)
+
+    supabase.failing = True
+    with pytest.raises(ConnectionError):
+        index.load(supabase, watermark)
+    assert not index.loaded
+
+    supabase.failing = False
+    index.refresh(supabase, watermark)
+    assert index.loaded
+    # 재기동 중 지나간 23:00 슬롯이 다음 틱에서 발송 대상에 포함됨
+    due = index.pop_due(until=watermark + timedelta(minutes=20))
+    assert list(due) == [("u1", utc(2026, 3, 2, 23, 0))]
+
+
+def test_entries_at_maps_ledger_minute_to_medicines():
+    tables = _tables()
+    tables["medicines"].append({
+        "id": "m2", "user_id": "u1", "name": "비타민", "timing": "식후",
+        "times": ["08:00", "20:00"], "days": ["화"], "updated_at": "1",
+    })
+    index = AlarmIndex()
+    index.load(FakeSupabase(tables), after=utc(2026, 3, 2, 0, 0))
+
+    # 2026-03-03 08:00 KST (화요일)
+    assert {e.medicine_id for e in index.entries_at("u1", utc(2026, 3, 2, 23, 0))} == {"m1", "m2"}
+    # 2026-03-04 08:00 KST (수요일)
+    assert {e.medicine_id for e in index.entries_at("u1", utc(2026, 3, 3, 23, 0))} == {"m1"}
+    assert index.entries_at("u1", utc(2026, 3, 3, 0, 0)) == []
+
+
+def test_refresh_pages_through_large_updates(monkeypatch):
+    monkeypatch.setattr("app.services.alarm_index.PAGE_SIZE", 10)
+    tables = _tables()
+    supabase = FakeSupabase(tables)
+    supabase.max_rows = 10
+    index = AlarmIndex()
+    index.load(supabase, after=utc(2026, 3, 2, 22, 0))
+
+    tables["medicines"] += [{
+        "id": f"m{i}", "user_id": "u1", "name": f"약{i}", "timing": "식후",
+        "times": ["09:00"], "days": [], "updated_at": "2",
+    } for i in range(2, 27)]
+    index.refresh(supabase)
+
+    assert len(index._entries) == 26
+    assert index._last_updated_at == "2"
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from app.services.chat_cache import (
+    ChatAnswerCache, depends_on_history, medicines_hash, normalize_question
+)
+
+ANSWER = {"message": "식후 30분에 드세요.", "suggestions": []}
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("이 약은 식전인가요?", "이 약 식전"),
+    ("술 마셔도 되나요??", "술 마셔 되"),
+    ("  이 약은   식전인가요 ", "이 약 식전"),
+    ("ＡＢＣ 약은요?", "abc 약"),
+    ("???", ""),
+    ("요", "요"),
+])
+def test_normalize_question(question, expected):
+    assert normalize_question(question) == expected
+
+
+def test_medicines_hash_ignores_order_and_duplicates():
+    assert medicines_hash(["타이레놀", "아스피린"]) == medicines_hash(["아스피린", "타이레놀", "타이레놀"])
+    assert medicines_hash(["타이레놀"]) != medicines_hash(["아스피린"])
+
+
+def test_exact_and_near_hits_share_medicine_context():
+    cache = ChatAnswerCache(similarity=0.6)
+    cache.put("타이레놀은 하루에 몇 번 먹나요?", ["타이레놀"], ANSWER, latency_ms=800)
+
+    assert cache.get("타이레놀은 하루에 몇 번 먹나요", ["타이레놀"]) == ANSWER
+    # 조사/어미 차이는 정규화로 완전 일치, 표현 차이는 2-gram 유사도로 적중
+    assert cache.get("타이레놀은 하루에 몇 번씩 먹나요?", ["타이레놀"]) == ANSWER
+    assert cache.get("타이레놀은 하루에 몇 번 먹나요?", ["아스피린"]) is None
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["near_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["saved_ms"] == 1600
+
+
+def test_near_hit_requires_same_key_terms():
+    cache = ChatAnswerCache(similarity=0.5)
+    cache.put("이 약은 식전에 먹나요?", [], ANSWER, latency_ms=1)
+    assert cache.get("이 약은 식후에 먹나요?", []) is None
+
+
+def test_near_hit_requires_same_dose():
+    cache = ChatAnswerCache(similarity=0.5)
+    cache.put("하루에 4000mg까지 먹어도 괜찮은가요?", [], ANSWER, latency_ms=1)
+    assert cache.get("하루에 8000mg까지 먹어도 괜찮은가요?", []) is None
+    assert cache.get("하루에 6000 mg까지 먹어도 괜찮은가요?", []) is None
+    assert cache.get("하루 4000mg까지 먹어도 괜찮은가요?", []) == ANSWER
+
+
+def test_expired_entries_and_size_limit():
+    cache = ChatAnswerCache(ttl_seconds=0)
+    cache.put("이 약은 식전인가요?", [], ANSWER, latency_ms=1)
+    assert cache.get("이 약은 식전인가요?", []) is None
+
+    cache = ChatAnswerCache(max_entries=1)
+    cache.put("이 약은 식전인가요?", [], ANSWER, latency_ms=1)
+    cache.put("술 마셔도 되나요?", [], ANSWER, latency_ms=1)
+    assert cache.stats()["entries"] == 1
+    assert cache.get("이 약은 식전인가요?", []) is None
+
+
+HISTORY = "사용자: 타이레놀은 언제 먹나요?\n어시스턴트: 식후에 드세요."
+
+
+@pytest.mark.parametrize("question", [
+    "그럼 저녁에는요?",
+    "아까 그 약은 같이 먹어도 돼요?",
+    "그 약 부작용은 뭐예요?",
+    "왜요?",
+    "또 먹어도 되나요?",
+    "말씀하신 시간에 못 먹으면요?",
+])
+def test_follow_up_questions_depend_on_history(question):
+    assert depends_on_history(question, HISTORY)
+    assert not depends_on_history(question, "")
+
+
+@pytest.mark.parametrize("question", [
+    "이 약은 식전인가요?",
+    "술 마셔도 되나요?",
+    "아스피린은 하루에 몇 번 먹나요?",
+])
+def test_standalone_questions_do_not_depend_on_history(question):
+    assert not depends_on_history(question, HISTORY)
+
+
+def test_personal_condition_in_history_disables_cache():
+    history = "사용자: 저는 임신 중이에요.\n어시스턴트: 알려주셔서 감사합니다."
+    assert depends_on_history("타이레놀 먹어도 되나요?", history)
+    assert not depends_on_history("임신 중에 타이레놀 먹어도 되나요?", history)
+
+
+def _chat_service(monkeypatch):
+    from app.schemas.gemini import ChatReply
+    from app.services import gemini_service as module
+
+    cache = ChatAnswerCache()
+    monkeypatch.setattr(module, "chat_answer_cache", cache)
+    service = module.GeminiService()
+    calls = []
+
+    async def generate(prompt, output):
+        calls.append(prompt)
+        return ChatReply(message=f"답변 {len(calls)}", suggestions=[])
+
+    async def generate_stream(prompt, generation_config=None):
+        calls.append(prompt)
+        yield '{"message": "스트림 답변", "suggestions": []}'
+
+    service._generate_json = generate
+    service._generate_stream = generate_stream
+    return service, cache
+
+
+def test_chat_response_uses_cache_with_history_for_standalone_questions(monkeypatch):
+    service, _ = _chat_service(monkeypatch)
+    context = {"medicines": ["타이레놀"]}
+
+    first = asyncio.run(service.chat_response("이 약은 식전인가요?", context))
+    second = asyncio.run(service.chat_response("이 약은 식전인가요?", context, history=HISTORY))
+    assert first["message"] == second["message"] == "답변 1"
+
+    follow_up = asyncio.run(service.chat_response("그럼 저녁에는요?", context, history=HISTORY))
+    again = asyncio.run(service.chat_response("그럼 저녁에는요?", context, history=HISTORY))
+    assert (follow_up["message"], again["message"]) == ("답변 2", "답변 3")
+
+
+def test_answers_generated_with_history_are_never_cached(monkeypatch):
+    service, cache = _chat_service(monkeypatch)
+    context = {"medicines": ["타이레놀"]}
+    history = "(요약) 사용자는 신부전으로 치료 중\n사용자: 요즘 붓기가 심해요."
+
+    first = asyncio.run(service.chat_response("이 약은 하루에 몇 번 먹나요?", context, history=history))
+    assert cache.stats()["entries"] == 0
+
+    async def stream():
+        return [event async for event in service.chat_response_stream(
+            "이 약은 하루에 몇 번 먹나요?", context, history=history
+        )]
+
+    events = asyncio.run(stream())
+    assert events[-1] == ("done", {"success": True, "message": "스트림 답변", "suggestions": []})
+    assert cache.stats()["entries"] == 0
+    other_user = asyncio.run(service.chat_response("이 약은 하루에 몇 번 먹나요?", context))
+    assert other_user["message"] != first["message"]
@@ -0,0 +1,46 @@
+import asyncio
+
+from app.services import chat_history as module
+from app.services.chat_history import ChatHistory, estimate_tokens
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("안녕하세요") == 5
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("약 abc") == 2
+
+
+def test_prompt_context_keeps_latest_messages_within_budget():
+    async def scenario():
+        history = ChatHistory(window_messages=10, summary_batch=100, token_budget=30)
+        for i in range(6):
+            await history.append("guest", f"질문 {i} 입니다", is_user=True)
+        return await history.prompt_context("guest")
+
+    context = asyncio.run(scenario())
+    lines = context.split("\n")
+    assert lines[-1] == "사용자: 질문 5 입니다"
+    assert "질문 0" not in context
+    assert estimate_tokens(context) <= 30 + len(lines)
+
+
+def test_overflow_is_summarized(monkeypatch):
+    summaries = []
+
+    async def summarize(summary, conversation):
+        summaries.append(conversation)
+        return f"{summary}|{conversation.count(chr(10)) + 1}개 요약"
+
+    monkeypatch.setattr(module.gemini_service, "summarize_conversation", summarize)
+
+    async def scenario():
+        history = ChatHistory(window_messages=2, summary_batch=2, token_budget=300)
+        for i in range(4):
+            await history.append("guest", f"메시지 {i}", is_user=i % 2 == 0)
+        await asyncio.gather(*history._summary_tasks)
+        return await history.prompt_context("guest")
+
+    context = asyncio.run(scenario())
+    assert summaries == ["사용자: 메시지 0\n어시스턴트: 메시지 1"]
+    assert context == "(요약) |2개 요약\n사용자: 메시지 2\n어시스턴트: 메시지 3"
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.services import gemini_service as module
+from app.services.gemini_service import GeminiService
+
+HIGH = {"severity": "high", "description": "병용금기"}
+MEDIUM = {"severity": "medium", "description": "출혈 위험 증가"}
+
+
+class FakeDurIndex:
+    loaded = True
+    ingredients = {"와파린": (1,), "아스피린": (2,), "케토코나졸": (3,), "심바스타틴": (4,)}
+    contraindicated = {frozenset({3, 4}): HIGH}
+
+    def resolve(self, name):
+        return self.ingredients.get(name)
+
+    def lookup(self, ids1, ids2):
+        return self.contraindicated.get(frozenset({*ids1, *ids2}))
+
+
+class FakeInteractionCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get_many(self, pairs):
+        return {pair: self.entries[pair] for pair in pairs if pair in self.entries}
+
+    def put_many(self, entries):
+        self.entries.update(entries)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(module, "dur_index", FakeDurIndex())
+    monkeypatch.setattr(module, "interaction_cache", FakeInteractionCache())
+    service = GeminiService()
+    service.queried = []
+
+    async def query(pairs):
+        service.queried.append(pairs)
+        return [MEDIUM if {"와파린", "아스피린"} == set(pair) else None for pair in pairs]
+
+    service._query_interactions = query
+    return service
+
+
+def test_dur_hit_is_final(service):
+    result = asyncio.run(service.check_drug_interactions(["케토코나졸"], ["심바스타틴"]))
+    assert [(i.drug1, i.drug2, i.severity) for i in result] == [("케토코나졸", "심바스타틴", "high")]
+    assert service.queried == []
+
+
+def test_resolved_pair_without_dur_entry_goes_to_llm(service):
+    result = asyncio.run(service.check_drug_interactions(["와파린"], ["아스피린"]))
+    assert [(i.drug1, i.drug2, i.severity) for i in result] == [("와파린", "아스피린", "medium")]
+    assert service.queried == [[("와파린", "아스피린")]]
+
+    # 두 번째 요청은 쌍 캐시에서 확인
+    asyncio.run(service.check_drug_interactions(["와파린"], ["아스피린"]))
+    assert len(service.queried) == 1
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from app.services.dur_index import DurIndex
+
+INTERACTIONS = """성분명A,성분명B,금기내용
+케토코나졸,심바스타틴,횡문근융해증 위험
+와파린,아스피린,출혈 위험
+"""
+PRODUCTS = """제품명,성분명
+조코정,심바스타틴
+니조랄정,케토코나졸
+복합제정,암로디핀베실산염/심바스타틴
+"""
+
+
+@pytest.fixture
+def csv_paths(tmp_path):
+    interactions = tmp_path / "dur.csv"
+    products = tmp_path / "products.csv"
+    interactions.write_text(INTERACTIONS, encoding="utf-8")
+    products.write_text(PRODUCTS, encoding="utf-8")
+    return str(interactions), str(products), str(tmp_path / "dur.pkl")
+
+
+def test_resolves_products_and_ingredients(csv_paths):
+    index = DurIndex()
+    assert index.load(*csv_paths)
+
+    hit = index.lookup(index.resolve("조코정"), index.resolve("니조랄정"))
+    assert hit == {"severity": "high", "description": "횡문근융해증 위험"}
+    # 복합제는 성분 중 하나라도 금기면 적중
+    assert index.lookup(index.resolve("복합제정"), index.resolve("케토코나졸")) is not None
+    # 염 표기를 뗀 이름으로도 조회
+    assert index.resolve("암로디핀") == index.resolve("암로디핀베실산염")
+    assert index.lookup(index.resolve("와파린"), index.resolve("조코정")) is None
+    assert index.resolve("없는약") is None
+
+
+def test_snapshot_is_reused_until_csv_changes(csv_paths):
+    interactions, products, snapshot = csv_paths
+    DurIndex().load(interactions, products, snapshot)
+    assert os.path.exists(snapshot)
+
+    compiled = []
+    original = DurIndex.compile
+
+    def counting_compile(*args):
+        compiled.append(args)
+        return original(*args)
+
+    index = DurIndex()
+    index.compile = counting_compile
+    assert index.load(interactions, products, snapshot)
+    assert compiled == []
+
+    with open(interactions, "a", encoding="utf-8") as f:
+        f.write("리튬,이부프로펜,리튬 독성\n")
+    assert index.load(interactions, products, snapshot)
+    assert len(compiled) == 1
+    assert index.lookup(index.resolve("리튬"), index.resolve("이부프로펜")) is not None
+
+
+def test_missing_csv_leaves_index_unloaded(tmp_path):
+    index = DurIndex()
+    assert not index.load(str(tmp_path / "missing.csv"))
+    assert not index.loaded
+
+
+def test_snapshot_loads_without_source_csv(csv_paths):
+    interactions, products, snapshot = csv_paths
+    DurIndex().load(interactions, products, snapshot)
+    os.remove(interactions)
+    os.remove(products)
+
+    index = DurIndex()
+    assert index.load(interactions, products, snapshot)
+    assert index.lookup(index.resolve("조코정"), index.resolve("니조랄정")) is not None
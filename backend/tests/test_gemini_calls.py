@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.services import gemini_service as module
+from app.services.gemini_service import GeminiService
+
+
+class SlowModel:
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def generate_content_async(self, contents, generation_config=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            return contents
+        finally:
+            self.active -= 1
+
+
+def test_generate_times_out_without_blocking_the_loop():
+    async def scenario():
+        service = GeminiService()
+        service.model = SlowModel(delay=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        with pytest.raises(asyncio.TimeoutError):
+            await service._generate("prompt", timeout=0.1)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
+
+
+def test_generate_limits_concurrency(monkeypatch):
+    monkeypatch.setattr(module.settings, "GEMINI_MAX_CONCURRENCY", 2)
+
+    async def scenario():
+        service = GeminiService()
+        model = SlowModel(delay=0.02)
+        service.model = model
+        results = await asyncio.gather(*(service._generate(i) for i in range(6)))
+        return results, model.max_active
+
+    results, max_active = asyncio.run(scenario())
+    assert results == list(range(6))
+    assert max_active == 2
@@ -0,0 +1,72 @@
+import asyncio
+import io
+import os
+
+from PIL import Image
+
+from app.services.image_preprocess import ImagePreprocessor, preprocess_image
+
+
+def _photo(size, fmt="JPEG", exif_orientation=None) -> bytes:
+    # 압축이 잘 되지 않도록 노이즈가 있는 사진
+    image = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+    buffer = io.BytesIO()
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        image.save(buffer, format=fmt, quality=95, exif=exif)
+    else:
+        image.save(buffer, format=fmt, quality=95)
+    return buffer.getvalue()
+
+
+def test_downscales_to_max_side_and_reports_stats():
+    data = _photo((3000, 2000))
+    result = preprocess_image(data, max_side=1024, max_bytes=10_000_000)
+
+    assert max(result.stats.output_width, result.stats.output_height) <= 1024
+    assert (result.stats.original_width, result.stats.original_height) == (3000, 2000)
+    assert result.mime_type == "image/jpeg"
+    with Image.open(io.BytesIO(result.data)) as output:
+        assert output.size == (result.stats.output_width, result.stats.output_height)
+
+
+def test_respects_byte_budget():
+    result = preprocess_image(_photo((1600, 1200)), max_side=2048, max_bytes=80_000)
+    assert len(result.data) <= 80_000
+    assert result.stats.output_bytes == len(result.data)
+
+
+def test_applies_exif_rotation():
+    # Orientation 6: 90도 회전 → 가로 사진이 세로로
+    result = preprocess_image(_photo((400, 200), exif_orientation=6), max_bytes=10_000_000)
+    assert (result.stats.output_width, result.stats.output_height) == (200, 400)
+
+
+def test_webp_grayscale_output():
+    result = preprocess_image(_photo((300, 300), fmt="PNG"), grayscale=True, image_format="webp")
+    assert result.mime_type == "image/webp"
+    with Image.open(io.BytesIO(result.data)) as output:
+        assert output.format == "WEBP"
+
+
+def test_digest_identifies_the_upload():
+    data = _photo((200, 200))
+    assert preprocess_image(data).digest == preprocess_image(data).digest
+    assert preprocess_image(data).digest != preprocess_image(_photo((200, 200))).digest
+
+
+def test_process_recovers_from_broken_pool():
+    preprocessor = ImagePreprocessor(workers=1, max_bytes=10_000_000)
+    try:
+        broken = preprocessor._get_pool()
+        # 워커 프로세스를 강제 종료하여 BrokenProcessPool 상태로 만듦
+        try:
+            broken.submit(os._exit, 1).result()
+        except Exception:
+            pass
+        result = asyncio.run(preprocessor.process(_photo((300, 200))))
+        assert (result.stats.output_width, result.stats.output_height) == (300, 200)
+        assert preprocessor._pool is not broken
+    finally:
+        preprocessor.shutdown()
@@ -0,0 +1,35 @@
+from app.services.interaction_cache import InteractionCache, pair_key
+
+HIGH = {"severity": "high", "description": "병용금기"}
+
+
+def test_pair_key_is_unordered_and_normalized():
+    assert pair_key("타이레놀", "아스피린") == pair_key("아스피린 ", "타이레놀")
+    assert pair_key("타이레놀", "타이레놀") is None
+    assert pair_key("", "아스피린") is None
+
+
+def test_stores_interactions_and_known_negatives(tmp_path):
+    path = str(tmp_path / "interactions.db")
+    cache = InteractionCache(path, ttl_seconds=60, lru_size=1)
+    a, b, c = ("a", "b"), ("a", "c"), ("b", "c")
+    cache.put_many({a: HIGH, b: None})
+
+    # LRU에서 밀려난 쌍은 SQLite에서, "상호작용 없음"도 적중으로 반환
+    assert cache.get_many([a, b, c]) == {a: HIGH, b: None}
+    assert InteractionCache(path, ttl_seconds=60).get_many([a, b]) == {a: HIGH, b: None}
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_expired_pairs_are_missing(tmp_path):
+    cache = InteractionCache(str(tmp_path / "interactions.db"), ttl_seconds=-1)
+    cache.put_many({("a", "b"): HIGH})
+    assert cache.get_many([("a", "b")]) == {}
+
+
+def test_database_is_opened_on_first_use(tmp_path):
+    path = tmp_path / "interactions.db"
+    cache = InteractionCache(str(path), ttl_seconds=60)
+    assert not path.exists()
+    cache.get_many([("a", "b")])
+    assert path.exists()
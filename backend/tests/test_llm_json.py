@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.gemini import ChatReply, PrescriptionExtraction
+from app.services.llm_json import JsonOutput, StreamingJsonField, gemini_schema, repair_json
+
+
+@pytest.mark.parametrize("text, expected", [
+    # 앞뒤 설명문/코드 펜스
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('결과입니다: {"a": [1, 2]} 참고하세요', {"a": [1, 2]}),
+    # 닫는 괄호 앞 쉼표
+    ('{"a": [1, 2,], }', {"a": [1, 2]}),
+    # 잘린 응답: 마지막으로 완성된 원소까지
+    ('{"suggestions": ["a", "b"', {"suggestions": ["a", "b"]}),
+    ('{"suggestions": ["a", "b", "c', {"suggestions": ["a", "b"]}),
+    ('{"message": "안녕하세요"', {"message": "안녕하세요"}),
+    ('{"message": "안녕', {}),
+    ('{"message": "say \\"hi\\"", "sugg', {"message": 'say "hi"'}),
+    ('{"medicines": [{"name": "a"}, {"name": "b"}', {"medicines": [{"name": "a"}, {"name": "b"}]}),
+    ('{"medicines": [{"name": "a"}, {"na', {"medicines": [{"name": "a"}]}),
+    ('[{"x": "1"}, {"x": "2"}', [{"x": "1"}, {"x": "2"}]),
+])
+def test_repair_json(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+def test_repair_json_keys_are_not_completion_points():
+    # 키만 있고 값이 없는 상태에서 끊기면 키를 남기지 않음
+    assert json.loads(repair_json('{"message": "a", "suggestions"')) == {"message": "a"}
+
+
+def test_repair_json_without_json():
+    assert repair_json("죄송합니다") is None
+
+
+def test_json_output_counts_repairs():
+    output = JsonOutput("chat", ChatReply)
+    assert output.parse('{"message": "a", "suggestions": []}').message == "a"
+    assert output.parse('```json\n{"message": "b", "suggestions": ["x"').suggestions == ["x"]
+    with pytest.raises(ValidationError):
+        output.parse("답변 없음")
+    assert (output.parsed, output.repaired, output.failed) == (1, 1, 1)
+
+
+def test_gemini_schema_requires_all_properties_and_drops_defaults():
+    schema = gemini_schema(PrescriptionExtraction)
+    item = schema["properties"]["medicines"]["items"]
+    assert schema["required"] == ["medicines", "raw_text"]
+    assert "default" not in json.dumps(schema)
+    assert item["properties"]["confidence"]["type"] == "number"
+
+
+def _stream(field, chunks):
+    decoder = StreamingJsonField(field)
+    return "".join(decoder.feed(chunk) for chunk in chunks), decoder.done
+
+
+def test_streaming_field_across_chunk_boundaries():
+    text = json.dumps({"message": '줄1\n"인용" \\ 끝 😀', "suggestions": ["x"]})
+    expected = '줄1\n"인용" \\ 끝 😀'
+    for size in (1, 2, 3, 7):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert _stream("message", chunks) == (expected, True)
+
+
+def test_streaming_field_waits_for_prefix_and_ignores_rest():
+    value, done = _stream("message", ['{"sugg', 'estions": [], "mes', 'sage": "안', '녕"', ', "x": "y"}'])
+    assert (value, done) == ("안녕", True)
+    assert _stream("message", ['{"other": "x"}']) == ("", False)
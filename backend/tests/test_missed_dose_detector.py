@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import missed_dose_detector as module
+from app.services.missed_dose_detector import FiredSlot, MissedDoseDetector
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.rows = None
+
+    def select(self, *_):
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) >= value)
+        return self
+
+    def insert(self, rows):
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def execute(self):
+        if self.rows is not None:
+            if any(row["user_id"] in self.db.deleted_users for row in self.rows):
+                raise RuntimeError("violates foreign key constraint")
+            self.db.tables.setdefault(self.table, []).extend(self.rows)
+            return SimpleNamespace(data=self.rows)
+        rows = [row for row in self.db.tables.get(self.table, []) if all(f(row) for f in self.filters)]
+        return SimpleNamespace(data=rows)
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+        self.deleted_users = set()
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeSupabase({"medicines": [{"id": "m1"}, {"id": "m2"}], "medicine_logs": []})
+    monkeypatch.setattr(module, "get_supabase_admin", lambda: fake)
+    return fake
+
+
+def _slot(user_id, medicine_id, minutes_ago):
+    fire_at = (datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)).replace(microsecond=0)
+    return FiredSlot(user_id, medicine_id, f"약-{medicine_id}", f"{fire_at:%H:%M}", fire_at)
+
+
+def _missed(db):
+    return [row for row in db.tables["medicine_logs"] if row["status"] == "missed"]
+
+
+def test_records_only_slots_without_logs(db):
+    taken, missed = _slot("u1", "m1", 90), _slot("u1", "m2", 90)
+    db.tables["medicine_logs"].append({
+        "user_id": "u1", "medicine_id": None, "medicine_name": taken.medicine_name,
+        "scheduled_time": taken.scheduled_time, "status": "taken",
+        "taken_at": (taken.fire_at + timedelta(minutes=5)).isoformat(),
+    })
+    detector = MissedDoseDetector(grace_minutes=60)
+    detector.record([taken, missed])
+
+    assert asyncio.run(detector.run_once()) == 1
+    assert [row["medicine_id"] for row in _missed(db)] == ["m2"]
+    # 이미 기록된 missed는 다시 검사해도 중복 기록하지 않음
+    detector.record([missed])
+    assert asyncio.run(detector.run_once()) == 0
+
+
+def test_deleted_medicine_is_recorded_without_id(db):
+    detector = MissedDoseDetector(grace_minutes=60)
+    detector.record([_slot("u1", "deleted", 90)])
+
+    assert asyncio.run(detector.run_once()) == 1
+    assert _missed(db)[0]["medicine_id"] is None
+    assert _missed(db)[0]["medicine_name"] == "약-deleted"
+
+
+def test_failing_row_does_not_block_others_and_is_dropped(db):
+    db.deleted_users.add("gone")
+    detector = MissedDoseDetector(grace_minutes=60, max_attempts=3)
+    detector.record([_slot("gone", "m1", 95), _slot("u1", "m1", 90)])
+
+    assert asyncio.run(detector.run_once()) == 1
+    assert [row["user_id"] for row in _missed(db)] == ["u1"]
+    assert len(detector._pending) == 1
+
+    asyncio.run(detector.run_once())
+    asyncio.run(detector.run_once())
+    assert not detector._pending
+    assert not detector._attempts
+
+
+def test_record_merges_recovered_slots_in_order():
+    detector = MissedDoseDetector()
+    detector.record([_slot("u1", "m1", 10)])
+    detector.record([_slot("u2", "m1", 120), _slot("u3", "m1", 5)])
+    assert [slot.user_id for slot in detector._pending] == ["u2", "u1", "u3"]
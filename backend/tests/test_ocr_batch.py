@@ -0,0 +1,103 @@
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.api.endpoints import ocr
+from app.schemas.medicine import MedicineResult
+from app.services.image_preprocess import preprocess_image
+
+
+def _jpeg() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 300), "white").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def process(content):
+        return preprocess_image(content)
+
+    async def analyze(data, mime_type):
+        return {
+            "success": True,
+            "medicines": [MedicineResult(
+                id="1", name="타이레놀", dosage="500mg", frequency="1일 3회", timing="식후",
+                confidence=90, originalText="타이레놀 500mg", status="auto"
+            )],
+            "raw_text": "타이레놀",
+        }
+
+    async def no_interactions(medicines):
+        return []
+
+    monkeypatch.setattr(ocr.image_preprocessor, "process", process)
+    monkeypatch.setattr(ocr.gemini_service, "analyze_prescription_image", analyze)
+    monkeypatch.setattr(ocr, "_check_interactions", no_interactions)
+    monkeypatch.setattr(ocr.ocr_result_cache, "get", lambda *args: None)
+    monkeypatch.setattr(ocr.ocr_result_cache, "put", lambda *args: None)
+    app = FastAPI()
+    app.include_router(ocr.router, prefix="/ocr")
+    return TestClient(app)
+
+
+def test_corrupt_image_is_reported_per_page(client):
+    valid = _jpeg()
+    files = [
+        ("images", ("ok.jpg", valid, "image/jpeg")),
+        ("images", ("truncated.jpg", valid[:len(valid) // 2], "image/jpeg")),
+        ("images", ("garbage.jpg", b"not an image", "image/jpeg")),
+    ]
+    response = client.post("/ocr/analyze/batch", files=files)
+
+    assert response.status_code == 200
+    pages = response.json()["pages"]
+    assert [page["success"] for page in pages] == [True, False, False]
+    assert pages[1]["error"] == "이미지 파일이 손상되었습니다."
+    assert pages[2]["error"] == "이미지를 읽을 수 없습니다."
+    assert [med["name"] for med in response.json()["medicines"]] == ["타이레놀"]
+
+
+def test_single_corrupt_upload_is_a_client_error(client):
+    valid = _jpeg()
+    response = client.post(
+        "/ocr/analyze", files={"image": ("truncated.jpg", valid[:len(valid) // 2], "image/jpeg")}
+    )
+    assert response.status_code == 400
+
+
+def test_oversized_or_non_image_upload_is_reported_per_page(client, monkeypatch):
+    valid = _jpeg()
+    monkeypatch.setattr(ocr, "MAX_UPLOAD_SIZE", len(valid) + 100)
+    files = [
+        ("images", ("ok.jpg", valid, "image/jpeg")),
+        ("images", ("huge.jpg", valid + b"\0" * 200, "image/jpeg")),
+        ("images", ("notes.txt", b"hello", "text/plain")),
+    ]
+    response = client.post("/ocr/analyze/batch", files=files)
+
+    assert response.status_code == 200
+    pages = response.json()["pages"]
+    assert [page["success"] for page in pages] == [True, False, False]
+    assert pages[1]["error"] == "파일 크기가 10MB를 초과합니다."
+    assert pages[2]["error"] == "이미지 파일만 업로드 가능합니다."
+
+
+def _medicine(id: str, dosage: str, frequency: str, confidence: float) -> MedicineResult:
+    return MedicineResult(
+        id=id, name=f"암로디핀정 {dosage}", dosage=dosage, frequency=frequency, timing="식후",
+        confidence=confidence, originalText=f"암로디핀정 {dosage}", status="auto"
+    )
+
+
+def test_merge_keeps_different_strengths_of_the_same_drug():
+    low = _medicine("1", "5mg", "1일 1회", 80)
+    high = _medicine("2", "10mg", "1일 2회", 90)
+    low_again = _medicine("3", "5 mg", "1일 1회", 95)
+
+    merged = ocr._merge_medicines([[low], [high, low_again]])
+
+    assert [(med.id, med.dosage, med.confidence) for med in merged] == [("1", "5 mg", 95), ("2", "10mg", 90)]
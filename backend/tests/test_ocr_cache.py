@@ -0,0 +1,86 @@
+import asyncio
+import io
+
+from PIL import Image, ImageDraw
+
+from app.api.endpoints import ocr
+from app.schemas.medicine import MedicineResult
+from app.services.image_preprocess import preprocess_image
+from app.services.ocr_cache import OcrResultCache
+
+RESULT = {"medicines": [{"name": "타이레놀"}], "raw_text": "타이레놀 500mg"}
+
+
+def _prescription(text: str) -> bytes:
+    image = Image.new("RGB", (600, 800), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20, 20, 580, 780), outline="black", width=3)
+    draw.text((60, 100), text, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def test_identical_upload_skips_analysis_and_other_upload_does_not(monkeypatch):
+    cache = OcrResultCache()
+    calls = []
+
+    async def process(content):
+        return preprocess_image(content)
+
+    async def analyze(data, mime_type):
+        calls.append(data)
+        return {
+            "success": True,
+            "medicines": [MedicineResult(
+                id="1", name="타이레놀", dosage="500mg", frequency="1일 3회", timing="식후",
+                confidence=90, originalText="Tylenol 500mg", status="auto"
+            )],
+            "raw_text": "Tylenol 500mg",
+        }
+
+    monkeypatch.setattr(ocr, "ocr_result_cache", cache)
+    monkeypatch.setattr(ocr.image_preprocessor, "process", process)
+    monkeypatch.setattr(ocr.gemini_service, "analyze_prescription_image", analyze)
+
+    upload = _prescription("Tylenol 500mg 1T tid")
+    first = asyncio.run(ocr._extract_medicines(upload, "u1"))
+    again = asyncio.run(ocr._extract_medicines(upload, "u1"))
+    assert (first["cached"], again["cached"], len(calls)) == (False, True, 1)
+    assert [med.name for med in again["medicines"]] == ["타이레놀"]
+    assert again["medicines"][0].id != first["medicines"][0].id
+
+    # 같은 양식의 다른 처방전은 다시 분석
+    other = asyncio.run(ocr._extract_medicines(_prescription("Tylenol 500mg 2T bid"), "u1"))
+    assert (other["cached"], len(calls)) == (False, 2)
+
+
+def test_scopes_are_isolated():
+    cache = OcrResultCache()
+    cache.put("abc", RESULT, "u1")
+    assert cache.get("abc", "u2") is None
+    assert cache.get("abc") is None
+    cache.put("abc", RESULT)
+    assert cache.get("abc") == RESULT
+
+
+def test_memory_lru_and_disk_tier(tmp_path):
+    path = str(tmp_path / "ocr.db")
+    cache = OcrResultCache(max_entries=1, disk_path=path, disk_max_entries=10)
+    cache.put("a", RESULT, "u1")
+    cache.put("b", {"medicines": [], "raw_text": ""}, "u1")
+
+    # 메모리에서 밀려난 항목과 재시작 후 항목은 디스크에서 복원
+    assert cache.get("a", "u1") == RESULT
+    assert OcrResultCache(disk_path=path).get("b", "u1") == {"medicines": [], "raw_text": ""}
+
+
+def test_disk_tier_keeps_newest_entries(tmp_path):
+    path = str(tmp_path / "ocr.db")
+    cache = OcrResultCache(max_entries=1, disk_path=path, disk_max_entries=10)
+    for i in range(25):
+        cache.put(str(i), {"i": i})
+    count = cache._disk.execute("SELECT COUNT(*) FROM ocr_results").fetchone()[0]
+    assert count <= 11
+    assert cache.get("24") == {"i": 24}
+    assert cache.get("0") is None
@@ -0,0 +1,69 @@
+import asyncio
+import base64
+import os
+
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+from app.services.push_encryption import EncryptionJob, PushEncryptionEngine
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _subscription_keys() -> tuple[str, str]:
+    public = ec.generate_private_key(ec.SECP256R1()).public_key()
+    return _b64(public.public_bytes(Encoding.X962, PublicFormat.UncompressedPoint)), _b64(os.urandom(16))
+
+
+def test_encrypts_in_order_and_marks_invalid_keys():
+    p256dh, auth = _subscription_keys()
+    jobs = [
+        EncryptionJob(p256dh, auth, '{"title": "복약 알림"}'),
+        EncryptionJob("invalid", auth, "{}"),
+        EncryptionJob(p256dh, auth, '{"title": "복약 알림", "body": "' + "약" * 100 + '"}'),
+    ]
+    engine = PushEncryptionEngine(workers=1, chunk_size=2, pool_min_batch=1000)
+    bodies = asyncio.run(engine.encrypt_batch(jobs))
+
+    assert bodies[1] is None
+    # aes128gcm 헤더(86바이트) + 암호문, 같은 입력이라도 매번 다른 키로 암호화
+    assert len(bodies[0]) > 86 and len(bodies[2]) > len(bodies[0])
+    again = asyncio.run(engine.encrypt_batch(jobs[:1]))
+    assert again[0] != bodies[0]
+    engine.shutdown()
+
+
+def test_process_pool_keeps_job_order():
+    p256dh, auth = _subscription_keys()
+    jobs = [EncryptionJob(p256dh if i % 2 else "invalid", auth, "x" * (i * 10)) for i in range(5)]
+    engine = PushEncryptionEngine(workers=2, chunk_size=2, pool_min_batch=1)
+    try:
+        bodies = asyncio.run(engine.encrypt_batch(jobs))
+    finally:
+        engine.shutdown()
+    assert [body is None for body in bodies] == [True, False, True, False, True]
+    assert len(bodies[3]) > len(bodies[1])
+
+
+def _break(pool):
+    # 워커 프로세스를 강제 종료하여 BrokenProcessPool 상태로 만듦
+    try:
+        pool.submit(os._exit, 1).result()
+    except Exception:
+        pass
+
+
+def test_recovers_from_broken_process_pool():
+    p256dh, auth = _subscription_keys()
+    jobs = [EncryptionJob(p256dh, auth, "x") for _ in range(4)]
+    engine = PushEncryptionEngine(workers=2, chunk_size=2, pool_min_batch=1)
+    try:
+        broken = engine._get_pool()
+        _break(broken)
+        bodies = asyncio.run(engine.encrypt_batch(jobs))
+        assert all(body is not None for body in bodies)
+        assert engine._pool is not broken
+    finally:
+        engine.shutdown()
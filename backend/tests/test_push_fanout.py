@@ -0,0 +1,74 @@
+import asyncio
+
+from app.api.endpoints.push import (
+    DELIVERY_GONE, DELIVERY_RETRY, DELIVERY_SENT, DeliveryResult
+)
+from app.services import push_fanout as module
+from app.services.push_fanout import PushFanout, PushMessage
+
+SUBSCRIPTIONS = {
+    "u1": [{"endpoint": "https://push/ok", "p256dh": "k", "auth": "a"}],
+    "u2": [
+        {"endpoint": "https://push/gone", "p256dh": "k", "auth": "a"},
+        {"endpoint": "https://push/busy", "p256dh": "k", "auth": "a"},
+    ],
+}
+STATUSES = {
+    "https://push/ok": DELIVERY_SENT,
+    "https://push/gone": DELIVERY_GONE,
+    "https://push/busy": DELIVERY_RETRY,
+}
+
+
+class FakeEncryption:
+    async def encrypt_batch(self, jobs):
+        return [b"encrypted" for _ in jobs]
+
+
+class FakeRetryQueue:
+    def __init__(self):
+        self.scheduled = []
+
+    def schedule(self, endpoint, body, tag, retry_after=None):
+        self.scheduled.append(endpoint)
+        return True
+
+
+def test_send_bounds_concurrency_and_routes_results(monkeypatch):
+    active = 0
+    peak = 0
+    pruned = []
+    retry_queue = FakeRetryQueue()
+
+    async def fake_send(endpoint, body, tag):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return DeliveryResult(STATUSES[endpoint])
+
+    def fake_prune(endpoints):
+        pruned.extend(endpoints)
+        return len(endpoints)
+
+    monkeypatch.setattr(module.settings, "VAPID_PRIVATE_KEY", "key")
+    monkeypatch.setattr(module.subscription_cache, "get_many", lambda ids: SUBSCRIPTIONS)
+    monkeypatch.setattr(module, "push_encryption_engine", FakeEncryption())
+    monkeypatch.setattr(module, "push_retry_queue", retry_queue)
+    monkeypatch.setattr(module, "send_encrypted_push", fake_send)
+    monkeypatch.setattr(module, "prune_subscriptions", fake_prune)
+
+    messages = [PushMessage("u1", "복약 알림", "약 드세요"), PushMessage("u2", "복약 알림", "약 드세요")]
+    stats = asyncio.run(PushFanout(concurrency=1).send(messages))
+
+    assert peak == 1
+    assert (stats.users, stats.sent, stats.failed, stats.pruned, stats.retrying) == (2, 1, 2, 1, 1)
+    assert pruned == ["https://push/gone"]
+    assert retry_queue.scheduled == ["https://push/busy"]
+
+
+def test_send_without_vapid_key_sends_nothing(monkeypatch):
+    monkeypatch.setattr(module.settings, "VAPID_PRIVATE_KEY", "")
+    stats = asyncio.run(PushFanout().send([PushMessage("u1", "복약 알림", "약 드세요")]))
+    assert (stats.users, stats.sent, stats.failed) == (1, 0, 1)
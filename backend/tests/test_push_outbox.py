@@ -0,0 +1,66 @@
+import pytest
+
+from app.services.push_fanout import PushMessage
+from app.services.push_outbox import FilePushOutbox, PushOutbox, SQLitePushOutbox
+
+
+def _messages(count):
+    return [PushMessage(f"u{i}", "복약 알림", f"약 {i}") for i in range(count)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "push_outbox.db")
+
+
+def test_outbox_interface_is_abstract():
+    with pytest.raises(TypeError):
+        PushOutbox()
+
+
+def test_lease_ack_release(path):
+    outbox = SQLitePushOutbox(path, owner="a")
+    outbox.enqueue(_messages(3))
+
+    first = outbox.lease(2)
+    assert [message.user_id for _, _, message in first] == ["u0", "u1"]
+    assert [message.user_id for _, _, message in outbox.lease(10)] == ["u2"]
+    assert outbox.lease(10) == []
+
+    outbox.release([first[1][0]])
+    outbox.ack([first[0][0]])
+    assert [message.user_id for _, _, message in outbox.lease(10)] == ["u1"]
+    assert outbox.pending() == 2
+
+
+def test_processes_sharing_file_do_not_steal_live_leases(path):
+    a = SQLitePushOutbox(path, owner="a", lease_seconds=60)
+    a.enqueue(_messages(2))
+    leased = a.lease(1)
+
+    # 나중에 기동한 프로세스가 a의 발송 중 항목을 되돌리지 않음
+    b = SQLitePushOutbox(path, owner="b", lease_seconds=60)
+    assert [message.user_id for _, _, message in b.lease(10)] == ["u1"]
+    b.release([leased[0][0]])
+    assert b.lease(10) == []
+
+
+def test_expired_lease_is_taken_over(path):
+    a = SQLitePushOutbox(path, owner="a", lease_seconds=-1)
+    a.enqueue(_messages(1))
+    item_id = a.lease(1)[0][0]
+
+    b = SQLitePushOutbox(path, owner="b", lease_seconds=60)
+    assert [i for i, _, _ in b.lease(10)] == [item_id]
+    # 만료 후 다른 프로세스가 가져간 항목은 원래 소유자가 release해도 유지
+    a.release([item_id])
+    assert b.lease(10) == []
+
+
+def test_file_outbox_refuses_second_process(tmp_path):
+    path = str(tmp_path / "push_outbox.log")
+    first = FilePushOutbox(path)
+    with pytest.raises(RuntimeError):
+        FilePushOutbox(path)
+    first.close()
+    FilePushOutbox(path).close()
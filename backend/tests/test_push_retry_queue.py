@@ -0,0 +1,25 @@
+import random
+
+from app.services.push_retry_queue import PushRetryQueue
+
+
+def test_backoff_is_bounded_exponential_with_jitter():
+    queue = PushRetryQueue(base_seconds=2, max_backoff_seconds=30)
+    random.seed(0)
+    for attempt, ceiling in [(0, 2), (1, 4), (3, 16), (10, 30)]:
+        delays = [queue.backoff(attempt) for _ in range(50)]
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+
+
+def test_backoff_honours_retry_after():
+    queue = PushRetryQueue(base_seconds=2, max_backoff_seconds=30)
+    assert all(queue.backoff(0, retry_after=60) >= 60 for _ in range(20))
+
+
+def test_schedule_drops_after_max_attempts_or_deadline():
+    queue = PushRetryQueue(max_attempts=3, base_seconds=1, deadline_seconds=600)
+    assert queue.schedule("https://push/1", b"body", "tag", attempt=0)
+    assert not queue.schedule("https://push/2", b"body", "tag", attempt=3)
+    # Retry-After가 마감 시각을 넘기면 기다리지 않고 폐기
+    assert not queue.schedule("https://push/3", b"body", "tag", retry_after=3600)
+    assert (queue.pending, queue.expired) == (1, 2)
@@ -0,0 +1,59 @@
+import pytest
+
+from app.schemas.medicine import MealTimes
+from app.services.schedule_rules import build_schedule_times
+
+MEALS = MealTimes()
+
+
+@pytest.mark.parametrize("frequency, timing, expected", [
+    ("1일 3회", "식후", ["08:00", "12:00", "18:00"]),
+    ("1회 1정 1일 3회", "식후", ["08:00", "12:00", "18:00"]),
+    ("1일 3회 1회 2정", "식후 30분", ["08:30", "12:30", "18:30"]),
+    ("하루 두 번", "식전", ["07:30", "17:30"]),
+    ("매일 1회", "식후", ["08:00"]),
+    ("1일 1회", "취침 전", ["22:00"]),
+    ("1일 2회", "아침 저녁 식후", ["08:00", "18:00"]),
+    ("1일 3회 3일분", "식후", ["08:00", "12:00", "18:00"]),
+    ("8시간마다", "", ["00:00", "08:00", "16:00"]),
+])
+def test_daily_frequencies(frequency, timing, expected):
+    assert build_schedule_times(frequency, timing, MEALS) == expected
+
+
+@pytest.mark.parametrize("frequency, timing", [
+    ("1회 2정", "식후"),  # 1회 복용량만 있고 하루 횟수 없음
+    ("1회 1정", ""),
+    ("2일 1회", "식후"),
+    ("2일에 한 번", "식후"),
+    ("격일", "식후"),
+    ("1주 1회", "아침 식전"),
+    ("주 2회", "식후"),
+    ("매주 월요일", "식후"),
+    ("월 1회", "식후"),
+    ("필요시", "식후"),
+    ("1일 2회", "아침"),  # 시점이 횟수보다 적음
+])
+def test_non_daily_or_ambiguous_frequencies_fall_back_to_llm(frequency, timing):
+    assert build_schedule_times(frequency, timing, MEALS) is None
+
+
+@pytest.mark.parametrize("value", ["8시", "", "24:00", "08:60", "8:0"])
+def test_invalid_meal_time_is_rejected_with_422(value):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.endpoints import ai
+
+    app = FastAPI()
+    app.include_router(ai.router, prefix="/ai")
+    response = TestClient(app).post("/ai/generate-schedule", json={
+        "medicines": [{"name": "타이레놀", "frequency": "1일 3회", "timing": "식후"}],
+        "meal_times": {"breakfast": value},
+    })
+    assert response.status_code == 422
+
+
+def test_single_digit_hour_meal_time_is_accepted():
+    meals = MealTimes(breakfast="7:30")
+    assert build_schedule_times("1일 1회", "식후", meals) == ["07:30"]
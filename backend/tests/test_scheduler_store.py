@@ -0,0 +1,65 @@
+import pytest
+
+from app.services.scheduler_lease import SchedulerCoordinator, user_shard
+from app.services.scheduler_store import SchedulerStore, SQLiteSchedulerStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteSchedulerStore(str(tmp_path / "scheduler.db"))
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SchedulerStore()
+
+
+def test_heartbeat_lists_live_instances_and_expires_old(store):
+    assert store.heartbeat("b", ttl_seconds=60) == ["b"]
+    assert store.heartbeat("a", ttl_seconds=60) == ["a", "b"]
+    # TTL 0: 방금 갱신한 자신만 남음
+    assert store.heartbeat("a", ttl_seconds=0) == ["a"]
+
+    store.release("a")
+    assert store.heartbeat("c", ttl_seconds=60) == ["c"]
+
+
+def test_watermark_roundtrip(store):
+    assert store.get_watermark("alarm") is None
+    store.set_watermark("alarm", "2026-01-01T00:00:00+00:00")
+    store.set_watermark("alarm", "2026-01-01T00:01:00+00:00")
+    assert store.get_watermark("alarm") == "2026-01-01T00:01:00+00:00"
+
+
+def test_claim_deliveries_only_once(store):
+    keys = [("u1", "2026-01-01T00:00:00+00:00"), ("u2", "2026-01-01T00:00:00+00:00")]
+    assert store.claim_deliveries(keys) == set(keys)
+    assert store.claim_deliveries(keys + [("u3", "2026-01-01T00:00:00+00:00")]) == {
+        ("u3", "2026-01-01T00:00:00+00:00")
+    }
+
+    store.prune_deliveries("2026-01-02T00:00:00+00:00")
+    assert store.claim_deliveries(keys[:1]) == set(keys[:1])
+
+
+def test_shard_coordinator_splits_users(store):
+    first = SchedulerCoordinator("shard", store)
+    second = SchedulerCoordinator("shard", store)
+    first.members = second.members = sorted([first.instance_id, second.instance_id])
+
+    users = [f"user-{i}" for i in range(100)]
+    owned_first = {u for u in users if first.owns(u)}
+    owned_second = {u for u in users if second.owns(u)}
+    assert owned_first.isdisjoint(owned_second)
+    assert owned_first | owned_second == set(users)
+    assert all(0 <= user_shard(u, 2) < 2 for u in users)
+
+
+def test_list_deliveries_since(store):
+    store.claim_deliveries([
+        ("u1", "2026-01-01T00:00:00+00:00"),
+        ("u2", "2026-01-01T01:00:00+00:00"),
+    ])
+    assert store.list_deliveries("2026-01-01T00:30:00+00:00") == [
+        ("u2", "2026-01-01T01:00:00+00:00")
+    ]
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        started = 0
+        release = asyncio.Event()
+
+        async def work():
+            nonlocal started
+            started += 1
+            await release.wait()
+            return "result"
+
+        callers = [asyncio.create_task(flight.do("key", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*callers)
+        return flight, started, results
+
+    flight, started, results = asyncio.run(scenario())
+    assert started == 1
+    assert results == ["result"] * 5
+    assert flight.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0, "coalesce_rate": 0.8}
+
+
+def test_finished_key_runs_again_and_keys_are_independent():
+    async def scenario():
+        flight = SingleFlight()
+        values = iter(range(10))
+
+        async def work():
+            return next(values)
+
+        return [await flight.do("a", work), await flight.do("a", work), await flight.do("b", work)]
+
+    assert asyncio.run(scenario()) == [0, 1, 2]
+
+
+def test_exception_reaches_every_waiter():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            raise ValueError("LLM 오류")
+
+        callers = [asyncio.create_task(flight.do("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*callers, return_exceptions=True), flight
+
+    results, flight = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
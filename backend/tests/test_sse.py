@@ -0,0 +1,19 @@
+import json
+
+from app.core.sse import sse_event
+from app.schemas.medicine import DrugInteraction
+
+
+def test_sse_event_serializes_models_and_korean_text():
+    warning = DrugInteraction(drug1="와파린", drug2="아스피린", severity="high", description="출혈 위험")
+    event = sse_event("interactions", {"warnings": [warning]})
+
+    header, data, blank, end = event.split("\n")
+    assert header == "event: interactions"
+    assert (blank, end) == ("", "")
+    assert "와파린" in data
+    assert json.loads(data[len("data: "):]) == {"warnings": [warning.model_dump()]}
+
+
+def test_sse_event_without_data():
+    assert sse_event("done") == "event: done\ndata: null\n\n"
@@ -0,0 +1,91 @@
+import pytest
+
+from app.services.subscription_cache import SubscriptionCache
+
+
+def _sub(user_id, endpoint):
+    return {"user_id": user_id, "endpoint": endpoint, "p256dh": "k", "auth": "a"}
+
+
+class FakeFetch:
+    def __init__(self, data):
+        self.data = data
+        self.calls = 0
+        self.during = None
+
+    def __call__(self, user_ids):
+        self.calls += 1
+        result = {user_id: list(self.data.get(user_id, [])) for user_id in user_ids}
+        if self.during:
+            self.during()
+        return result
+
+
+def _cache(monkeypatch, data):
+    cache = SubscriptionCache()
+    fetch = FakeFetch(data)
+    monkeypatch.setattr(cache, "_fetch", fetch)
+    return cache, fetch
+
+
+def test_hits_after_first_fetch(monkeypatch):
+    cache, fetch = _cache(monkeypatch, {"u1": [_sub("u1", "e1")]})
+    assert cache.get_many(["u1", "u2"]) == {"u1": [_sub("u1", "e1")], "u2": []}
+    assert cache.get_many(["u1", "u2"]) == {"u1": [_sub("u1", "e1")], "u2": []}
+    assert fetch.calls == 1
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_invalidate_during_fetch_is_not_overwritten(monkeypatch):
+    data = {"u1": [_sub("u1", "old")]}
+    cache, fetch = _cache(monkeypatch, data)
+
+    def subscribe():
+        data["u1"] = [_sub("u1", "new")]
+        cache.invalidate("u1")
+
+    fetch.during = subscribe
+    # 조회 시작 시점의 결과는 반환하되 캐시하지 않음
+    assert cache.get("u1") == [_sub("u1", "old")]
+    fetch.during = None
+    assert cache.get("u1") == [_sub("u1", "new")]
+    assert fetch.calls == 2
+
+
+def test_unknown_endpoint_invalidation_discards_inflight_fetch(monkeypatch):
+    cache, fetch = _cache(monkeypatch, {"u1": [_sub("u1", "e1")]})
+    fetch.during = lambda: cache.invalidate_endpoint("e1")
+    cache.get("u1")
+    fetch.during = None
+    cache.get("u1")
+    assert fetch.calls == 2
+
+
+def test_invalidate_endpoint_drops_owner(monkeypatch):
+    cache, fetch = _cache(monkeypatch, {"u1": [_sub("u1", "e1")]})
+    cache.get("u1")
+    cache.invalidate_endpoint("e1")
+    cache.get("u1")
+    assert fetch.calls == 2
+
+
+def test_generations_are_kept_only_while_fetching(monkeypatch):
+    cache, fetch = _cache(monkeypatch, {"u1": [_sub("u1", "e1")]})
+    for i in range(100):
+        cache.invalidate(f"user-{i}")
+    cache.get_many([f"user-{i}" for i in range(100)])
+    fetch.during = lambda: cache.invalidate("u1")
+    cache.get("u1")
+    assert cache._generations == {} and cache._fetching == {}
+
+
+def test_failed_fetch_releases_inflight_state(monkeypatch):
+    cache = SubscriptionCache()
+
+    def fail(user_ids):
+        raise RuntimeError("network")
+
+    monkeypatch.setattr(cache, "_fetch", fail)
+    with pytest.raises(RuntimeError):
+        cache.get("u1")
+    assert cache._fetching == {}
@@ -0,0 +1,38 @@
+import re
+
+from app.services import webpush_client as module
+from app.services.webpush_client import VapidHeaderCache, push_origin, push_topic
+
+
+def test_push_origin_and_topic():
+    assert push_origin("https://fcm.googleapis.com/fcm/send/abc") == "https://fcm.googleapis.com"
+    topic = push_topic("alarm-2026-01-01T08:00")
+    assert re.fullmatch(r"[A-Za-z0-9_-]{32}", topic)
+    assert topic == push_topic("alarm-2026-01-01T08:00")
+    assert topic != push_topic("alarm-2026-01-01T20:00")
+
+
+class FakeVapid:
+    def __init__(self):
+        self.claims = []
+
+    def sign(self, claims):
+        self.claims.append(claims)
+        return {"Authorization": f"vapid t={claims['aud']}-{len(self.claims)}"}
+
+
+def test_vapid_headers_are_signed_once_per_audience(monkeypatch):
+    now = [1_000_000]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    cache = VapidHeaderCache(expiry_seconds=3600, refresh_margin_seconds=600)
+    cache._vapid = FakeVapid()
+
+    first = cache.get("https://fcm.googleapis.com")
+    assert cache.get("https://fcm.googleapis.com") == first
+    cache.get("https://web.push.apple.com")
+    assert cache.signatures == 2
+
+    # 만료 임박(남은 시간 < 여유 시간) 시 다시 서명
+    now[0] += 3000 + 1
+    assert cache.get("https://fcm.googleapis.com") != first
+    assert cache.signatures == 3
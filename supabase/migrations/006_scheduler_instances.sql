@@ -0,0 +1,16 @@
+-- 알람 스케줄러 인스턴스 lease 테이블
+-- 여러 워커/레플리카가 하트비트를 기록하여 리더 선출 또는 user_id 해시 샤딩에 사용
+
+CREATE TABLE IF NOT EXISTS scheduler_instances (
+    instance_id TEXT PRIMARY KEY,
+    heartbeat_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS scheduler_instances_heartbeat_at_idx ON scheduler_instances(heartbeat_at);
+
+-- RLS 비활성화 (서버 백엔드에서만 접근)
+ALTER TABLE scheduler_instances DISABLE ROW LEVEL SECURITY;
+
+-- 코멘트
+COMMENT ON TABLE scheduler_instances IS '알람 스케줄러 인스턴스 하트비트 (lease)';
+COMMENT ON COLUMN scheduler_instances.heartbeat_at IS '마지막 하트비트 시각 (TTL 경과 시 만료)';
@@ -0,0 +1,26 @@
+-- 알람 스케줄러 watermark / 발송 원장 테이블
+-- 재시작·지연 시 놓친 분을 재처리하고, (user_id, fire_minute) 단위로 중복 발송을 막음
+
+CREATE TABLE IF NOT EXISTS scheduler_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS alarm_deliveries (
+    user_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    fire_minute TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (user_id, fire_minute)
+);
+
+CREATE INDEX IF NOT EXISTS alarm_deliveries_fire_minute_idx ON alarm_deliveries(fire_minute);
+
+-- RLS 비활성화 (서버 백엔드에서만 접근)
+ALTER TABLE scheduler_state DISABLE ROW LEVEL SECURITY;
+ALTER TABLE alarm_deliveries DISABLE ROW LEVEL SECURITY;
+
+-- 코멘트
+COMMENT ON TABLE scheduler_state IS '알람 스케줄러 상태 (마지막 처리 분 등)';
+COMMENT ON TABLE alarm_deliveries IS '알람 발송 원장 (사용자·분 단위 1회 발송 보장)';
+COMMENT ON COLUMN alarm_deliveries.fire_minute IS '알람 예정 시각 (분 단위, UTC)';
@@ -0,0 +1,7 @@
+-- 사용자 시간대 컬럼 추가
+-- 알람 스케줄러가 사용자별 시간대 기준으로 다음 울림 시각을 계산
+
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS timezone TEXT NOT NULL DEFAULT 'Asia/Seoul';
+
+-- 코멘트
+COMMENT ON COLUMN profiles.timezone IS 'IANA 시간대 이름 (예: Asia/Seoul, America/Los_Angeles)';